@@ -5,9 +5,11 @@ from typing import Optional
 
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
-# Importamos la función de decodificación y el esquema de usuario
-from app.core.security import decode_access_token
+# Importamos la función de decodificación (con caché) y el esquema de usuario
+from app.core.security import decode_access_token_cached
 from schemas.user_schema import UserInDB
+from app.core.user_cache import get_user_cached
+from app.core.revocation import ensure_token_not_revoked, user_from_claims
 from repositories.user_repository import UserRepository
 # Usar ruta absoluta desde config.database
 from config.database import get_db 
@@ -28,7 +30,7 @@ async def get_current_user(
     """
     
     # 1. Decodificar el token para obtener el ID de usuario (subject)
-    payload = decode_access_token(token)
+    payload = decode_access_token_cached(token)
     
     user_id: Optional[str] = payload.get("sub")
     
@@ -39,9 +41,12 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
         
-    # 2. Buscar el usuario en la base de datos por ID
-    user_repository = UserRepository(db)
-    user = await user_repository.get_by_id(user_id)
+    # 2. Buscar el usuario por ID: claims del token (modo sin estado), caché de
+    #    identidad y, si no está, la base de datos
+    user = user_from_claims(payload)
+    if user is None:
+        user_repository = UserRepository(db)
+        user = await get_user_cached(user_repository, user_id)
     
     if user is None:
         raise HTTPException(
@@ -49,6 +54,7 @@ async def get_current_user(
             detail="Usuario no encontrado o token revocado.",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    ensure_token_not_revoked(user, payload)
         
     # 3. Validar si el usuario está activo (opcional)
     if not user.is_active:
@@ -0,0 +1,139 @@
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+from config.settings import settings
+
+# (colección, modo de lectura): las búsquedas de un mismo origen comparten consulta
+SourceKey = Tuple[str, str]
+
+# Límites superiores de los tramos del histograma de tamaños de lote
+BATCH_SIZE_BUCKETS = (1, 5, 20, 100)
+
+
+class BatchLoader:
+    """
+    Agrupa las búsquedas por _id concurrentes (estilo DataLoader).
+
+    Las llamadas a load() de una misma colección que llegan dentro de una
+    ventana corta (ID_BATCH_WINDOW_MS) se resuelven con una sola consulta
+    find({_id: {$in: [...]}}), y cada llamada recibe su documento. Una
+    búsqueda de un ID que ya está pendiente o en curso no genera otra: espera
+    el mismo resultado.
+
+    Quien llama debe aplicar sus propios filtros (p. ej. el propietario) sobre
+    el documento devuelto, porque el lote mezcla búsquedas de varias peticiones.
+    Unirse a un lote ya enviado equivale a una lectura concurrente con él: no
+    sirve para releer lo que la propia petición acaba de escribir.
+    """
+
+    def __init__(self, window_seconds: float, max_batch_size: int):
+        self.window_seconds = window_seconds
+        self.max_batch_size = max_batch_size
+        # Búsquedas pendientes o en curso, por origen e ID
+        self._futures: Dict[Tuple[SourceKey, ObjectId], asyncio.Future] = {}
+        # Lote aún no enviado de cada origen: (colección, IDs)
+        self._queued: Dict[SourceKey, Tuple[AsyncIOMotorCollection, List[ObjectId]]] = {}
+        self._timers: Dict[SourceKey, asyncio.TimerHandle] = {}
+
+        # Contadores de observabilidad
+        self.loads = 0
+        self.coalesced = 0
+        self.batches = 0
+        self.batch_errors = 0
+        self.max_batch_seen = 0
+        self._batched_ids = 0
+        self._histogram = [0] * (len(BATCH_SIZE_BUCKETS) + 1)
+
+    @staticmethod
+    def _source_key(collection: AsyncIOMotorCollection) -> SourceKey:
+        return collection.full_name, collection.read_preference.mongos_mode
+
+    async def load(self, collection: AsyncIOMotorCollection, doc_id: ObjectId) -> Optional[Dict[str, Any]]:
+        """
+        Retorna el documento con ese _id (o None). El resultado es una copia:
+        quien llama puede modificarlo sin afectar a otras peticiones.
+        """
+        self.loads += 1
+        source = self._source_key(collection)
+        future = self._futures.get((source, doc_id))
+
+        if future is not None:
+            self.coalesced += 1
+        else:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._futures[(source, doc_id)] = future
+
+            queued = self._queued.get(source)
+            if queued is None:
+                queued = self._queued[source] = (collection, [])
+                self._timers[source] = loop.call_later(self.window_seconds, self._dispatch, source)
+            queued[1].append(doc_id)
+            if len(queued[1]) >= self.max_batch_size:
+                self._dispatch(source)
+
+        # shield: si una petición se cancela, las demás siguen esperando el mismo lote
+        doc = await asyncio.shield(future)
+        return dict(doc) if doc is not None else None
+
+    def _dispatch(self, source: SourceKey) -> None:
+        """Envía el lote pendiente de un origen (por la ventana o por tamaño)."""
+        timer = self._timers.pop(source, None)
+        if timer is not None:
+            timer.cancel()
+        queued = self._queued.pop(source, None)
+        if queued is None:
+            return
+        collection, ids = queued
+        asyncio.get_running_loop().create_task(self._run_batch(source, collection, ids))
+
+    async def _run_batch(self, source: SourceKey, collection: AsyncIOMotorCollection, ids: List[ObjectId]) -> None:
+        self._record_batch(len(ids))
+        try:
+            docs = await collection.find({"_id": {"$in": ids}}).to_list(length=len(ids))
+        except Exception as e:
+            self.batch_errors += 1
+            for doc_id in ids:
+                future = self._futures.pop((source, doc_id), None)
+                if future is not None and not future.done():
+                    future.set_exception(e)
+            return
+
+        by_id = {doc["_id"]: doc for doc in docs}
+        for doc_id in ids:
+            future = self._futures.pop((source, doc_id), None)
+            if future is not None and not future.done():
+                future.set_result(by_id.get(doc_id))
+
+    def _record_batch(self, size: int) -> None:
+        self.batches += 1
+        self._batched_ids += size
+        self.max_batch_seen = max(self.max_batch_seen, size)
+        for index, limit in enumerate(BATCH_SIZE_BUCKETS):
+            if size <= limit:
+                self._histogram[index] += 1
+                return
+        self._histogram[-1] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        labels = [f"<={limit}" for limit in BATCH_SIZE_BUCKETS] + [f">{BATCH_SIZE_BUCKETS[-1]}"]
+        return {
+            "loads": self.loads,
+            "coalesced": self.coalesced,
+            "batches": self.batches,
+            "batch_errors": self.batch_errors,
+            "avg_batch_size": round(self._batched_ids / self.batches, 2) if self.batches else 0.0,
+            "max_batch_size": self.max_batch_seen,
+            "batch_sizes": dict(zip(labels, self._histogram)),
+            "in_flight": len(self._futures),
+        }
+
+
+# Instancia única por worker
+id_loader = BatchLoader(
+    window_seconds=settings.ID_BATCH_WINDOW_MS / 1000,
+    max_batch_size=settings.ID_BATCH_MAX_SIZE,
+)
@@ -0,0 +1,184 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """
+    Caché en memoria acotada con política LRU y expiración por entrada.
+
+    Cada entrada guarda su propio instante de expiración (reloj monotónico), de modo
+    que se puede usar un TTL distinto por clave (p. ej. el 'exp' de un JWT).
+    Opcionalmente se acota también por tamaño: con 'max_bytes' y 'sizeof' (tamaño
+    estimado de cada valor) se desalojan las entradas menos usadas hasta caber.
+    No es thread-safe: está pensada para usarse desde el event loop de un worker.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+        max_bytes: Optional[int] = None,
+        sizeof: Optional[Callable[[Any], int]] = None,
+    ):
+        if max_size <= 0:
+            raise ValueError("max_size debe ser mayor que 0")
+        if max_bytes is not None and sizeof is None:
+            raise ValueError("max_bytes requiere una función sizeof")
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._clock = clock
+        # clave -> (expiración, valor, tamaño estimado)
+        self._data: "OrderedDict[Hashable, Tuple[float, Any, int]]" = OrderedDict()
+        self.bytes = 0
+
+        # Contadores de observabilidad
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._data.get(key)
+        return entry is not None and entry[0] > self._clock()
+
+    def _remove(self, key: Hashable) -> bool:
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return False
+        self.bytes -= entry[2]
+        return True
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Devuelve el valor cacheado o 'default' si no existe o ya expiró."""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        expires_at, value, _ = entry
+        if expires_at <= self._clock():
+            # Entrada vencida: se elimina de forma perezosa
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return default
+
+        # LRU: la entrada usada pasa al final
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """Guarda un valor. 'ttl_seconds' sobrescribe el TTL por defecto para esta entrada."""
+        ttl = self.ttl_seconds if ttl_seconds is None else min(ttl_seconds, self.ttl_seconds)
+        size = self._sizeof(value) if self._sizeof is not None else 0
+        self._remove(key)
+        if ttl <= 0 or (self.max_bytes is not None and size > self.max_bytes):
+            # Nada que cachear (p. ej. un token que ya expiró, o un valor mayor que todo el presupuesto)
+            return
+
+        self._data[key] = (self._clock() + ttl, value, size)
+        self.bytes += size
+
+        while len(self._data) > self.max_size or (self.max_bytes is not None and self.bytes > self.max_bytes):
+            _, (_, _, evicted_size) = self._data.popitem(last=False)
+            self.bytes -= evicted_size
+            self.evictions += 1
+
+    def delete(self, key: Hashable) -> bool:
+        """Elimina una entrada. Retorna True si existía."""
+        return self._remove(key)
+
+    def delete_where(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        """Elimina todas las entradas que cumplan el predicado (O(n), uso puntual)."""
+        to_delete = [key for key, (_, value, _) in self._data.items() if predicate(key, value)]
+        for key in to_delete:
+            self._remove(key)
+        return len(to_delete)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Métricas de uso de la caché."""
+        lookups = self.hits + self.misses
+        stats = {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+        if self._sizeof is not None:
+            stats.update({"bytes": self.bytes, "max_bytes": self.max_bytes})
+        return stats
+
+
+# --- Backends Asíncronos (intercambiables) ---
+
+class CacheBackend(ABC):
+    """
+    Interfaz de almacenamiento para cachés compartibles entre workers.
+
+    Los valores deben ser serializables a JSON (dicts, listas, str, números),
+    de modo que una implementación externa (Redis, Memcached...) pueda
+    guardarlos sin conocer los modelos Pydantic.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> bool:
+        ...
+
+    @abstractmethod
+    async def clear(self) -> None:
+        ...
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """Backend local al proceso basado en TTLCache. Útil por defecto y en tests."""
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl_seconds: float,
+        max_bytes: Optional[int] = None,
+        sizeof: Optional[Callable[[Any], int]] = None,
+    ):
+        self._cache = TTLCache(max_size=max_size, ttl_seconds=ttl_seconds, max_bytes=max_bytes, sizeof=sizeof)
+
+    async def get(self, key: str) -> Optional[Any]:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        self._cache.set(key, value, ttl_seconds=ttl_seconds)
+
+    async def delete(self, key: str) -> bool:
+        return self._cache.delete(key)
+
+    async def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "memory", **self._cache.stats()}
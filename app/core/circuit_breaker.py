@@ -0,0 +1,85 @@
+import math
+import time
+from typing import Any, Callable, Dict
+
+
+class CircuitBreaker:
+    """
+    Cortocircuito para una dependencia externa (MongoDB).
+
+    - closed: las peticiones pasan; se cuentan los fallos consecutivos.
+    - open: tras 'failure_threshold' fallos seguidos las peticiones se rechazan
+      al instante, sin esperar timeouts. Quien lo usa sondea la dependencia en
+      segundo plano y llama a close() cuando vuelve a responder.
+
+    No es thread-safe: está pensado para el event loop de un worker.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+
+    def __init__(self, failure_threshold: int, clock: Callable[[], float] = time.monotonic):
+        if failure_threshold <= 0:
+            raise ValueError("failure_threshold debe ser mayor que 0")
+        self.failure_threshold = failure_threshold
+        self._clock = clock
+        self.state = self.CLOSED
+        self._consecutive_failures = 0
+        self._retry_at = 0.0
+
+        # Contadores de observabilidad
+        self.times_opened = 0
+        self.rejected = 0
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == self.OPEN
+
+    @property
+    def has_failures(self) -> bool:
+        """True si hay fallos consecutivos sin un éxito posterior (o el circuito está abierto)."""
+        return self._consecutive_failures > 0 or self.state == self.OPEN
+
+    def record_success(self) -> None:
+        if self.state == self.CLOSED:
+            self._consecutive_failures = 0
+
+    def record_failure(self) -> bool:
+        """Registra un fallo. Retorna True si este fallo abre el circuito."""
+        self._consecutive_failures += 1
+        if self.state == self.CLOSED and self._consecutive_failures >= self.failure_threshold:
+            self.open()
+            return True
+        return False
+
+    def open(self) -> None:
+        if self.state != self.OPEN:
+            self.state = self.OPEN
+            self.times_opened += 1
+
+    def close(self) -> None:
+        self.state = self.CLOSED
+        self._consecutive_failures = 0
+        self._retry_at = 0.0
+
+    def schedule_retry(self, seconds: float) -> None:
+        """Anota cuándo será el próximo sondeo (para el encabezado Retry-After)."""
+        self._retry_at = self._clock() + seconds
+
+    def retry_after(self) -> int:
+        """Segundos (enteros, mínimo 1) hasta el próximo sondeo."""
+        return max(1, math.ceil(self._retry_at - self._clock()))
+
+    def reject(self) -> int:
+        """Cuenta una petición rechazada y retorna su Retry-After."""
+        self.rejected += 1
+        return self.retry_after()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._consecutive_failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+            "retry_after": self.retry_after() if self.is_open else None,
+        }
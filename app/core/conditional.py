@@ -0,0 +1,53 @@
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Response, status
+
+from config.settings import settings
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    ETag fuerte a partir de lo que determina la representación (propietario,
+    versión, forma de la consulta, formato...). Las partes deben tener un repr
+    estable entre procesos: nada de sets (su orden depende del hash de cada worker).
+    """
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True si el If-None-Match de la petición incluye el ETag (comparación débil, RFC 9110)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+def not_modified(etag: str) -> Response:
+    """304 sin cuerpo: el cliente reutiliza la copia que ya tiene."""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": settings.HTTP_CACHE_CONTROL},
+    )
+
+
+def apply_cache_headers(result: Any, response: Response, etag: Optional[str]) -> Any:
+    """
+    Añade ETag y Cache-Control a lo que devuelve la ruta: a la respuesta si ya
+    es una, o a la respuesta temporal de FastAPI ('response') si devuelve datos.
+    Sin ETag (ETAG_ENABLED desactivado) no añade nada.
+    """
+    if etag is None:
+        return result
+    target = result if isinstance(result, Response) else response
+    target.headers["ETag"] = etag
+    target.headers["Cache-Control"] = settings.HTTP_CACHE_CONTROL
+    return result
@@ -0,0 +1,156 @@
+from contextvars import ContextVar
+from datetime import date, datetime
+from typing import Any, Callable, Coroutine, Mapping, Optional
+
+from fastapi import HTTPException, Request, Response, status
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+from starlette.background import BackgroundTask
+
+from app.core.responses import FastJSONResponse
+
+try:
+    import msgpack
+except ImportError:  # Dependencia opcional: sin ella solo se sirve JSON
+    msgpack = None
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+# Tipos que se aceptan como MessagePack (el segundo aún es habitual en clientes)
+MSGPACK_MEDIA_TYPES = frozenset({MSGPACK_MEDIA_TYPE, "application/x-msgpack"})
+JSON_MEDIA_TYPES = frozenset({"application/json", "application/*", "*/*"})
+
+# Formato negociado para la respuesta de la petición en curso (lo fija NegotiatedRoute)
+_respond_msgpack: ContextVar[bool] = ContextVar("respond_msgpack", default=False)
+
+
+def _media_type(value: str) -> str:
+    return value.split(";", 1)[0].strip().lower()
+
+
+def is_msgpack(content_type: Optional[str]) -> bool:
+    """True si el Content-Type indica un cuerpo MessagePack."""
+    return content_type is not None and _media_type(content_type) in MSGPACK_MEDIA_TYPES
+
+
+def wants_msgpack(accept: Optional[str]) -> bool:
+    """
+    True si el encabezado Accept prefiere MessagePack a JSON. JSON sigue siendo
+    el formato por defecto: MessagePack debe pedirse de forma explícita y con
+    una calidad (q) al menos igual a la de JSON o los comodines.
+    """
+    if msgpack is None or not accept:
+        return False
+    msgpack_q = json_q = 0.0
+    for item in accept.split(","):
+        media_type, *params = item.split(";")
+        media_type = media_type.strip().lower()
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if media_type in MSGPACK_MEDIA_TYPES:
+            msgpack_q = max(msgpack_q, q)
+        elif media_type in JSON_MEDIA_TYPES:
+            json_q = max(json_q, q)
+    return msgpack_q > 0 and msgpack_q >= json_q
+
+
+def negotiated_media_type() -> str:
+    """Media type con el que responderá la petición en curso (JSON si no es una ruta negociada)."""
+    return MSGPACK_MEDIA_TYPE if _respond_msgpack.get() else "application/json"
+
+
+def _msgpack_default(obj: Any) -> Any:
+    # Mismas representaciones que en JSON: fechas en ISO 8601 e IDs como texto
+    if isinstance(obj, BaseModel):
+        return obj.__dict__
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Tipo no serializable: {type(obj).__name__}")
+
+
+class NegotiatedResponse(FastJSONResponse):
+    """
+    Respuesta por defecto de las rutas negociadas: JSON (FastJSONResponse) o
+    MessagePack según el Accept de la petición. Las fechas y los IDs tienen la
+    misma forma en ambos formatos, de modo que un cliente puede cambiar de
+    formato sin cambiar cómo interpreta los datos.
+    """
+
+    def __init__(
+        self,
+        content: Any = None,
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+        media_type: Optional[str] = None,
+        background: Optional[BackgroundTask] = None,
+    ):
+        self.use_msgpack = _respond_msgpack.get()
+        if self.use_msgpack:
+            self.media_type = MSGPACK_MEDIA_TYPE
+        super().__init__(content, status_code, headers, media_type, background)
+
+    def render(self, content: Any) -> bytes:
+        if self.use_msgpack:
+            return msgpack.packb(content, default=_msgpack_default, use_bin_type=True)
+        return super().render(content)
+
+
+class MsgPackRequest(Request):
+    """
+    Petición con cuerpo MessagePack. FastAPI solo decodifica (y valida) el
+    cuerpo cuando el Content-Type es JSON, así que se presenta como JSON y
+    json() devuelve el cuerpo decodificado desde MessagePack: el resultado es
+    el mismo árbol de datos que enviaría un cliente JSON.
+    """
+
+    def __init__(self, request: Request):
+        headers = [(name, value) for name, value in request.scope["headers"] if name != b"content-type"]
+        headers.append((b"content-type", b"application/json"))
+        super().__init__(dict(request.scope, headers=headers), request.receive)
+
+    async def json(self) -> Any:
+        if not hasattr(self, "_msgpack_body"):
+            try:
+                # timestamp=3: las marcas de tiempo de MessagePack llegan como datetime UTC
+                self._msgpack_body = msgpack.unpackb(await self.body(), timestamp=3)
+            except (ValueError, msgpack.UnpackException):
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="MessagePack inválido.")
+        return self._msgpack_body
+
+
+class NegotiatedRoute(APIRoute):
+    """
+    Clase de ruta de los routers que admiten MessagePack además de JSON
+    (route_class en APIRouter): acepta cuerpos 'application/msgpack' y
+    responde en MessagePack cuando el Accept lo pide. Las rutas no cambian:
+    siguen declarando sus modelos y devolviendo objetos como con JSON.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+
+        async def negotiated_handler(request: Request) -> Response:
+            # Solo las rutas con cuerpo declarado; las que leen el flujo (importación) lo tratan ellas
+            if self.body_field is not None and is_msgpack(request.headers.get("content-type")):
+                if msgpack is None:
+                    raise HTTPException(
+                        status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                        detail="MessagePack no está disponible en este servidor.",
+                    )
+                request = MsgPackRequest(request)
+
+            token = _respond_msgpack.set(wants_msgpack(request.headers.get("accept")))
+            try:
+                response = await handler(request)
+            finally:
+                _respond_msgpack.reset(token)
+            # La misma URL puede responder en dos formatos: las cachés deben distinguirlos
+            response.headers.append("Vary", "Accept")
+            return response
+
+        return negotiated_handler
@@ -1,15 +1,19 @@
-from typing import Annotated
+from typing import Annotated, AsyncGenerator
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from datetime import datetime
 
 # FIX CRÍTICO: Importar get_db desde config.database (que es async)
-from config.database import get_db as get_database 
+from config.database import get_db as get_database, mongo_manager
 from repositories.user_repository import UserRepository
 from repositories.task_repository import TaskRepository
+from repositories.cached_task_repository import CachedTaskRepository
+from config.settings import settings
 from schemas.user_schema import UserInDB
-from app.core.security import decode_access_token, ALGORITHM # Necesitamos ALGORITHM para la verificación de token
+from app.core.user_cache import get_user_cached
+from app.core.revocation import ensure_token_not_revoked, user_from_claims
+from app.core.security import decode_access_token_cached, ALGORITHM # Necesitamos ALGORITHM para la verificación de token
 
 # Esquema de seguridad OAuth2
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token")
@@ -23,12 +27,7 @@ def get_user_repository(db: Annotated[AsyncIOMotorDatabase, Depends(get_database
     """Dependencia que retorna una instancia del repositorio de usuarios."""
     return UserRepository(db)
 
-# --- 3. Dependencia para el Repositorio de Tareas ---
-def get_task_repository(db: Annotated[AsyncIOMotorDatabase, Depends(get_database)]):
-    """Dependencia que retorna una instancia del repositorio de tareas."""
-    return TaskRepository(db)
-
-# --- 4. Dependencia para el Usuario Autenticado (Protección de Rutas) ---
+# --- 3. Dependencia para el Usuario Autenticado (Protección de Rutas) ---
 async def get_current_user(
     token: Annotated[str, Depends(oauth2_scheme)],
     user_repo: Annotated[UserRepository, Depends(get_user_repository)]
@@ -39,7 +38,7 @@ async def get_current_user(
     """
     
     # 1. Verificar y decodificar el token (maneja expiración y firma inválida)
-    payload = decode_access_token(token)
+    payload = decode_access_token_cached(token)
     user_id: str = payload.get("sub")
     
     if user_id is None:
@@ -49,8 +48,11 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # 2. Buscar el usuario en la base de datos
-    user = await user_repo.get_by_id(user_id)
+    # 2. Buscar el usuario: claims del token (modo sin estado), caché de identidad
+    #    y, si no está, la base de datos
+    user = user_from_claims(payload)
+    if user is None:
+        user = await get_user_cached(user_repo, user_id)
     
     if user is None:
         raise HTTPException(
@@ -58,9 +60,25 @@ async def get_current_user(
             detail="Usuario asociado al token no encontrado",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    ensure_token_not_revoked(user, payload)
     
     # 3. Retornar el usuario autenticado
     return user
         
     # 3. Retornar el objeto Pydantic UserInDB
-    return user
\ No newline at end of file
+    return user
+
+# --- 4. Dependencia para el Repositorio de Tareas ---
+async def get_task_repository(
+    db: Annotated[AsyncIOMotorDatabase, Depends(get_database)],
+    current_user: Annotated[UserInDB, Depends(get_current_user)],
+) -> AsyncGenerator[TaskRepository, None]:
+    """
+    Dependencia que retorna una instancia del repositorio de tareas. Las lecturas
+    usan la preferencia de lectura configurada y, si no van al primario, todas
+    las operaciones de la petición comparten la sesión causal del usuario.
+    """
+    # Con TASK_CACHE_ENABLED las lecturas por ID pasan por la caché de tareas
+    repository_class = CachedTaskRepository if settings.TASK_CACHE_ENABLED else TaskRepository
+    async with mongo_manager.causal_session(current_user.id) as session:
+        yield repository_class(db, mongo_manager.read_database, session)
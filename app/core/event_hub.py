@@ -0,0 +1,229 @@
+import asyncio
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, NamedTuple, Optional, Set
+
+from config.settings import settings
+
+
+class StreamEvent(NamedTuple):
+    """Evento de tarea listo para enviar: 'data' ya está serializado a JSON una sola vez."""
+    type: str
+    seq: int
+    data: str
+
+
+def task_event(event_type: str, task_id: Optional[str], seq: int, task: Optional[Dict[str, Any]] = None) -> StreamEvent:
+    """
+    Evento de cambio de una tarea: 'created', 'updated' o 'deleted' (con 'task'
+    cuando se conoce la tarea resultante), o 'resync' (sin ID) cuando cambió un
+    conjunto de tareas sin enumerar: el cliente debe llamar a GET /tasks/changes.
+    """
+    payload = {"type": event_type, "id": task_id, "seq": seq, "task": task}
+    return StreamEvent(event_type, seq, json.dumps(payload, separators=(",", ":")))
+
+
+class StreamClosed(Exception):
+    """La suscripción se cerró ('slow_consumer' o 'shutdown')."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+# Marca que despierta a un consumidor bloqueado cuando se cierra su suscripción
+_CLOSED = object()
+
+
+class Subscription:
+    """Conexión de streaming de un propietario, con su cola acotada de eventos."""
+
+    def __init__(self, owner_id: str, transport: str, queue_size: int):
+        self.owner_id = owner_id
+        self.transport = transport
+        self.queue: "asyncio.Queue[Any]" = asyncio.Queue(maxsize=queue_size)
+        self.closed_reason: Optional[str] = None
+
+    def close(self, reason: str) -> None:
+        if self.closed_reason is not None:
+            return
+        self.closed_reason = reason
+        try:
+            self.queue.put_nowait(_CLOSED)
+        except asyncio.QueueFull:
+            pass  # El consumidor no está esperando: verá el cierre en su próxima lectura
+
+    async def next(self, timeout: float) -> Optional[StreamEvent]:
+        """
+        Siguiente evento, o None si no llegó ninguno en 'timeout' segundos (momento
+        de enviar un heartbeat). Lanza StreamClosed si la suscripción se cerró.
+        """
+        if self.closed_reason is not None:
+            raise StreamClosed(self.closed_reason)
+        try:
+            event = await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        if event is _CLOSED:
+            raise StreamClosed(self.closed_reason)
+        return event
+
+
+# --- Backends de Reparto (intercambiables) ---
+
+class FanoutBackend(ABC):
+    """
+    Reparte los eventos publicados a los workers que tienen conexiones abiertas.
+
+    Cada worker entrega lo que recibe a sus suscripciones locales con la
+    función 'deliver' que le pasa EventHub. Una implementación compartida
+    (Redis pub/sub, NATS...) publica en un canal común y llama a 'deliver'
+    con lo que reciba de él; los eventos son tuplas de str/int serializables.
+    """
+
+    # True si otros workers pueden tener suscriptores (se publica siempre)
+    shared = False
+
+    async def start(self, deliver: Callable[[str, StreamEvent], None]) -> None:
+        self._deliver = deliver
+
+    @abstractmethod
+    async def publish(self, owner_id: str, event: StreamEvent) -> None:
+        ...
+
+    async def stop(self) -> None:
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+
+class LocalFanoutBackend(FanoutBackend):
+    """Reparto dentro del proceso: cada worker solo ve las escrituras que hace él."""
+
+    async def publish(self, owner_id: str, event: StreamEvent) -> None:
+        self._deliver(owner_id, event)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "local"}
+
+
+class EventHub:
+    """
+    Publicación/suscripción de eventos de tareas por propietario para
+    GET /tasks/stream (SSE) y su equivalente WebSocket.
+
+    TaskRepository publica cada escritura; el backend la reparte entre workers
+    y cada worker la encola en las suscripciones del propietario. Las colas
+    están acotadas (TASK_STREAM_QUEUE_SIZE): una conexión que no consume a
+    tiempo se cierra ('slow_consumer') en lugar de acumular memoria o frenar
+    a las demás. El cliente se reconecta y recupera lo perdido con
+    GET /tasks/changes desde el último 'next_since' que obtuvo.
+    """
+
+    def __init__(self, backend: FanoutBackend, queue_size: int, max_connections_per_owner: int):
+        self.backend = backend
+        self.queue_size = queue_size
+        self.max_connections_per_owner = max_connections_per_owner
+        self._subscriptions: Dict[str, Set[Subscription]] = {}
+
+        # Contadores de observabilidad
+        self.published = 0
+        self.delivered = 0
+        self.slow_consumer_disconnects = 0
+        self.rejected_connections = 0
+
+    def set_backend(self, backend: FanoutBackend) -> None:
+        """Reemplaza el backend (antes de start, p. ej. por uno compartido al iniciar la app)."""
+        self.backend = backend
+
+    async def start(self) -> None:
+        await self.backend.start(self._deliver)
+
+    async def stop(self) -> None:
+        """Cierra todas las conexiones (los streams terminan) y detiene el backend."""
+        for subscriptions in list(self._subscriptions.values()):
+            for subscription in list(subscriptions):
+                subscription.close("shutdown")
+        self._subscriptions.clear()
+        await self.backend.stop()
+
+    # --- Suscripciones ---
+
+    def admits(self, owner_id: str) -> bool:
+        """
+        Comprobación previa a subscribe, sin reservar nada: False (y cuenta el
+        rechazo) si el propietario ya tiene el máximo de conexiones. Permite
+        responder 429 antes de empezar un stream que se suscribe al iterarse.
+        """
+        if len(self._subscriptions.get(owner_id, ())) >= self.max_connections_per_owner:
+            self.rejected_connections += 1
+            return False
+        return True
+
+    def subscribe(self, owner_id: str, transport: str) -> Optional[Subscription]:
+        """Nueva suscripción del propietario, o None si ya tiene el máximo de conexiones."""
+        subscriptions = self._subscriptions.setdefault(owner_id, set())
+        if len(subscriptions) >= self.max_connections_per_owner:
+            self.rejected_connections += 1
+            return None
+        subscription = Subscription(owner_id, transport, self.queue_size)
+        subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscriptions = self._subscriptions.get(subscription.owner_id)
+        if subscriptions is None:
+            return
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del self._subscriptions[subscription.owner_id]
+
+    # --- Publicación ---
+
+    def wants(self, owner_id: str) -> bool:
+        """True si vale la pena construir eventos para el propietario (alguien puede recibirlos)."""
+        return self.backend.shared or owner_id in self._subscriptions
+
+    async def publish(self, owner_id: str, event: StreamEvent) -> None:
+        self.published += 1
+        await self.backend.publish(owner_id, event)
+
+    def _deliver(self, owner_id: str, event: StreamEvent) -> None:
+        for subscription in list(self._subscriptions.get(owner_id, ())):
+            try:
+                subscription.queue.put_nowait(event)
+                self.delivered += 1
+            except asyncio.QueueFull:
+                # Consumidor lento: se desconecta (recuperará lo perdido con /tasks/changes)
+                self.slow_consumer_disconnects += 1
+                self.unsubscribe(subscription)
+                subscription.close("slow_consumer")
+
+    def stats(self) -> Dict[str, Any]:
+        subscriptions = [subscription for group in self._subscriptions.values() for subscription in group]
+        by_transport: Dict[str, int] = {}
+        for subscription in subscriptions:
+            by_transport[subscription.transport] = by_transport.get(subscription.transport, 0) + 1
+        depths = [subscription.queue.qsize() for subscription in subscriptions]
+        return {
+            "connections": len(subscriptions),
+            "connections_by_transport": by_transport,
+            "owners": len(self._subscriptions),
+            "queue_size": self.queue_size,
+            "queue_depth_total": sum(depths),
+            "queue_depth_max": max(depths, default=0),
+            "published": self.published,
+            "delivered": self.delivered,
+            "slow_consumer_disconnects": self.slow_consumer_disconnects,
+            "rejected_connections": self.rejected_connections,
+            "backend": self.backend.stats(),
+        }
+
+
+# Instancia única por worker
+event_hub = EventHub(
+    backend=LocalFanoutBackend(),
+    queue_size=settings.TASK_STREAM_QUEUE_SIZE,
+    max_connections_per_owner=settings.TASK_STREAM_MAX_CONNECTIONS_PER_USER,
+)
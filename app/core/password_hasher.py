@@ -0,0 +1,140 @@
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Optional
+
+from fastapi import HTTPException, status
+
+from app.core.security import get_password_hash, verify_password
+from config.settings import settings
+
+
+class PasswordHasherPool:
+    """
+    Ejecuta el hashing y la verificación Argon2 fuera del event loop.
+
+    Usa un pool de hilos: argon2-cffi libera el GIL mientras calcula el hash,
+    así que los hilos corren en paralelo sin bloquear el resto de peticiones.
+    La cola está acotada: si hay demasiadas operaciones pendientes se responde
+    503 de inmediato en lugar de acumular logins esperando.
+    """
+
+    # Número de muestras recientes usadas para calcular percentiles
+    LATENCY_WINDOW = 1000
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+
+        # Métricas
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.rejected = 0
+        self._latencies: Dict[str, Deque[float]] = {
+            "hash": deque(maxlen=self.LATENCY_WINDOW),
+            "verify": deque(maxlen=self.LATENCY_WINDOW),
+        }
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Creación perezosa: el pool se levanta con la primera operación
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="argon2",
+            )
+        return self._executor
+
+    async def _run(self, operation: str, func: Callable[..., Any], *args: Any) -> Any:
+        # 1. Fallar rápido si el pool está saturado (en ejecución + en cola)
+        if self._pending >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Servicio de autenticación saturado. Intenta de nuevo en unos segundos.",
+                headers={"Retry-After": "1"},
+            )
+
+        # 2. Ejecutar en el pool y medir la latencia total (espera + cálculo).
+        #    El cupo se libera cuando termina el hilo, no cuando deja de esperarse:
+        #    cancelar la petición no detiene un hash que ya está calculándose.
+        self._pending += 1
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        try:
+            future = self._get_executor().submit(func, *args)
+        except BaseException:
+            self._pending -= 1
+            raise
+        future.add_done_callback(lambda _: self._release_from_thread(loop))
+        try:
+            result = await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+        self.completed += 1
+        self._latencies[operation].append((time.perf_counter() - start) * 1000)
+        return result
+
+    def _release(self) -> None:
+        self._pending -= 1
+
+    def _release_from_thread(self, loop: asyncio.AbstractEventLoop) -> None:
+        try:
+            loop.call_soon_threadsafe(self._release)
+        except RuntimeError:
+            # Loop ya cerrado (apagado): no queda nadie que lea el contador
+            pass
+
+    async def hash(self, password: str) -> str:
+        """Genera el hash Argon2 de una contraseña sin bloquear el event loop."""
+        return await self._run("hash", get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verifica una contraseña contra su hash sin bloquear el event loop."""
+        return await self._run("verify", verify_password, plain_password, hashed_password)
+
+    def shutdown(self) -> None:
+        """Libera los hilos del pool (se llama al apagar la aplicación)."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    @staticmethod
+    def _summary(samples: Deque[float]) -> Dict[str, Any]:
+        if not samples:
+            return {"count": 0}
+        ordered = sorted(samples)
+        last = len(ordered) - 1
+        return {
+            "count": len(ordered),
+            "avg_ms": round(sum(ordered) / len(ordered), 2),
+            "p50_ms": round(ordered[int(last * 0.50)], 2),
+            "p99_ms": round(ordered[int(last * 0.99)], 2),
+            "max_ms": round(ordered[-1], 2),
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "pending": self._pending,
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "rejected": self.rejected,
+            "latency": {op: self._summary(samples) for op, samples in self._latencies.items()},
+        }
+
+
+# Instancia única por worker
+password_hasher = PasswordHasherPool(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
@@ -0,0 +1,52 @@
+import json
+from datetime import date, datetime
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # Dependencia opcional: sin ella se usa json de la librería estándar
+    orjson = None
+
+
+def _model_fields(obj: BaseModel) -> dict:
+    """
+    Campos de un modelo tal cual están guardados en la instancia. Los modelos
+    de tareas no tienen alias ni serializadores propios, así que equivale a
+    model_dump() sin recorrer el serializador de Pydantic.
+    """
+    return obj.__dict__
+
+
+def _orjson_default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return _model_fields(obj)
+    raise TypeError(f"Tipo no serializable: {type(obj).__name__}")
+
+
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return _model_fields(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Tipo no serializable: {type(obj).__name__}")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    Respuesta JSON para contenido ya confiable (p. ej. tareas construidas con
+    model_construct): serializa directamente con orjson, sin pasar por la
+    validación del response_model ni por jsonable_encoder.
+
+    Las fechas sin zona horaria (como las devuelve MongoDB) salen en el mismo
+    formato ISO 8601 que con Pydantic.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, default=_orjson_default)
+        return json.dumps(
+            content, default=_json_default, ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8")
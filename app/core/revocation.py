@@ -0,0 +1,241 @@
+import asyncio
+import hashlib
+import logging
+import math
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import HTTPException, status
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from config.settings import settings
+from schemas.user_schema import UserInDB
+
+logger = logging.getLogger(__name__)
+
+# Marca de "todos los tokens revocados" (usuario desactivado)
+REVOKE_ALL = math.inf
+
+
+def revoked_at_epoch(tokens_revoked_at: datetime) -> float:
+    """Instante de revocación guardado en MongoDB (UTC sin zona horaria) como epoch."""
+    return tokens_revoked_at.replace(tzinfo=timezone.utc).timestamp()
+
+
+def issued_before(issued_at: Optional[float], revoked_at: float) -> bool:
+    """
+    True si un token emitido en 'issued_at' ('iat') es anterior a la revocación.
+
+    'iat' va en segundos enteros (truncado), así que se compara contra el segundo
+    de la revocación: un token emitido en ese mismo segundo (p. ej. volver a
+    iniciar sesión justo después de cerrarla) sigue siendo válido.
+    """
+    if revoked_at == REVOKE_ALL or issued_at is None:
+        return True
+    return issued_at < math.floor(revoked_at)
+
+
+class BloomFilter:
+    """
+    Filtro de Bloom sobre un bytearray. Responde "seguro que no está" sin
+    tocar la estructura exacta; los falsos positivos se resuelven después.
+    """
+
+    def __init__(self, size_bits: int, num_hashes: int):
+        self.size_bits = size_bits
+        self.num_hashes = num_hashes
+        self._bits = bytearray((size_bits + 7) // 8)
+
+    def _positions(self, item: str):
+        # Doble hashing (Kirsch-Mitzenmacher) a partir de un único SHA-256
+        digest = hashlib.sha256(item.encode("utf-8")).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:16], "big") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.size_bits
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def might_contain(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class RevocationList:
+    """
+    Lista de denegación en memoria para el modo de autenticación sin estado.
+
+    Guarda, por ID de usuario, el instante (epoch) a partir del cual sus tokens
+    dejan de ser válidos: los emitidos antes ('iat') se rechazan. Un usuario
+    desactivado tiene todos sus tokens revocados. El filtro de Bloom evita
+    consultar el diccionario exacto en el caso habitual (usuario no revocado).
+
+    Se sincroniza de forma incremental con la colección de usuarios usando
+    'updated_at', y los cambios hechos en este worker se aplican al instante.
+    """
+
+    # Margen que se vuelve a leer en cada sincronización incremental
+    SYNC_OVERLAP_SECONDS = 5
+
+    def __init__(self, size_bits: int, num_hashes: int):
+        self._size_bits = size_bits
+        self._num_hashes = num_hashes
+        self._bloom = BloomFilter(size_bits, num_hashes)
+        self._revoked: Dict[str, float] = {}
+        self._last_sync: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+        self.refreshes = 0
+
+    # --- Consulta ---
+
+    def is_revoked(self, user_id: str, issued_at: Optional[float]) -> bool:
+        """True si el token del usuario emitido en 'issued_at' ya no es válido."""
+        if not self._bloom.might_contain(user_id):
+            return False
+        revoked_at = self._revoked.get(user_id)
+        if revoked_at is None:
+            return False  # Falso positivo del filtro (o entrada ya eliminada)
+        return issued_before(issued_at, revoked_at)
+
+    # --- Actualización ---
+
+    def revoke(self, user_id: str, revoked_at: float = REVOKE_ALL) -> None:
+        self._revoked[user_id] = revoked_at
+        self._bloom.add(user_id)
+
+    def discard(self, user_id: str) -> None:
+        # El filtro de Bloom no admite borrado: basta con quitarlo del diccionario
+        self._revoked.pop(user_id, None)
+
+    def apply_user_doc(self, doc: Dict[str, Any]) -> None:
+        """Aplica el estado de revocación de un documento de usuario."""
+        user_id = str(doc["_id"])
+        tokens_revoked_at = doc.get("tokens_revoked_at")
+        if not doc.get("is_active", True):
+            self.revoke(user_id)
+        elif tokens_revoked_at is not None:
+            self.revoke(user_id, revoked_at_epoch(tokens_revoked_at))
+        else:
+            self.discard(user_id)
+
+    async def refresh(self, db: AsyncIOMotorDatabase) -> int:
+        """
+        Sincroniza con MongoDB. La primera vez carga todos los usuarios revocados;
+        después solo los modificados desde la última sincronización.
+        """
+        collection = db[settings.MONGODB_USERS_COLLECTION]
+        projection = {"is_active": 1, "tokens_revoked_at": 1}
+        sync_started = datetime.utcnow()
+
+        if self._last_sync is None:
+            # Carga completa: reconstruye también el filtro de Bloom
+            query = {"$or": [{"is_active": False}, {"tokens_revoked_at": {"$exists": True}}]}
+            self._bloom = BloomFilter(self._size_bits, self._num_hashes)
+            self._revoked.clear()
+        else:
+            # Solapamiento para tolerar desfases de reloj entre workers (aplicar es idempotente)
+            since = self._last_sync - timedelta(seconds=self.SYNC_OVERLAP_SECONDS)
+            query = {"updated_at": {"$gte": since}}
+
+        applied = 0
+        async for doc in collection.find(query, projection):
+            self.apply_user_doc(doc)
+            applied += 1
+
+        self._last_sync = sync_started
+        self.refreshes += 1
+        return applied
+
+    # --- Sincronización en segundo plano ---
+
+    async def _refresh_loop(self, get_db: Callable[[], Optional[AsyncIOMotorDatabase]], interval: float) -> None:
+        while True:
+            db = get_db()
+            if db is None:
+                # Sin conexión (p. ej. MongoDB caído al arrancar): se reintenta en el siguiente ciclo
+                logger.warning("Lista de revocación sin sincronizar: no hay conexión con MongoDB.")
+            else:
+                try:
+                    await self.refresh(db)
+                except Exception as e:
+                    # Se conserva el último estado conocido y se reintenta en el siguiente ciclo
+                    logger.warning(f"No se pudo refrescar la lista de revocación: {e}")
+            await asyncio.sleep(interval)
+
+    def start(self, get_db: Callable[[], Optional[AsyncIOMotorDatabase]], interval: float) -> None:
+        """
+        Arranca la sincronización periódica. Recibe una función que devuelve la base
+        de datos actual (o None) para seguir reintentando aunque MongoDB no estuviera
+        disponible al arrancar.
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self._refresh_loop(get_db, interval))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "revoked_users": len(self._revoked),
+            "refreshes": self.refreshes,
+            "last_sync": self._last_sync.isoformat() if self._last_sync else None,
+        }
+
+
+# Instancia única por worker
+revocation_list = RevocationList(
+    size_bits=settings.REVOCATION_BLOOM_SIZE_BITS,
+    num_hashes=settings.REVOCATION_BLOOM_HASHES,
+)
+
+
+def ensure_token_not_revoked(user: UserInDB, payload: Dict[str, Any]) -> None:
+    """
+    Rechaza con 401 un token emitido antes del último cierre de sesión del
+    usuario cargado de la base de datos o de la caché de identidad (en el modo
+    sin estado lo comprueba user_from_claims con la lista de revocación).
+    """
+    if user.tokens_revoked_at is not None and issued_before(
+        payload.get("iat"), revoked_at_epoch(user.tokens_revoked_at)
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token revocado.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+def user_from_claims(payload: Dict[str, Any]) -> Optional[UserInDB]:
+    """
+    Construye el usuario autenticado a partir de los claims del token, sin I/O.
+
+    Retorna None si el modo sin estado está desactivado o si el token no trae
+    los claims de usuario (tokens emitidos antes de activar el modo), en cuyo
+    caso se sigue el camino normal contra la base de datos.
+    """
+    if not settings.AUTH_STATELESS_MODE or "email" not in payload:
+        return None
+
+    user_id = payload["sub"]
+    if revocation_list.is_revoked(user_id, payload.get("iat")):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token revocado.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    # El hash de la contraseña nunca viaja en el token: en este modo no se carga
+    return UserInDB(
+        id=user_id,
+        email=payload["email"],
+        full_name=payload.get("full_name"),
+        is_active=payload.get("is_active", True),
+        hashed_password="",
+    )
@@ -9,6 +9,7 @@ from jose import jwt, JWTError
 from passlib.context import CryptContext
 
 from config.settings import settings 
+from app.core.token_cache import token_cache
 
 # --- Configuración de Contraseña (Hashing) ---
 # Usamos argon2 que es más seguro que bcrypt y no tiene límite de 72 bytes
@@ -38,7 +39,8 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
     else:
         expire = datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire})
+    # 'iat' permite invalidar los tokens emitidos antes de una revocación
+    to_encode.update({"exp": expire, "iat": datetime.now(timezone.utc)})
     
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
@@ -69,4 +71,18 @@ def decode_access_token(token: str) -> Dict[str, Any]:
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token inválido o mal formado.",
             headers={"WWW-Authenticate": "Bearer"},
-        )
\ No newline at end of file
+        )
+
+def decode_access_token_cached(token: str) -> Dict[str, Any]:
+    """
+    Igual que decode_access_token, pero consulta primero la caché de tokens verificados.
+    Solo se cachean tokens válidos: los errores se siguen lanzando en cada petición.
+    """
+    if not settings.TOKEN_CACHE_ENABLED:
+        return decode_access_token(token)
+
+    payload = token_cache.get(token)
+    if payload is None:
+        payload = decode_access_token(token)
+        token_cache.set(token, payload)
+    return payload
\ No newline at end of file
@@ -0,0 +1,156 @@
+import json
+import uuid
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.cache import CacheBackend, InMemoryCacheBackend
+from config.settings import settings
+from schemas.task_schema import TaskInDB
+
+
+def _json_size(value: Any) -> int:
+    """Tamaño estimado de una entrada: lo que ocupa serializada en JSON."""
+    return len(json.dumps(value, default=str))
+
+
+class TaskCache:
+    """
+    Caché de tareas individuales indexada por (propietario, ID de tarea).
+
+    La usa CachedTaskRepository para servir GET /tasks/{id} sin consultar
+    MongoDB. También guarda las búsquedas sin resultado (caché negativa, con
+    un TTL más corto) para que un ID inexistente no llegue siempre a la base.
+
+    Las claves incluyen una generación por propietario: las escrituras por
+    filtro, cuyo conjunto de tareas no se conoce, cambian la generación y así
+    invalidan todas las tareas del propietario de una vez. El almacenamiento es
+    intercambiable (set_backend), como en UserCache.
+
+    Cada escritura de este worker avanza la época de escrituras del propietario:
+    una lectura de MongoDB que empezó antes solo se guarda (fill) si la época no
+    cambió, para no dejar en caché la tarea anterior a esa escritura.
+    """
+
+    KEY_PREFIX = "task:"
+    GENERATION_PREFIX = "task-gen:"
+    # Marca de "no existe" (serializable a JSON como el resto de valores)
+    MISSING = {"missing": True}
+    # Épocas de escritura repartidas por propietario (dos propietarios pueden compartir una)
+    EPOCH_SLOTS = 1024
+
+    def __init__(self, backend: CacheBackend, ttl_seconds: float, negative_ttl_seconds: float):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._epochs = [0] * self.EPOCH_SLOTS
+
+        # Contadores de observabilidad (el backend también cuenta sus lecturas de generación)
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+
+    def set_backend(self, backend: CacheBackend) -> None:
+        """Reemplaza el backend (p. ej. por uno compartido al iniciar la app)."""
+        self.backend = backend
+
+    async def _generation(self, owner_id: str) -> str:
+        # Una generación perdida (expirada o desalojada) se reemplaza por otra
+        # aleatoria, nunca por un valor fijo: las entradas viejas no reaparecen
+        key = f"{self.GENERATION_PREFIX}{owner_id}"
+        generation = await self.backend.get(key)
+        if generation is None:
+            generation = uuid.uuid4().hex[:12]
+            await self.backend.set(key, generation)
+        return generation
+
+    def _slot(self, owner_id: str) -> int:
+        return hash(owner_id) % self.EPOCH_SLOTS
+
+    def write_epoch(self, owner_id: str) -> int:
+        """Época de escrituras del propietario en este worker (se captura antes de leer de MongoDB)."""
+        return self._epochs[self._slot(owner_id)]
+
+    def _written(self, owner_id: str) -> None:
+        self._epochs[self._slot(owner_id)] += 1
+
+    async def _key(self, owner_id: str, task_id: str) -> str:
+        return f"{self.KEY_PREFIX}{owner_id}:{await self._generation(owner_id)}:{task_id}"
+
+    async def get(self, owner_id: str, task_id: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """
+        Retorna (encontrada_en_caché, datos). (True, None) significa que se sabe
+        que la tarea no existe para ese propietario.
+        """
+        data = await self.backend.get(await self._key(owner_id, task_id))
+        if data is None:
+            self.misses += 1
+            return False, None
+        if data == self.MISSING:
+            self.negative_hits += 1
+            return True, None
+        self.hits += 1
+        return True, data
+
+    # --- Escrituras (avanzan la época del propietario) ---
+
+    async def set(self, task: TaskInDB) -> None:
+        """Guarda la tarea resultante de una escritura."""
+        self._written(task.owner_id)
+        # Se guarda como dict JSON (fechas en ISO 8601) para que cualquier backend lo acepte
+        await self.backend.set(
+            await self._key(task.owner_id, task.id), task.model_dump(mode="json"), ttl_seconds=self.ttl_seconds
+        )
+
+    async def set_missing(self, owner_id: str, task_id: str) -> None:
+        """Marca como inexistente una tarea recién borrada."""
+        self._written(owner_id)
+        await self.backend.set(
+            await self._key(owner_id, task_id), self.MISSING, ttl_seconds=self.negative_ttl_seconds
+        )
+
+    async def invalidate(self, owner_id: str, task_id: str) -> None:
+        self._written(owner_id)
+        await self.backend.delete(await self._key(owner_id, task_id))
+
+    async def invalidate_owner(self, owner_id: str) -> None:
+        """Invalida todas las tareas cacheadas del propietario (nueva generación)."""
+        self._written(owner_id)
+        await self.backend.delete(f"{self.GENERATION_PREFIX}{owner_id}")
+
+    # --- Lectura a través de la caché ---
+
+    async def fill(self, owner_id: str, task_id: str, task: Optional[TaskInDB], epoch: int) -> bool:
+        """
+        Guarda lo leído de MongoDB (la tarea, o que no existe) si no hubo
+        escrituras del propietario desde 'epoch'. Retorna True si se guardó.
+        """
+        key = await self._key(owner_id, task_id)
+        if epoch != self.write_epoch(owner_id):
+            return False
+        if task is None:
+            await self.backend.set(key, self.MISSING, ttl_seconds=self.negative_ttl_seconds)
+        else:
+            await self.backend.set(key, task.model_dump(mode="json"), ttl_seconds=self.ttl_seconds)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.negative_hits + self.misses
+        return {
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "hit_ratio": round((self.hits + self.negative_hits) / lookups, 4) if lookups else 0.0,
+            "backend": self.backend.stats(),
+        }
+
+
+# Instancia única por worker
+task_cache = TaskCache(
+    backend=InMemoryCacheBackend(
+        max_size=settings.TASK_CACHE_MAX_SIZE,
+        ttl_seconds=settings.TASK_CACHE_TTL_SECONDS,
+        max_bytes=settings.TASK_CACHE_MAX_BYTES,
+        sizeof=_json_size,
+    ),
+    ttl_seconds=settings.TASK_CACHE_TTL_SECONDS,
+    negative_ttl_seconds=settings.TASK_CACHE_NEGATIVE_TTL_SECONDS,
+)
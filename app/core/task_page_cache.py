@@ -0,0 +1,67 @@
+from typing import Any, Dict, Hashable, Optional
+
+from app.core.cache import TTLCache
+from config.settings import settings
+
+
+class TaskPageCache:
+    """
+    Caché de las primeras páginas de GET /tasks, ya serializadas (bytes).
+
+    Las claves incluyen la versión del propietario (TaskStatsRepository), que
+    avanza con cada escritura de sus tareas: una página cacheada nunca se
+    invalida, simplemente deja de ser alcanzable y la desaloja el LRU o el TTL.
+    Así una lectura repetida de un listado sin cambios es una búsqueda en un
+    dict, sin MongoDB ni Pydantic.
+
+    La versión también se cachea por worker durante un TTL corto
+    (TASK_PAGE_CACHE_VERSION_TTL_SECONDS): las escrituras de este worker la
+    descartan al momento (forget_version) y las de otros workers se ven como
+    mucho tras ese TTL.
+    """
+
+    def __init__(self, max_size: int, max_bytes: int, ttl_seconds: float, version_ttl_seconds: float):
+        # (propietario, versión, forma de la consulta) -> cuerpo de la respuesta
+        self.pages = TTLCache(max_size=max_size, ttl_seconds=ttl_seconds, max_bytes=max_bytes, sizeof=len)
+        # propietario -> versión
+        self.versions = TTLCache(max_size=max_size, ttl_seconds=version_ttl_seconds)
+        # Escrituras de este worker: una versión leída de MongoDB mientras hubo
+        # alguna no se guarda (podría ser anterior a esa escritura)
+        self._writes = 0
+
+    # --- Versiones ---
+
+    def write_epoch(self) -> int:
+        return self._writes
+
+    def cached_version(self, owner_id: str) -> Optional[int]:
+        return self.versions.get(owner_id)
+
+    def set_version(self, owner_id: str, version: int, epoch: int) -> None:
+        """Guarda la versión leída si no hubo escrituras desde 'epoch'."""
+        if epoch == self._writes:
+            self.versions.set(owner_id, version)
+
+    def forget_version(self, owner_id: str) -> None:
+        self._writes += 1
+        self.versions.delete(owner_id)
+
+    # --- Páginas ---
+
+    def get(self, owner_id: str, version: int, shape: Hashable) -> Optional[bytes]:
+        return self.pages.get((owner_id, version, shape))
+
+    def set(self, owner_id: str, version: int, shape: Hashable, body: bytes) -> None:
+        self.pages.set((owner_id, version, shape), body)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"pages": self.pages.stats(), "versions": self.versions.stats()}
+
+
+# Instancia única por worker
+task_page_cache = TaskPageCache(
+    max_size=settings.TASK_PAGE_CACHE_MAX_SIZE,
+    max_bytes=settings.TASK_PAGE_CACHE_MAX_BYTES,
+    ttl_seconds=settings.TASK_PAGE_CACHE_TTL_SECONDS,
+    version_ttl_seconds=settings.TASK_PAGE_CACHE_VERSION_TTL_SECONDS,
+)
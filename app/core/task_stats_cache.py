@@ -0,0 +1,11 @@
+from app.core.cache import TTLCache
+from config.settings import settings
+
+# Estadísticas de tareas (GET /tasks/stats) por ID de propietario.
+# TaskRepository._owner_changed invalida la entrada en cada escritura de este worker;
+# el TTL acota lo que tarda en verse una escritura hecha en otro worker.
+# Instancia única por worker
+task_stats_cache = TTLCache(
+    max_size=settings.TASK_STATS_CACHE_MAX_SIZE,
+    ttl_seconds=settings.TASK_STATS_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,59 @@
+import hashlib
+import time
+from typing import Any, Dict, Optional
+
+from app.core.cache import TTLCache
+from config.settings import settings
+
+
+class VerifiedTokenCache:
+    """
+    Caché de payloads de JWT ya verificados (firma + expiración).
+
+    La clave es el SHA-256 del token, así nunca se guarda el token en claro.
+    Cada entrada expira como máximo en el 'exp' del propio token, por lo que un
+    token vencido nunca se sirve desde la caché: vuelve a pasar por jwt.decode
+    y recibe el mismo 401 que antes.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self._cache = TTLCache(max_size=max_size, ttl_seconds=ttl_seconds)
+
+    @staticmethod
+    def _digest(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """Retorna una copia del payload verificado, o None si no está en caché."""
+        payload = self._cache.get(self._digest(token))
+        return dict(payload) if payload is not None else None
+
+    def set(self, token: str, payload: Dict[str, Any]) -> None:
+        """Guarda el payload verificado hasta el 'exp' del token (o el TTL máximo)."""
+        exp = payload.get("exp")
+        if exp is None:
+            ttl = None
+        else:
+            ttl = float(exp) - time.time()
+        self._cache.set(self._digest(token), dict(payload), ttl_seconds=ttl)
+
+    def revoke(self, token: str) -> bool:
+        """Elimina un token concreto de la caché."""
+        return self._cache.delete(self._digest(token))
+
+    def revoke_subject(self, user_id: str) -> int:
+        """Elimina todos los tokens cacheados de un usuario (p. ej. al desactivarlo)."""
+        return self._cache.delete_where(lambda _, payload: payload.get("sub") == user_id)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+
+
+# Instancia única por worker
+token_cache = VerifiedTokenCache(
+    max_size=settings.TOKEN_CACHE_MAX_SIZE,
+    ttl_seconds=settings.TOKEN_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,75 @@
+from typing import Any, Dict, Optional, TYPE_CHECKING
+
+from app.core.cache import CacheBackend, InMemoryCacheBackend
+from config.settings import settings
+from schemas.user_schema import UserInDB
+
+if TYPE_CHECKING:
+    from repositories.user_repository import UserRepository
+
+
+class UserCache:
+    """
+    Caché de identidad de usuarios autenticados, indexada por ID de usuario.
+
+    Evita el 'users.find_one' de get_current_user en cada petición protegida.
+    El almacenamiento es intercambiable (set_backend) para que varios workers
+    de uvicorn puedan compartir un backend externo; por defecto es en memoria.
+    """
+
+    KEY_PREFIX = "user:"
+
+    def __init__(self, backend: CacheBackend, ttl_seconds: float):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+
+    def set_backend(self, backend: CacheBackend) -> None:
+        """Reemplaza el backend (p. ej. por uno compartido al iniciar la app)."""
+        self.backend = backend
+
+    def _key(self, user_id: str) -> str:
+        return f"{self.KEY_PREFIX}{user_id}"
+
+    async def get(self, user_id: str) -> Optional[UserInDB]:
+        data = await self.backend.get(self._key(user_id))
+        # El hash no se cachea: tras validar el token no se necesita
+        return UserInDB(**data, hashed_password="") if data is not None else None
+
+    async def set(self, user: UserInDB) -> None:
+        # Se guarda como dict JSON-serializable (fechas como texto) para que cualquier
+        # backend lo acepte, y sin el hash de la contraseña (el backend puede ser compartido)
+        data = user.model_dump(mode="json", exclude={"hashed_password"})
+        await self.backend.set(self._key(user.id), data, ttl_seconds=self.ttl_seconds)
+
+    async def invalidate(self, user_id: str) -> None:
+        """Descarta la entrada de un usuario (cambio de datos o desactivación)."""
+        await self.backend.delete(self._key(user_id))
+
+    def stats(self) -> Dict[str, Any]:
+        return self.backend.stats()
+
+
+# Instancia única por worker
+user_cache = UserCache(
+    backend=InMemoryCacheBackend(
+        max_size=settings.USER_CACHE_MAX_SIZE,
+        ttl_seconds=settings.USER_CACHE_TTL_SECONDS,
+    ),
+    ttl_seconds=settings.USER_CACHE_TTL_SECONDS,
+)
+
+
+async def get_user_cached(user_repo: "UserRepository", user_id: str) -> Optional[UserInDB]:
+    """
+    Lectura a través de la caché: si el usuario no está cacheado se busca en
+    la base de datos con el repositorio y se guarda para las siguientes peticiones.
+    """
+    if not settings.USER_CACHE_ENABLED:
+        return await user_repo.get_by_id(user_id)
+
+    user = await user_cache.get(user_id)
+    if user is None:
+        user = await user_repo.get_by_id(user_id)
+        if user is not None:
+            await user_cache.set(user)
+    return user
@@ -1,11 +1,22 @@
-from fastapi import FastAPI, APIRouter
+import asyncio
+from datetime import datetime, timedelta
+from fastapi import FastAPI, APIRouter, Request, status
+from fastapi.responses import JSONResponse
+from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
 from contextlib import asynccontextmanager
 # CRÍTICO: Importar desde el nombre de archivo correcto: 'config.settings'
 from config.settings import settings 
 # CRÍTICO: Importar las funciones de conexión de base de datos desde la ubicación correcta
-from config.database import connect_to_mongo, close_mongo_connection
+from config.database import connect_to_mongo, close_mongo_connection, get_database_instance, mongo_manager
 # Asume que tus carpetas de rutas están al mismo nivel que app/
-from routes import auth_routes, task_routes, user_routes
+from routes import auth_routes, task_routes, user_routes, metrics_routes
+from app.core.password_hasher import password_hasher
+from app.core.revocation import revocation_list
+from app.core.event_hub import event_hub
+from config.indexes import ensure_indexes, index_report
+from repositories.task_repository import TaskRepository
+from repositories.task_stats_repository import TaskStatsRepository
+from repositories.task_tombstone_repository import TaskTombstoneRepository
 
 # --- Configuración del Router Principal (Agregador) ---
 
@@ -21,15 +32,85 @@ api_router.include_router(task_routes.router)
 # 3. Rutas de Usuarios
 api_router.include_router(user_routes.router) 
 
+# 4. Métricas internas
+api_router.include_router(metrics_routes.router)
+
 
 # --- Inicialización de la Aplicación FastAPI ---
 
+async def _backfill_tasks(db):
+    """Completa campos por defecto en tareas antiguas (ver TaskRepository.backfill_completed)."""
+    try:
+        repository = TaskRepository(db)
+        modified = await repository.backfill_completed()
+        if modified:
+            print(f"INFO: {modified} tareas antiguas actualizadas con 'completed: False'.")
+        modified = await repository.backfill_wid()
+        if modified:
+            print(f"INFO: {modified} tareas antiguas incorporadas a la sincronización incremental ('wid').")
+    except Exception as e:
+        print(f"ERROR: Fallo en la migración de tareas: {e}")
+
+async def _reconcile_task_stats(db):
+    """Corrige periódicamente los desvíos de los contadores de tareas (ver TaskStatsRepository)."""
+    while True:
+        await asyncio.sleep(settings.TASK_STATS_RECONCILE_SECONDS)
+        try:
+            repaired = await TaskStatsRepository(db).reconcile_all()
+            if repaired:
+                print(f"WARNING: Contadores de tareas corregidos para {repaired} usuarios.")
+        except Exception as e:
+            print(f"ERROR: Fallo al reconciliar los contadores de tareas: {e}")
+
+async def _compact_task_tombstones(db):
+    """Compacta periódicamente las lápidas vencidas (ver TaskTombstoneRepository)."""
+    while True:
+        await asyncio.sleep(settings.TASK_TOMBSTONE_COMPACT_SECONDS)
+        try:
+            purged = await TaskTombstoneRepository(db).compact(
+                datetime.utcnow() - timedelta(days=settings.TASK_TOMBSTONE_RETENTION_DAYS), TaskStatsRepository(db)
+            )
+            if purged:
+                print(f"INFO: {purged} lápidas de tareas compactadas.")
+        except Exception as e:
+            print(f"ERROR: Fallo al compactar las lápidas de tareas: {e}")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
+    background_tasks = []
     await connect_to_mongo()
+    db = get_database_instance()
+    if db is not None:
+        # Aplica el registro de índices y avisa de los que sigan faltando
+        try:
+            await ensure_indexes(db)
+            for collection_name, report in (await index_report(db)).items():
+                if report["missing"]:
+                    print(f"WARNING: Índices faltantes en '{collection_name}': {report['missing']}")
+        except Exception as e:
+            print(f"ERROR: No se pudieron verificar los índices: {e}")
+
+        if settings.TASKS_BACKFILL_ON_STARTUP:
+            # Migración en segundo plano para no retrasar el arranque
+            background_tasks.append(asyncio.create_task(_backfill_tasks(db)))
+        if settings.TASK_STATS_RECONCILE_SECONDS > 0:
+            background_tasks.append(asyncio.create_task(_reconcile_task_stats(db)))
+        if settings.TASK_TOMBSTONE_COMPACT_SECONDS > 0:
+            background_tasks.append(asyncio.create_task(_compact_task_tombstones(db)))
+    if settings.AUTH_STATELESS_MODE:
+        # Sincroniza la lista de revocación en segundo plano (reintenta si MongoDB no está disponible)
+        revocation_list.start(get_database_instance, settings.REVOCATION_REFRESH_SECONDS)
+    # Reparto de eventos de GET /tasks/stream (ver app/core/event_hub.py)
+    await event_hub.start()
     yield
     # Shutdown
+    for task in background_tasks:
+        task.cancel()
+    await revocation_list.stop()
+    # Cierra los streams abiertos para que el servidor pueda terminar
+    await event_hub.stop()
+    password_hasher.shutdown()
     await close_mongo_connection()
 
 # Crear la instancia de la aplicación
@@ -49,4 +130,42 @@ app.include_router(api_router, prefix="/api/v1")
 @app.get("/", tags=["Health Check"], summary="Verificar estado del servidor")
 async def root():
     """Ruta simple para verificar que el servidor esté funcionando."""
-    return {"message": f"{settings.PROJECT_NAME} - API {settings.API_VERSION} is running!"}
\ No newline at end of file
+    return {"message": f"{settings.PROJECT_NAME} - API {settings.API_VERSION} is running!"}
+
+
+# --- Base de Datos no Disponible ---
+@app.exception_handler(ConnectionFailure)
+async def database_unavailable_handler(request: Request, exc: ConnectionFailure):
+    """
+    Un fallo de conexión con MongoDB responde 503 (no 500). Los errores de red
+    de un comando ya los contó el driver (ver CommandHealthListener); aquí solo
+    se cuenta para el cortocircuito el no encontrar ningún servidor, que no
+    llega a enviar comandos. Tras varios fallos seguidos get_db rechaza al instante.
+    """
+    if isinstance(exc, ServerSelectionTimeoutError):
+        mongo_manager.record_failure()
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Base de datos no disponible. Reintente más tarde."},
+        headers={"Retry-After": str(mongo_manager.breaker.retry_after())},
+    )
+
+
+# --- Ruta de Disponibilidad (Readiness) ---
+@app.get("/ready", tags=["Health Check"], summary="Verificar si el worker puede recibir tráfico")
+async def readiness():
+    """
+    Responde 503 si el circuito de MongoDB está abierto o el pool está saturado,
+    para que el balanceador deje de enviar tráfico a este worker. No hace I/O.
+    """
+    saturation = mongo_manager.pool_saturation()
+    breaker = mongo_manager.breaker.stats()
+    ready = not mongo_manager.breaker.is_open and saturation < settings.DB_READY_MAX_POOL_SATURATION
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            "status": "ready" if ready else "degraded",
+            "breaker": breaker,
+            "pool_saturation": round(saturation, 4),
+        },
+    )
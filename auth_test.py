@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Pruebas de integración del perfil (PATCH /users/me) y del cierre de sesión
+(POST /auth/logout) a través de la caché de identidad.
+Requiere el servidor en marcha (python run.py). Cubre el modo con el que se
+arrancó: con AUTH_STATELESS_MODE los tokens traen los claims del usuario y la
+revocación la aplica la lista en memoria; el modo se detecta en el propio token.
+"""
+
+import base64
+import json
+import random
+import time
+import requests
+
+BASE_URL = "http://127.0.0.1:8000/api/v1"
+PASSWORD = "TestPass123"
+
+failures = 0
+
+def check(condition, message, response=None):
+    global failures
+    if condition:
+        print(f"OK - {message}")
+    else:
+        failures += 1
+        detail = f" ({response.status_code}: {response.text[:300]})" if response is not None else ""
+        print(f"FALLO - {message}{detail}")
+    return condition
+
+def register():
+    email = f"auth_{random.randint(100000, 999999)}@example.com"
+    response = requests.post(f"{BASE_URL}/auth/register", json={
+        "email": email,
+        "password": PASSWORD,
+        "full_name": "Auth User"
+    })
+    if response.status_code != 201:
+        print(f"FALLO - Registro: {response.text}")
+        exit(1)
+    return email, response.json()["access_token"]
+
+def login(email):
+    response = requests.post(f"{BASE_URL}/auth/token", data={"username": email, "password": PASSWORD})
+    return response.json()["access_token"] if response.status_code == 200 else None
+
+def bearer(token):
+    return {"Authorization": f"Bearer {token}"}
+
+def claims(token):
+    """Payload del JWT sin verificar la firma (solo para saber qué trae)."""
+    payload = token.split(".")[1]
+    return json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+
+def me(token):
+    return requests.get(f"{BASE_URL}/users/me", headers=bearer(token))
+
+def test_profile_update(email, token, stateless):
+    print("\n=== TEST 1: ACTUALIZAR EL PERFIL ===")
+    # Primero se lee el perfil para que quede en la caché de identidad
+    check(me(token).json()["full_name"] == "Auth User", "Perfil inicial")
+
+    response = requests.patch(f"{BASE_URL}/users/me", json={"full_name": "Nombre Cambiado"}, headers=bearer(token))
+    if not check(response.status_code == 200 and response.json()["full_name"] == "Nombre Cambiado", "PATCH devuelve el perfil nuevo", response):
+        return
+    check(set(response.json()) == {"id", "email", "full_name", "is_active"}, "Sin el hash de la contraseña")
+
+    names = [me(token).json()["full_name"] for _ in range(5)]
+    if stateless:
+        # El nombre viaja en el token: los ya emitidos muestran el anterior hasta volver a iniciar sesión
+        check(set(names) == {"Auth User"}, f"Modo sin estado: el token anterior conserva el nombre ({names[0]})")
+    else:
+        check(set(names) == {"Nombre Cambiado"}, f"Las lecturas siguientes ven el cambio, no la caché ({names})")
+    check(me(login(email)).json()["full_name"] == "Nombre Cambiado", "Un inicio de sesión nuevo ve el cambio")
+
+    response = requests.patch(f"{BASE_URL}/users/me", json={}, headers=bearer(token))
+    check(response.status_code == 200 and response.json()["email"] == email, "PATCH sin campos: el perfil sin cambios", response)
+    response = requests.patch(f"{BASE_URL}/users/me", json={"full_name": "x" * 101}, headers=bearer(token))
+    check(response.status_code == 422, "Nombre demasiado largo: 422", response)
+
+def test_logout(email, token):
+    print("\n=== TEST 2: CERRAR SESIÓN ===")
+    other_device = login(email)
+    check(me(other_device).status_code == 200, "Sesión en otro dispositivo")
+    # 'iat' va en segundos enteros: un token del mismo segundo que el cierre seguiría siendo válido
+    time.sleep(1.1)
+
+    response = requests.post(f"{BASE_URL}/auth/logout", headers=bearer(token))
+    check(response.status_code == 204, "Logout: 204", response)
+    response = me(token)
+    check(response.status_code == 401, "El token usado en el logout: 401", response)
+    response = requests.get(f"{BASE_URL}/tasks/", headers=bearer(token))
+    check(response.status_code == 401, "También en el resto de la API", response)
+    response = me(other_device)
+    check(response.status_code == 401, "El token del otro dispositivo: 401", response)
+    response = requests.post(f"{BASE_URL}/auth/logout", headers=bearer(token))
+    check(response.status_code == 401, "Logout con un token revocado: 401", response)
+
+    # Volver a iniciar sesión enseguida (en el mismo segundo del cierre) funciona
+    fresh = login(email)
+    check(fresh is not None, "Login tras el logout")
+    response = me(fresh) if fresh else None
+    check(response is not None and response.status_code == 200 and response.json()["email"] == email, "El token nuevo es válido", response)
+
+def test_invalid_credentials(email):
+    print("\n=== TEST 3: CREDENCIALES INVÁLIDAS ===")
+    response = requests.post(f"{BASE_URL}/auth/token", data={"username": email, "password": "Incorrecta123"})
+    check(response.status_code == 401, "Contraseña incorrecta: 401", response)
+    response = me("no.es.un.token")
+    check(response.status_code == 401, "Token mal formado: 401", response)
+    response = requests.get(f"{BASE_URL}/users/me")
+    check(response.status_code == 401, "Sin token: 401", response)
+
+if __name__ == "__main__":
+    print("INICIANDO PRUEBAS DE PERFIL Y SESIÓN")
+    print("=" * 50)
+
+    email, token = register()
+    stateless = "email" in claims(token)
+    print(f"Modo del servidor: {'sin estado (AUTH_STATELESS_MODE)' if stateless else 'con estado'}")
+    test_profile_update(email, token, stateless)
+    test_logout(email, token)
+    test_invalid_credentials(email)
+
+    print("\n" + "=" * 50)
+    print("PRUEBAS COMPLETADAS" if not failures else f"PRUEBAS COMPLETADAS CON {failures} FALLOS")
+    print("=" * 50)
+    exit(1 if failures else 0)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark del camino de lectura de tareas: coste por tarea de convertir los
+documentos de MongoDB y serializar una página (GET /api/v1/tasks/).
+
+- antes: TaskInDB(**doc) por documento y, en FastAPI, response_model
+  (model_dump + validación de TaskListResponse + serialización JSON)
+- ahora: TypeAdapter compilado sobre la página + FastJSONResponse (TASK_TRUSTED_READS)
+
+No necesita MongoDB: los documentos se generan en memoria.
+
+Uso:
+    python bench_read_path.py [tareas_por_pagina] [repeticiones]
+"""
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+os.environ.setdefault("SECRET_KEY", "bench")
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.core.responses import FastJSONResponse, orjson
+from schemas.task_schema import TaskInDB, TaskCounts, TaskListResponse, get_task_list_adapter
+
+PAGE_SIZE = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+REPEAT = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+
+RESPONSE_ADAPTER = TypeAdapter(TaskListResponse)
+
+
+def make_docs(count):
+    """Documentos como los devuelve MongoDB (fechas UTC sin zona horaria)."""
+    now = datetime.utcnow().replace(microsecond=123000)
+    return [
+        {
+            "_id": ObjectId(),
+            "title": f"Tarea de prueba número {i}",
+            "description": "Descripción de la tarea con algo de texto " * 3,
+            "due_date": now + timedelta(days=i) if i % 2 else None,
+            "owner_id": "6650f0c2a1b2c3d4e5f60718",
+            "completed": i % 3 == 0,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(count)
+    ]
+
+
+def fresh_docs(docs):
+    # El repositorio modifica los documentos ('_id' -> 'id'): copia por iteración
+    return [dict(doc) for doc in docs]
+
+
+def page(tasks):
+    return {"tasks": tasks, "total": 1000, "counts": TaskCounts(total=1000), "page": 1, "size": PAGE_SIZE}
+
+
+# --- Antes ---
+
+def convert_before(docs):
+    tasks = []
+    for doc in docs:
+        doc["id"] = str(doc.pop("_id"))
+        tasks.append(TaskInDB(**doc))
+    return tasks
+
+
+def serialize_before(content):
+    # Lo que hace FastAPI con response_model: vuelca los modelos, valida y serializa
+    content = {key: value.model_dump() if hasattr(value, "model_dump") else value for key, value in content.items()}
+    content["tasks"] = [task.model_dump() for task in content["tasks"]]
+    validated = RESPONSE_ADAPTER.validate_python(content)
+    return JSONResponse(RESPONSE_ADAPTER.dump_python(validated, mode="json")).body
+
+
+# --- Ahora ---
+
+def convert_after(docs):
+    for doc in docs:
+        doc["id"] = str(doc.pop("_id"))
+    return get_task_list_adapter(None).validate_python(docs)
+
+
+def serialize_after(content):
+    return FastJSONResponse(TaskListResponse.model_construct(**content)).body
+
+
+def timed(func, docs):
+    func(fresh_docs(docs))  # Calentamiento
+    batches = [fresh_docs(docs) for _ in range(REPEAT)]
+    start = time.perf_counter()
+    for batch in batches:
+        func(batch)
+    return (time.perf_counter() - start) / REPEAT / len(docs) * 1e6
+
+
+def main():
+    docs = make_docs(PAGE_SIZE)
+
+    before = json.loads(serialize_before(page(convert_before(fresh_docs(docs)))))
+    after = json.loads(serialize_after(page(convert_after(fresh_docs(docs)))))
+    assert before == after, "Las respuestas no coinciden"
+    assert before == jsonable_encoder(before)
+
+    print(f"Página de {PAGE_SIZE} tareas, {REPEAT} repeticiones (orjson: {'sí' if orjson else 'no'})")
+    print(f"{'camino':<8} {'conversión':>12} {'serialización':>15} {'total':>10}   (µs por tarea)")
+
+    totals = {}
+    for name, convert, serialize in (
+        ("antes", convert_before, serialize_before),
+        ("ahora", convert_after, serialize_after),
+    ):
+        conversion = timed(convert, docs)
+        tasks = convert(fresh_docs(docs))
+        serialization = timed(lambda _: serialize(page(tasks)), docs)
+        totals[name] = conversion + serialization
+        print(f"{name:<8} {conversion:>12.2f} {serialization:>15.2f} {totals[name]:>10.2f}")
+
+    print(f"Mejora: x{totals['antes'] / totals['ahora']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
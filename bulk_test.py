@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Pruebas de integración de las operaciones masivas (/tasks/bulk y /tasks/bulk/filter).
+Requiere el servidor en marcha (python run.py).
+"""
+
+import random
+import requests
+
+from bson import ObjectId
+
+BASE_URL = "http://127.0.0.1:8000/api/v1"
+
+failures = 0
+
+def check(condition, message, response=None):
+    global failures
+    if condition:
+        print(f"OK - {message}")
+    else:
+        failures += 1
+        detail = f" ({response.status_code}: {response.text[:300]})" if response is not None else ""
+        print(f"FALLO - {message}{detail}")
+    return condition
+
+def register():
+    email = f"bulk_{random.randint(100000, 999999)}@example.com"
+    response = requests.post(f"{BASE_URL}/auth/register", json={
+        "email": email,
+        "password": "TestPass123",
+        "full_name": "Bulk User"
+    })
+    if response.status_code != 201:
+        print(f"FALLO - Registro: {response.text}")
+        exit(1)
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+def test_bulk_create(headers):
+    print("\n=== TEST 1: CREAR EN BLOQUE ===")
+    response = requests.post(f"{BASE_URL}/tasks/bulk", json={"tasks": [
+        {"title": "Bloque 1"},
+        {"title": "Bloque 2", "description": "Con descripción"},
+        # Mismo instante expresado con distinto desfase: 08:00Z
+        {"title": "Vence +02:00", "due_date": "2030-01-01T10:00:00+02:00"},
+        {"title": "Vence Z", "due_date": "2030-01-01T09:00:00Z"},
+    ]}, headers=headers)
+    print(f"Status: {response.status_code}")
+    if not check(response.status_code == 200, "Respuesta 200", response):
+        return []
+    data = response.json()
+    check(data["succeeded"] == 4 and data["failed"] == 0, f"4 creadas ({data['succeeded']}/{data['failed']})")
+    check([item["index"] for item in data["results"]] == [0, 1, 2, 3], "Resultados en el orden de la petición")
+    check(all(item["status"] == "created" and item["id"] for item in data["results"]), "Cada resultado trae su ID")
+
+    listing = requests.get(f"{BASE_URL}/tasks/", headers=headers).json()
+    check(listing["total"] == 4, f"El listado cuenta las 4 tareas (total={listing['total']})")
+    return [item["id"] for item in data["results"]]
+
+def test_bulk_update(headers, ids):
+    print("\n=== TEST 2: ACTUALIZAR EN BLOQUE ===")
+    missing_id = str(ObjectId())
+    response = requests.patch(f"{BASE_URL}/tasks/bulk", json={"tasks": [
+        {"id": ids[0], "completed": True},
+        {"id": ids[1], "title": "Bloque 2 editada"},
+        {"id": missing_id, "completed": True},
+        {"id": "no-es-un-id", "completed": True},
+    ]}, headers=headers)
+    print(f"Status: {response.status_code}")
+    if not check(response.status_code == 200, "Respuesta 200", response):
+        return
+    data = response.json()
+    statuses = [item["status"] for item in data["results"]]
+    check(statuses == ["updated", "updated", "not_found", "invalid"], f"Estado por elemento: {statuses}")
+    check(data["succeeded"] == 2 and data["failed"] == 2, "2 correctas y 2 fallidas")
+
+    task = requests.get(f"{BASE_URL}/tasks/{ids[1]}", headers=headers).json()
+    check(task["title"] == "Bloque 2 editada", "La actualización se ve al leer la tarea")
+    listing = requests.get(f"{BASE_URL}/tasks/", params={"completed": "true"}, headers=headers).json()
+    check(listing["total"] == 1, f"Una tarea completada (total={listing['total']})")
+
+def test_bulk_filter_mixed_offsets(headers):
+    print("\n=== TEST 3: ACTUALIZAR POR FILTRO (FECHAS CON DISTINTO DESFASE) ===")
+    # 10:30+02:00 = 08:30Z: incluye la tarea de las 08:00Z y excluye la de las 09:00Z
+    params = {"completed": "false", "due_before": "2030-01-01T10:30:00+02:00"}
+    listing = requests.get(f"{BASE_URL}/tasks/", params={**params, "sort": "due_date"}, headers=headers)
+    check(
+        listing.status_code == 200 and [task["title"] for task in listing.json()["tasks"]] == ["Vence +02:00"],
+        "El listado compara la fecha del filtro como instante, no como texto",
+        listing,
+    )
+
+    response = requests.patch(f"{BASE_URL}/tasks/bulk/filter", params=params, json={"completed": True}, headers=headers)
+    print(f"Status: {response.status_code}")
+    if check(response.status_code == 200, "Respuesta 200", response):
+        data = response.json()
+        check(data == {"matched": 1, "modified": 1}, f"Solo la tarea que vence antes: {data}")
+
+    # Filtro con desfase negativo que cubre ambas: 05:00-04:00 = 09:00Z (due_after es inclusivo)
+    response = requests.patch(
+        f"{BASE_URL}/tasks/bulk/filter",
+        params={"due_after": "2030-01-01T05:00:00-04:00"},
+        json={"description": "desde las 09:00Z"},
+        headers=headers,
+    )
+    check(response.status_code == 200 and response.json()["matched"] == 1, "due_after con desfase negativo", response)
+
+    response = requests.patch(f"{BASE_URL}/tasks/bulk/filter", json={}, headers=headers)
+    check(response.status_code == 400, "Sin campos a actualizar: 400", response)
+
+def test_bulk_delete(headers, ids):
+    print("\n=== TEST 4: ELIMINAR EN BLOQUE ===")
+    missing_id = str(ObjectId())
+    response = requests.delete(f"{BASE_URL}/tasks/bulk", json={"ids": [ids[0], missing_id, ids[1]]}, headers=headers)
+    print(f"Status: {response.status_code}")
+    if not check(response.status_code == 200, "Respuesta 200", response):
+        return
+    statuses = [item["status"] for item in response.json()["results"]]
+    check(statuses == ["deleted", "not_found", "deleted"], f"Estado por elemento: {statuses}")
+
+    response = requests.get(f"{BASE_URL}/tasks/{ids[0]}", headers=headers)
+    check(response.status_code == 404, "La tarea borrada ya no existe", response)
+    listing = requests.get(f"{BASE_URL}/tasks/", headers=headers).json()
+    check(listing["total"] == 2, f"Quedan 2 tareas (total={listing['total']})")
+
+def test_other_owner(ids):
+    print("\n=== TEST 5: TAREAS DE OTRO USUARIO ===")
+    other = register()
+    response = requests.delete(f"{BASE_URL}/tasks/bulk", json={"ids": ids[2:]}, headers=other)
+    statuses = [item["status"] for item in response.json()["results"]] if response.status_code == 200 else None
+    check(statuses == ["not_found", "not_found"], f"No se pueden borrar tareas ajenas: {statuses}", response)
+
+if __name__ == "__main__":
+    print("INICIANDO PRUEBAS DE OPERACIONES MASIVAS")
+    print("=" * 50)
+
+    headers = register()
+    ids = test_bulk_create(headers)
+    if ids:
+        test_bulk_update(headers, ids)
+        test_bulk_filter_mixed_offsets(headers)
+        test_bulk_delete(headers, ids)
+        test_other_owner(ids)
+
+    print("\n" + "=" * 50)
+    print("PRUEBAS COMPLETADAS" if not failures else f"PRUEBAS COMPLETADAS CON {failures} FALLOS")
+    print("=" * 50)
+    exit(1 if failures else 0)
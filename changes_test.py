@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Pruebas de integración de la sincronización incremental (GET /tasks/changes).
+Requiere el servidor en marcha (python run.py) y acceso a su MongoDB
+(variables MONGODB_* de config/settings.py, con los mismos valores por defecto)
+para simular una escritura que nunca llegó a registrarse.
+"""
+
+import os
+import random
+import requests
+from datetime import datetime
+
+from bson import ObjectId
+from pymongo import MongoClient
+
+BASE_URL = "http://127.0.0.1:8000/api/v1"
+MONGODB_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017")
+MONGODB_DATABASE = os.getenv("MONGODB_DATABASE", "task_manager_db")
+TASKS_COLLECTION = os.getenv("MONGODB_TASKS_COLLECTION", "tasks")
+
+# Debe superar TASK_CHANGES_LOG_SIZE (500) para que un token quede fuera de la ventana
+LOG_SIZE = int(os.getenv("TASK_CHANGES_LOG_SIZE", "500"))
+
+failures = 0
+
+def check(condition, message, response=None):
+    global failures
+    if condition:
+        print(f"OK - {message}")
+    else:
+        failures += 1
+        detail = f" ({response.status_code}: {response.text[:300]})" if response is not None else ""
+        print(f"FALLO - {message}{detail}")
+    return condition
+
+def register():
+    email = f"changes_{random.randint(100000, 999999)}@example.com"
+    response = requests.post(f"{BASE_URL}/auth/register", json={
+        "email": email,
+        "password": "TestPass123",
+        "full_name": "Changes User"
+    })
+    if response.status_code != 201:
+        print(f"FALLO - Registro: {response.text}")
+        exit(1)
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    owner_id = requests.get(f"{BASE_URL}/users/me", headers=headers).json()["id"]
+    return headers, owner_id
+
+def get_changes(headers, since=None, limit=100):
+    params = {"limit": limit}
+    if since is not None:
+        params["since"] = since
+    return requests.get(f"{BASE_URL}/tasks/changes", params=params, headers=headers)
+
+def sync(headers, since=None, limit=100):
+    """Sigue next_since hasta has_more=False. Retorna (cambios, último token, páginas)."""
+    changes, pages = [], 0
+    while True:
+        response = get_changes(headers, since, limit)
+        if response.status_code != 200:
+            check(False, "GET /tasks/changes", response)
+            return changes, since, pages
+        data = response.json()
+        changes += data["changes"]
+        since, pages = data["next_since"], pages + 1
+        if not data["has_more"]:
+            return changes, since, pages
+
+def create(headers, title):
+    return requests.post(f"{BASE_URL}/tasks/", json={"title": title}, headers=headers).json()["id"]
+
+def test_full_sync(headers):
+    print("\n=== TEST 1: SINCRONIZACIÓN DESDE CERO (PAGINADA) ===")
+    requests.post(f"{BASE_URL}/tasks/bulk", json={"tasks": [{"title": f"Inicial {i}"} for i in range(25)]}, headers=headers)
+    changes, token, pages = sync(headers, limit=10)
+    check(len(changes) == 25 and pages == 3, f"25 tareas en 3 páginas ({len(changes)} en {pages})")
+    check(len({change["id"] for change in changes}) == 25, "Sin repetidos entre páginas")
+    check(all(change["op"] == "upsert" and change["task"] for change in changes), "Todas como 'upsert' con la tarea")
+
+    response = get_changes(headers, token)
+    check(response.status_code == 200 and response.json()["changes"] == [], "Sin escrituras nuevas: vacío", response)
+    check(response.json()["next_since"] == token, "El token no avanza si no hay cambios")
+    return token, [change["id"] for change in changes]
+
+def test_delta(headers, token, ids):
+    print("\n=== TEST 2: CAMBIOS DESDE UN TOKEN ===")
+    new_id = create(headers, "Nueva")
+    requests.put(f"{BASE_URL}/tasks/{ids[0]}", json={"completed": True}, headers=headers)
+    requests.delete(f"{BASE_URL}/tasks/{ids[1]}", headers=headers)
+    # Un borrado de una tarea inexistente no deja lápida
+    requests.delete(f"{BASE_URL}/tasks/{ObjectId()}", headers=headers)
+    requests.delete(f"{BASE_URL}/tasks/bulk", json={"ids": ids[2:4]}, headers=headers)
+
+    changes, token, _ = sync(headers, token)
+    summary = [(change["op"], change["id"]) for change in changes]
+    expected = [("upsert", new_id), ("upsert", ids[0]), ("delete", ids[1]), ("delete", ids[2]), ("delete", ids[3])]
+    check(sorted(summary) == sorted(expected), f"Cambios esperados ({len(summary)})")
+    seqs = [change["seq"] for change in changes]
+    check(seqs == sorted(seqs) and len(set(seqs)) == 4, f"En orden de escritura, una secuencia por escritura: {seqs}")
+    updated = [change for change in changes if change["id"] == ids[0]]
+    check(bool(updated) and updated[0]["task"]["completed"] is True, "El 'upsert' trae la tarea ya modificada")
+
+    # Un mismo cambio no se vuelve a entregar
+    changes, token, _ = sync(headers, token)
+    check(changes == [], "Nada pendiente tras consumir los cambios")
+    return token
+
+def test_unsettled_write(headers, owner_id, token, db):
+    print("\n=== TEST 3: ESCRITURA SIN REGISTRAR (WORKER CAÍDO) ===")
+    # Tarea escrita por un worker que cayó antes de registrar la escritura:
+    # lleva un 'wid' que nunca llegará a la secuencia del propietario
+    now = datetime.utcnow()
+    orphan_id = db[TASKS_COLLECTION].insert_one({
+        "title": "Huérfana", "description": None, "due_date": None, "completed": False,
+        "owner_id": owner_id, "created_at": now, "updated_at": now, "wid": ObjectId(),
+    }).inserted_id
+
+    later_id = create(headers, "Posterior")
+    changes, token, _ = sync(headers, token)
+    check([change["id"] for change in changes] == [later_id], "Las escrituras posteriores se siguen entregando")
+
+    # Al volver a escribir la tarea, entra en la secuencia con la nueva escritura
+    requests.put(f"{BASE_URL}/tasks/{orphan_id}", json={"title": "Recuperada"}, headers=headers)
+    changes, token, _ = sync(headers, token)
+    check(
+        [(change["id"], change["task"]["title"]) for change in changes] == [(str(orphan_id), "Recuperada")],
+        "La tarea aparece tras su siguiente escritura",
+    )
+    return token
+
+def test_invalid_and_expired_tokens(headers, token):
+    print("\n=== TEST 4: TOKENS INVÁLIDOS Y CADUCADOS ===")
+    response = get_changes(headers, "no-es-un-token")
+    check(response.status_code == 400, "Token mal formado: 400", response)
+    response = get_changes(headers, token, limit=0)
+    check(response.status_code == 422, "limit fuera de rango: 422", response)
+
+    # Tokens ajenos: el de otro usuario no da acceso a nada suyo
+    other_headers, _ = register()
+    response = get_changes(other_headers, token)
+    check(response.status_code in (200, 400) and not response.json().get("changes"), "Token de otro usuario sin cambios", response)
+
+    print(f"Escribiendo {LOG_SIZE + 1} veces para dejar el token fuera de la ventana...")
+    task_id = create(headers, "Contador")
+    for i in range(LOG_SIZE):
+        requests.put(f"{BASE_URL}/tasks/{task_id}", json={"description": str(i)}, headers=headers)
+    response = get_changes(headers, token)
+    check(response.status_code == 410, "Token demasiado antiguo: 410", response)
+
+    changes, _, _ = sync(headers, limit=1000)
+    counted = requests.get(f"{BASE_URL}/tasks/", headers=headers).json()["total"]
+    check(len(changes) == counted, f"Tras el 410 se sincroniza desde cero ({len(changes)} de {counted})")
+
+if __name__ == "__main__":
+    print("INICIANDO PRUEBAS DE SINCRONIZACIÓN INCREMENTAL")
+    print("=" * 50)
+
+    headers, owner_id = register()
+    token, ids = test_full_sync(headers)
+    token = test_delta(headers, token, ids)
+
+    db = MongoClient(MONGODB_URI)[MONGODB_DATABASE]
+    token = test_unsettled_write(headers, owner_id, token, db)
+    test_invalid_and_expired_tokens(headers, token)
+
+    print("\n" + "=" * 50)
+    print("PRUEBAS COMPLETADAS" if not failures else f"PRUEBAS COMPLETADAS CON {failures} FALLOS")
+    print("=" * 50)
+    exit(1 if failures else 0)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Pruebas de integración de las peticiones condicionales (ETag / If-None-Match)
+en GET /tasks, /tasks/{id} y /users/me.
+Requiere el servidor en marcha (python run.py) y acceso a su MongoDB
+(variables MONGODB_* de config/settings.py, con los mismos valores por defecto)
+para simular la escritura de otro worker, que no invalida las cachés de este.
+"""
+
+import os
+import random
+import time
+import requests
+from datetime import datetime
+
+from bson import ObjectId
+from pymongo import MongoClient
+
+BASE_URL = "http://127.0.0.1:8000/api/v1"
+MONGODB_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017")
+MONGODB_DATABASE = os.getenv("MONGODB_DATABASE", "task_manager_db")
+TASKS_COLLECTION = os.getenv("MONGODB_TASKS_COLLECTION", "tasks")
+TASK_STATS_COLLECTION = os.getenv("MONGODB_TASK_STATS_COLLECTION", "task_stats")
+# Tiempo que un worker reutiliza la versión de tareas cacheada (TASK_PAGE_CACHE_VERSION_TTL_SECONDS)
+VERSION_TTL_SECONDS = float(os.getenv("TASK_PAGE_CACHE_VERSION_TTL_SECONDS", "1.0"))
+
+failures = 0
+
+def check(condition, message, response=None):
+    global failures
+    if condition:
+        print(f"OK - {message}")
+    else:
+        failures += 1
+        detail = f" ({response.status_code}: {response.text[:300]})" if response is not None else ""
+        print(f"FALLO - {message}{detail}")
+    return condition
+
+def register():
+    email = f"etag_{random.randint(100000, 999999)}@example.com"
+    response = requests.post(f"{BASE_URL}/auth/register", json={
+        "email": email,
+        "password": "TestPass123",
+        "full_name": "ETag User"
+    })
+    if response.status_code != 201:
+        print(f"FALLO - Registro: {response.text}")
+        exit(1)
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    owner_id = requests.get(f"{BASE_URL}/users/me", headers=headers).json()["id"]
+    return headers, owner_id
+
+def update_as_other_worker(db, owner_id, task_id, title):
+    """Lo que deja en MongoDB una escritura hecha por otro worker: la tarea y la versión del propietario."""
+    db[TASKS_COLLECTION].update_one(
+        {"_id": ObjectId(task_id)},
+        {"$set": {"title": title, "updated_at": datetime.utcnow(), "wid": ObjectId()}},
+    )
+    db[TASK_STATS_COLLECTION].update_one({"_id": owner_id}, {"$inc": {"version": 1}})
+
+def conditional_get(url, headers, etag):
+    return requests.get(url, headers={**headers, "If-None-Match": etag})
+
+def test_task_etag(headers, task_id):
+    print("\n=== TEST 1: ETAG DE UNA TAREA ===")
+    url = f"{BASE_URL}/tasks/{task_id}"
+    response = requests.get(url, headers=headers)
+    etag = response.headers.get("etag")
+    check(response.status_code == 200 and etag, "La respuesta trae ETag", response)
+    response = conditional_get(url, headers, etag)
+    check(response.status_code == 304 and not response.content, "Sin cambios: 304 sin cuerpo", response)
+    check(response.headers.get("etag") == etag, "El 304 repite el ETag")
+
+    partial = requests.get(url, params={"fields": "title"}, headers=headers)
+    partial_etag = partial.headers.get("etag")
+    check(partial_etag and partial_etag != etag, "Con '?fields=' el ETag es distinto", partial)
+    response = requests.get(url, params={"fields": "title"}, headers={**headers, "If-None-Match": partial_etag})
+    check(response.status_code == 304, "La copia parcial sin cambios: 304", response)
+
+    response = conditional_get(f"{BASE_URL}/tasks/{ObjectId()}", headers, etag)
+    check(response.status_code == 404, "Una tarea inexistente da 404 aunque el ETag coincida", response)
+    return etag
+
+def test_task_after_other_worker_update(headers, owner_id, task_id, etag, db):
+    print("\n=== TEST 2: TAREA MODIFICADA POR OTRO WORKER ===")
+    url = f"{BASE_URL}/tasks/{task_id}"
+    old = requests.get(url, headers=headers).json()
+    update_as_other_worker(db, owner_id, task_id, "Cambiada en otro worker")
+
+    # Este worker puede seguir sirviendo su copia en caché hasta TASK_CACHE_TTL_SECONDS,
+    # pero un 304 solo es válido si esa copia es exactamente la que enviaría
+    conditional = conditional_get(url, headers, etag)
+    served = requests.get(url, headers=headers)
+    if conditional.status_code == 304:
+        check(
+            served.headers.get("etag") == etag and served.json() == old,
+            "304: el worker sirve la misma copia que el cliente ya tiene",
+            served,
+        )
+    else:
+        check(
+            conditional.status_code == 200 and conditional.headers.get("etag") != etag
+            and conditional.json()["title"] == "Cambiada en otro worker",
+            "200: la tarea nueva con un ETag distinto",
+            conditional,
+        )
+
+    # Una escritura en este worker invalida su copia: el ETag anterior ya no vale
+    requests.put(url, json={"description": "Editada aquí"}, headers=headers)
+    response = conditional_get(url, headers, etag)
+    check(response.status_code == 200 and response.json()["title"] == "Cambiada en otro worker", "Tras escribir aquí: 200 con la tarea actual", response)
+    check(response.headers.get("etag") != etag, "Con un ETag nuevo")
+
+def test_list_after_other_worker_update(headers, owner_id, task_id, db):
+    print("\n=== TEST 3: LISTADO TRAS UNA ESCRITURA DE OTRO WORKER ===")
+    url = f"{BASE_URL}/tasks/"
+    response = requests.get(url, headers=headers)
+    etag = response.headers.get("etag")
+    check(response.status_code == 200 and etag, "El listado trae ETag", response)
+    check(conditional_get(url, headers, etag).status_code == 304, "Sin cambios: 304")
+
+    update_as_other_worker(db, owner_id, task_id, "Cambiada otra vez en otro worker")
+    # La versión del propietario se cachea VERSION_TTL_SECONDS en cada worker
+    time.sleep(VERSION_TTL_SECONDS + 0.5)
+    response = conditional_get(url, headers, etag)
+    check(response.status_code == 200, "Tras la escritura: 200, no 304", response)
+    titles = [task["title"] for task in response.json()["tasks"]] if response.status_code == 200 else []
+    check("Cambiada otra vez en otro worker" in titles, "El listado trae la tarea actual (sin página cacheada antigua)")
+
+    # Mismo listado con otros parámetros: ETag distinto
+    other = requests.get(url, params={"size": 5}, headers=headers).headers.get("etag")
+    check(other and other != response.headers.get("etag"), "El ETag depende de la página pedida")
+
+def test_profile_etag(headers):
+    print("\n=== TEST 4: ETAG DEL PERFIL ===")
+    url = f"{BASE_URL}/users/me"
+    response = requests.get(url, headers=headers)
+    etag = response.headers.get("etag")
+    check(etag and conditional_get(url, headers, etag).status_code == 304, "Perfil sin cambios: 304")
+    requests.patch(url, json={"full_name": "Nombre nuevo"}, headers=headers)
+    response = conditional_get(url, headers, etag)
+    check(response.status_code == 200 and response.json()["full_name"] == "Nombre nuevo", "Perfil modificado: 200", response)
+
+if __name__ == "__main__":
+    print("INICIANDO PRUEBAS DE PETICIONES CONDICIONALES")
+    print("=" * 50)
+
+    headers, owner_id = register()
+    task_id = requests.post(f"{BASE_URL}/tasks/", json={"title": "Con ETag"}, headers=headers).json()["id"]
+    db = MongoClient(MONGODB_URI)[MONGODB_DATABASE]
+
+    etag = test_task_etag(headers, task_id)
+    test_task_after_other_worker_update(headers, owner_id, task_id, etag, db)
+    test_list_after_other_worker_update(headers, owner_id, task_id, db)
+    test_profile_etag(headers)
+
+    print("\n" + "=" * 50)
+    print("PRUEBAS COMPLETADAS" if not failures else f"PRUEBAS COMPLETADAS CON {failures} FALLOS")
+    print("=" * 50)
+    exit(1 if failures else 0)
@@ -1,64 +1,364 @@
-from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
-from typing import AsyncGenerator, Optional
-from fastapi import Depends
+import asyncio
+import importlib.util
+from contextlib import asynccontextmanager
+from typing import Any, AsyncGenerator, AsyncIterator, Callable, Dict, List, Optional
+
+from fastapi import HTTPException, status
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorClientSession, AsyncIOMotorDatabase
+from pymongo import ReadPreference, monitoring
+from pymongo.errors import ConnectionFailure
 
 # Importamos las configuraciones creadas en config/settings.py
 from config.settings import settings
+from app.core.cache import TTLCache
+from app.core.circuit_breaker import CircuitBreaker
+
+# Preferencias de lectura admitidas en MONGODB_READ_PREFERENCE
+READ_PREFERENCES = {
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST,
+}
+
+# Compresores de red y el módulo opcional que necesita cada uno (zlib viene con Python)
+_COMPRESSOR_MODULES = {"zstd": "zstandard", "snappy": "snappy", "zlib": None}
+
+
+def _available_compressors(configured: str) -> List[str]:
+    """Compresores configurados cuyo módulo está instalado, en el orden de preferencia dado."""
+    available = []
+    for name in (item.strip() for item in configured.split(",")):
+        if name not in _COMPRESSOR_MODULES:
+            continue
+        module = _COMPRESSOR_MODULES[name]
+        if module is None or importlib.util.find_spec(module) is not None:
+            available.append(name)
+    return available
+
+
+def _subclass_names(cls: type) -> frozenset:
+    names = {cls.__name__}
+    for subclass in cls.__subclasses__():
+        names |= _subclass_names(subclass)
+    return frozenset(names)
+
+
+# Errores de red del driver ('errtype' de los eventos de comandos fallidos)
+_CONNECTION_ERRORS = _subclass_names(ConnectionFailure)
+
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """Contadores del pool de conexiones del driver (todas las réplicas de este worker)."""
+
+    def __init__(self, on_connection_error: Optional[Callable[[], None]] = None):
+        # Se llama cuando no se pudo abrir una conexión para una operación
+        self._on_connection_error = on_connection_error
+        self.created = 0
+        self.closed = 0
+        self.checkout_started = 0
+        self.checked_out = 0
+        self.checked_in = 0
+        self.checkout_failed = 0
+        self.pool_cleared = 0
+
+    def pool_created(self, event): pass
+    def pool_ready(self, event): pass
+    def pool_cleared(self, event): self.pool_cleared += 1
+    def pool_closed(self, event): pass
+    def connection_created(self, event): self.created += 1
+    def connection_ready(self, event): pass
+    def connection_closed(self, event): self.closed += 1
+    def connection_check_out_started(self, event): self.checkout_started += 1
+    def connection_check_out_failed(self, event):
+        self.checkout_failed += 1
+        if event.reason == monitoring.ConnectionCheckOutFailedReason.CONN_ERROR and self._on_connection_error:
+            self._on_connection_error()
+    def connection_checked_out(self, event): self.checked_out += 1
+    def connection_checked_in(self, event): self.checked_in += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "open": self.created - self.closed,
+            "in_use": self.checked_out - self.checked_in,
+            # Peticiones esperando una conexión libre (pool saturado)
+            "waiting": self.checkout_started - self.checked_out - self.checkout_failed,
+            "created": self.created,
+            "checkout_failed": self.checkout_failed,
+            "pool_cleared": self.pool_cleared,
+        }
+
+
+class CommandHealthListener(monitoring.CommandListener):
+    """
+    Informa al cortocircuito del resultado de cada comando enviado a MongoDB:
+    un error de red es un fallo y cualquier respuesta del servidor (también un
+    error como una clave duplicada) es un éxito. Así solo cuentan las
+    peticiones que de verdad usaron la base de datos.
+    """
+
+    def __init__(self, on_success: Callable[[], None], on_failure: Callable[[], None]):
+        self._on_success = on_success
+        self._on_failure = on_failure
+
+    def started(self, event): pass
+
+    def succeeded(self, event):
+        self._on_success()
+
+    def failed(self, event):
+        if event.failure.get("errtype") in _CONNECTION_ERRORS:
+            self._on_failure()
+        else:
+            self._on_success()
+
+
+class MongoClientManager:
+    """
+    Dueño único del cliente de MongoDB de este worker.
+
+    Configura el pool, la compresión y la preferencia de lectura desde Settings,
+    precalienta el pool al arrancar y expone sus estadísticas. Las consultas de
+    solo lectura pueden ir a 'read_database' (p. ej. secondaryPreferred);
+    causal_session() encadena las peticiones de cada usuario atendidas por este
+    worker en sesiones con consistencia causal.
+
+    Si MongoDB deja de responder, el cortocircuito (breaker) hace que get_db
+    falle al instante con 503 en lugar de esperar serverSelectionTimeoutMS en
+    cada petición, y un sondeo en segundo plano lo cierra cuando vuelve.
+    """
+
+    # Cuánto se recuerda el último tiempo de operación de un usuario (en memoria de cada worker)
+    CAUSAL_TIMES_TTL_SECONDS = 300
+    CAUSAL_TIMES_MAX_SIZE = 10_000
 
-# Variable global para el cliente de MongoDB
-client: Optional[AsyncIOMotorClient] = None
+    def __init__(self):
+        self.client: Optional[AsyncIOMotorClient] = None
+        # Los eventos del driver llegan desde sus hilos: se pasan al event loop
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.pool_listener = PoolStatsListener(on_connection_error=self._driver_failure)
+        self.command_listener = CommandHealthListener(self._driver_success, self._driver_failure)
+        # ID de propietario -> ($clusterTime, operationTime) de su última petición
+        self._causal_times = TTLCache(self.CAUSAL_TIMES_MAX_SIZE, self.CAUSAL_TIMES_TTL_SECONDS)
+        self.breaker = CircuitBreaker(settings.DB_BREAKER_FAILURE_THRESHOLD)
+        self._probe_task: Optional[asyncio.Task] = None
+
+    # --- Ciclo de vida ---
+
+    def _client_options(self) -> Dict[str, Any]:
+        options: Dict[str, Any] = {
+            "maxPoolSize": settings.MONGODB_MAX_POOL_SIZE,
+            "minPoolSize": settings.MONGODB_MIN_POOL_SIZE,
+            "maxIdleTimeMS": settings.MONGODB_MAX_IDLE_TIME_MS,
+            "serverSelectionTimeoutMS": settings.MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+            "uuidRepresentation": "standard",  # Recomendado para FastAPI/Pydantic
+            "event_listeners": [self.pool_listener, self.command_listener],
+        }
+        compressors = _available_compressors(settings.MONGODB_COMPRESSORS)
+        if compressors:
+            options["compressors"] = ",".join(compressors)
+        return options
+
+    async def connect(self) -> None:
+        """Crea el cliente, verifica la conexión y precalienta el pool."""
+        self._loop = asyncio.get_running_loop()
+        print(f"INFO: Intentando conectar a MongoDB en {settings.MONGODB_URI}...")
+        try:
+            self.client = AsyncIOMotorClient(settings.MONGODB_URI, **self._client_options())
+            # Intenta una conexión para verificar que el servidor esté disponible
+            await self.client.admin.command('ping')
+            await self.warm_pool()
+            print(f"INFO: Conexión a MongoDB exitosa a la base de datos '{settings.MONGODB_DATABASE}'.")
+        except Exception as e:
+            print(f"ERROR: No se pudo conectar a MongoDB. Asegúrate de que el servidor esté corriendo.")
+            print(f"Detalles del error: {e}")
+            # Se arranca con el circuito abierto: el sondeo detectará cuándo vuelve
+            self.open_circuit()
+
+    async def warm_pool(self) -> None:
+        """
+        Abre conexiones antes de recibir tráfico: pings concurrentes obligan al
+        pool a crearlas ya, en lugar de pagar el handshake en las primeras peticiones.
+        """
+        connections = min(settings.MONGODB_WARMUP_CONNECTIONS, settings.MONGODB_MAX_POOL_SIZE)
+        if self.client is None or connections <= 0:
+            return
+        await asyncio.gather(*(self.client.admin.command('ping') for _ in range(connections)))
+
+    async def close(self) -> None:
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            self._probe_task = None
+        if self.client:
+            self.client.close()
+            self.client = None
+            print("INFO: Conexión a MongoDB cerrada.")
+
+    # --- Cortocircuito ---
+
+    def record_success(self) -> None:
+        self.breaker.record_success()
+
+    def _call_in_loop(self, callback: Callable[[], None]) -> None:
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(callback)
+        except RuntimeError:
+            pass  # Loop cerrándose (apagado)
+
+    def _driver_success(self) -> None:
+        # Solo hace falta avisar si hay fallos que reiniciar (evita despertar al loop en cada comando)
+        if self.breaker.has_failures:
+            self._call_in_loop(self.record_success)
+
+    def _driver_failure(self) -> None:
+        self._call_in_loop(self.record_failure)
+
+    def record_failure(self) -> None:
+        """Registra un fallo de conexión; si abre el circuito, empieza a sondear."""
+        if self.breaker.record_failure():
+            print(f"WARNING: MongoDB no responde: circuito abierto tras {self.breaker.failure_threshold} fallos seguidos.")
+            self.open_circuit()
+
+    def open_circuit(self) -> None:
+        """Abre el circuito (si no lo estaba) y arranca el sondeo en segundo plano."""
+        self.breaker.open()
+        self._loop = asyncio.get_running_loop()
+        if self._probe_task is None or self._probe_task.done():
+            self._probe_task = asyncio.create_task(self._probe_loop())
+
+    async def _probe_loop(self) -> None:
+        """Hace ping con espera exponencial hasta que MongoDB responde y cierra el circuito."""
+        delay = settings.DB_BREAKER_PROBE_INITIAL_SECONDS
+        while self.breaker.is_open:
+            self.breaker.schedule_retry(delay)
+            await asyncio.sleep(delay)
+            try:
+                if self.client is None:
+                    self.client = AsyncIOMotorClient(settings.MONGODB_URI, **self._client_options())
+                await self.client.admin.command('ping')
+            except Exception:
+                delay = min(delay * 2, settings.DB_BREAKER_PROBE_MAX_SECONDS)
+                continue
+            self.breaker.close()
+            print("INFO: MongoDB vuelve a responder: circuito cerrado.")
+
+    def pool_saturation(self) -> float:
+        """Fracción del pool en uso (peticiones en espera incluidas)."""
+        pool = self.pool_listener.stats()
+        return (pool["in_use"] + pool["waiting"]) / settings.MONGODB_MAX_POOL_SIZE
+
+    # --- Acceso a la base de datos ---
+
+    @property
+    def database(self) -> Optional[AsyncIOMotorDatabase]:
+        """Base de datos con lecturas en el primario (escrituras y lecturas previas a escribir)."""
+        if self.client is None:
+            return None
+        return self.client[settings.MONGODB_DATABASE]
+
+    @property
+    def routes_reads(self) -> bool:
+        """True si las lecturas pueden ir a un nodo distinto del primario."""
+        return settings.MONGODB_READ_PREFERENCE != "primary"
+
+    @property
+    def read_database(self) -> Optional[AsyncIOMotorDatabase]:
+        """Base de datos para consultas de solo lectura, con MONGODB_READ_PREFERENCE."""
+        if self.client is None or not self.routes_reads:
+            return self.database
+        return self.client.get_database(
+            settings.MONGODB_DATABASE,
+            read_preference=READ_PREFERENCES[settings.MONGODB_READ_PREFERENCE],
+        )
+
+    @asynccontextmanager
+    async def causal_session(self, owner_id: str) -> AsyncIterator[Optional[AsyncIOMotorClientSession]]:
+        """
+        Sesión con consistencia causal para las operaciones de un usuario.
+
+        La sesión parte del último tiempo de operación del usuario conocido por
+        este worker, así que una lectura en un secundario espera a que este haya
+        aplicado las escrituras anteriores del usuario hechas en este mismo
+        worker (aunque fueran en otra petición). Los tiempos no se comparten
+        entre workers: una escritura atendida por otro worker puede no verse
+        todavía. Si todas las lecturas van al primario no hace falta sesión y se
+        devuelve None.
+        """
+        if self.client is None or not self.routes_reads or not settings.MONGODB_CAUSAL_SESSIONS:
+            yield None
+            return
+
+        async with await self.client.start_session(causal_consistency=True) as session:
+            times = self._causal_times.get(owner_id)
+            if times is not None:
+                session.advance_cluster_time(times[0])
+                session.advance_operation_time(times[1])
+            try:
+                yield session
+            finally:
+                if session.cluster_time is not None and session.operation_time is not None:
+                    self._causal_times.set(owner_id, (session.cluster_time, session.operation_time))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "connected": self.client is not None,
+            "max_pool_size": settings.MONGODB_MAX_POOL_SIZE,
+            "min_pool_size": settings.MONGODB_MIN_POOL_SIZE,
+            "compressors": _available_compressors(settings.MONGODB_COMPRESSORS),
+            "read_preference": settings.MONGODB_READ_PREFERENCE,
+            "pool": self.pool_listener.stats(),
+            "pool_saturation": round(self.pool_saturation(), 4),
+            "breaker": self.breaker.stats(),
+            "causal_sessions_tracked": len(self._causal_times),
+        }
+
+
+# Instancia única por worker
+mongo_manager = MongoClientManager()
 
 # --- Funciones de Ciclo de Vida (Startup/Shutdown) ---
 
 async def connect_to_mongo():
     """Establece la conexión al inicio del servidor."""
-    global client
-    print(f"INFO: Intentando conectar a MongoDB en {settings.MONGODB_URI}...")
-    try:
-        client = AsyncIOMotorClient(
-            settings.MONGODB_URI,
-            serverSelectionTimeoutMS=5000, # 5 segundos de timeout
-            uuidRepresentation="standard" # Recomendado para FastAPI/Pydantic
-        )
-        # Intenta una conexión para verificar que el servidor esté disponible
-        await client.admin.command('ping')
-        print(f"INFO: Conexión a MongoDB exitosa a la base de datos '{settings.MONGODB_DATABASE}'.")
-    except Exception as e:
-        print(f"ERROR: No se pudo conectar a MongoDB. Asegúrate de que el servidor esté corriendo.")
-        print(f"Detalles del error: {e}")
-        # En una aplicación real, se podría detener el servicio aquí
-        # raise Exception("Fallo en la conexión a la base de datos")
+    await mongo_manager.connect()
 
 async def close_mongo_connection():
     """Cierra la conexión al apagar el servidor."""
-    global client
-    if client:
-        client.close()
-        print("INFO: Conexión a MongoDB cerrada.")
+    await mongo_manager.close()
+
+def get_database_instance() -> Optional[AsyncIOMotorDatabase]:
+    """Retorna la base de datos configurada, o None si no hay conexión (tareas de fondo)."""
+    return mongo_manager.database
 
 # --- Dependencia de FastAPI ---
 
+def _database_unavailable() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Base de datos no disponible. Reintente más tarde.",
+        headers={"Retry-After": str(mongo_manager.breaker.reject())},
+    )
+
 async def get_db() -> AsyncGenerator[AsyncIOMotorDatabase, None]:
     """
     Función de dependencia para inyectar la base de datos a las rutas de FastAPI.
+    Con el circuito abierto falla al instante con 503 (no reconecta en la petición).
     """
-    global client
-    if client is None:
-        # En caso de que la conexión inicial fallara o no se haya llamado connect_to_mongo
-        await connect_to_mongo() 
-        if client is None:
-             raise Exception("Cliente de MongoDB no disponible.")
+    if mongo_manager.client is None and not mongo_manager.breaker.is_open:
+        # No se llamó a connect_to_mongo: se abre el circuito y el sondeo conectará
+        mongo_manager.open_circuit()
+    if mongo_manager.breaker.is_open:
+        raise _database_unavailable()
 
     # El cliente de motor es un objeto Thread-safe, se puede usar en la dependencia
-    # Retorna la base de datos específica configurada
-    db = client[settings.MONGODB_DATABASE]
-    
-    try:
-        yield db
-    finally:
-        # No cerramos la conexión aquí, sino al apagar el servidor
-        pass
-
-# Renombramos get_db a get_database por si el código antiguo lo usaba, pero 
+    # Retorna la base de datos específica configurada.
+    # Éxitos y fallos los registra el driver por cada comando (CommandHealthListener)
+    yield mongo_manager.database
+
+# Renombramos get_db a get_database por si el código antiguo lo usaba, pero
 # se recomienda usar solo get_db para evitar confusiones.
-get_database = get_db
\ No newline at end of file
+get_database = get_db
@@ -0,0 +1,105 @@
+import logging
+from typing import Any, Dict, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+USERS_COLLECTION = settings.MONGODB_USERS_COLLECTION
+TASKS_COLLECTION = settings.MONGODB_TASKS_COLLECTION
+TASK_TOMBSTONES_COLLECTION = settings.MONGODB_TASK_TOMBSTONES_COLLECTION
+
+# --- Registro Declarativo de Índices ---
+# Cada colección declara los índices que sus consultas necesitan. Es la única
+# fuente de verdad: se aplica al arrancar y se usa para detectar desvíos.
+INDEX_REGISTRY: Dict[str, List[IndexModel]] = {
+    USERS_COLLECTION: [
+        # get_by_email / login, y garantiza la unicidad en el registro
+        IndexModel([("email", ASCENDING)], unique=True, name="email_unique"),
+        # Sincronización incremental de la lista de revocación
+        IndexModel([("updated_at", ASCENDING)], name="updated_at"),
+    ],
+    TASKS_COLLECTION: [
+        # get_all_tasks / get_tasks_after: filtro por propietario + orden por
+        # fecha de creación, con _id como desempate para la paginación por cursor
+        IndexModel(
+            [("owner_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="owner_created_at_id",
+        ),
+        # Orden por última modificación
+        IndexModel(
+            [("owner_id", ASCENDING), ("updated_at", DESCENDING), ("_id", DESCENDING)],
+            name="owner_updated_at_id",
+        ),
+        # Filtros y orden por fecha de vencimiento (solo tareas que la tienen)
+        IndexModel(
+            [("owner_id", ASCENDING), ("due_date", ASCENDING), ("_id", ASCENDING)],
+            name="owner_due_date_id_partial",
+            partialFilterExpression={"due_date": {"$exists": True}},
+        ),
+        # Filtro por estado de completado, manteniendo el orden por creación
+        IndexModel(
+            [("owner_id", ASCENDING), ("completed", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="owner_completed_created_at_id_partial",
+            partialFilterExpression={"completed": {"$exists": True}},
+        ),
+        # GET /tasks/changes: tareas del propietario por escritura ('wid'), en orden (wid, _id)
+        IndexModel([("owner_id", ASCENDING), ("wid", ASCENDING), ("_id", ASCENDING)], name="owner_wid_id"),
+    ],
+    TASK_TOMBSTONES_COLLECTION: [
+        # GET /tasks/changes: borrados del propietario por escritura ('wid')
+        IndexModel([("owner_id", ASCENDING), ("wid", ASCENDING), ("task_id", ASCENDING)], name="owner_wid_task_id"),
+        # Compactación de las lápidas vencidas
+        IndexModel([("deleted_at", ASCENDING)], name="deleted_at"),
+    ],
+}
+
+
+async def ensure_indexes(db: AsyncIOMotorDatabase) -> None:
+    """
+    Crea los índices declarados. Es idempotente: un índice que ya existe con la
+    misma definición no hace nada. Si uno existe con opciones distintas se
+    registra el error y se continúa con el resto.
+    """
+    for collection_name, indexes in INDEX_REGISTRY.items():
+        try:
+            await db[collection_name].create_indexes(indexes)
+        except OperationFailure as e:
+            logger.error(f"No se pudieron crear los índices de '{collection_name}': {e}")
+
+
+async def index_report(db: AsyncIOMotorDatabase) -> Dict[str, Any]:
+    """
+    Compara los índices declarados con los existentes en cada colección.
+
+    - missing: declarados pero no presentes.
+    - undeclared: presentes pero fuera del registro (sin contar '_id_').
+    - unused: declarados sin accesos según $indexStats (desde el último reinicio del servidor).
+    """
+    report: Dict[str, Any] = {}
+    for collection_name, indexes in INDEX_REGISTRY.items():
+        collection = db[collection_name]
+        declared = {index.document["name"] for index in indexes}
+        existing = set((await collection.index_information()).keys())
+
+        # $indexStats requiere permisos de monitorización: si falla, el uso queda como desconocido
+        usage: Optional[Dict[str, int]] = {}
+        try:
+            async for stat in collection.aggregate([{"$indexStats": {}}]):
+                usage[stat["name"]] = stat.get("accesses", {}).get("ops", 0)
+        except OperationFailure as e:
+            logger.warning(f"$indexStats no disponible para '{collection_name}': {e}")
+            usage = None
+
+        present = sorted(declared & existing)
+        report[collection_name] = {
+            "missing": sorted(declared - existing),
+            "undeclared": sorted(existing - declared - {"_id_"}),
+            "unused": None if usage is None else [name for name in present if usage.get(name, 0) == 0],
+            "accesses": None if usage is None else {name: usage.get(name, 0) for name in present},
+        }
+    return report
@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field
-from typing import Optional
+from typing import Literal, Optional
 import os
 
 # NOTA: Ajustar la ruta base si es necesario. Asumo que '.env' está en la raíz del proyecto.
@@ -23,6 +23,106 @@ class Settings(BaseSettings):
     MONGODB_DATABASE: str = Field("task_manager_db", description="Nombre de la base de datos a usar.")
     MONGODB_USERS_COLLECTION: str = Field("users", description="Nombre de la colección de usuarios.")
     MONGODB_TASKS_COLLECTION: str = Field("tasks", description="Nombre de la colección de tareas.")
+    MONGODB_TASK_STATS_COLLECTION: str = Field("task_stats", description="Nombre de la colección de contadores de tareas por usuario.")
+    MONGODB_TASK_TOMBSTONES_COLLECTION: str = Field("task_tombstones", description="Nombre de la colección de lápidas de tareas borradas (sincronización incremental).")
+
+    # --- Pool de Conexiones y Lecturas de MongoDB ---
+    MONGODB_MAX_POOL_SIZE: int = Field(100, description="Conexiones máximas por servidor en el pool de cada worker.")
+    MONGODB_MIN_POOL_SIZE: int = Field(10, description="Conexiones que el pool mantiene abiertas aunque estén ociosas.")
+    MONGODB_MAX_IDLE_TIME_MS: int = Field(60_000, description="Tiempo ocioso tras el que se cierra una conexión del pool.")
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS: int = Field(5000, description="Espera máxima para encontrar un servidor disponible.")
+    MONGODB_WARMUP_CONNECTIONS: int = Field(10, description="Conexiones que se abren al arrancar (0 para no precalentar).")
+    # Se usan los que estén instalados, en este orden (zstd: 'zstandard', snappy: 'python-snappy')
+    MONGODB_COMPRESSORS: str = Field("zstd,snappy,zlib", description="Compresores de red preferidos, separados por comas.")
+    MONGODB_READ_PREFERENCE: Literal["primary", "primaryPreferred", "secondary", "secondaryPreferred", "nearest"] = Field(
+        "primary", description="Preferencia de lectura para consultas de solo lectura (listados, exportación, estadísticas)."
+    )
+    MONGODB_CAUSAL_SESSIONS: bool = Field(True, description="Con lecturas fuera del primario, usa sesiones causales para que cada usuario lea las escrituras que hizo en el mismo worker.")
+
+    # --- Métricas Internas ---
+    # Sin token configurado, /metrics responde 404
+    METRICS_TOKEN: Optional[str] = Field(None, description="Token compartido que exige /metrics en la cabecera 'X-Metrics-Token'.")
+
+    # --- Cortocircuito de MongoDB ---
+    DB_BREAKER_FAILURE_THRESHOLD: int = Field(5, description="Fallos de conexión seguidos que abren el circuito (503 inmediato).")
+    DB_BREAKER_PROBE_INITIAL_SECONDS: float = Field(0.5, description="Espera antes del primer sondeo con el circuito abierto.")
+    DB_BREAKER_PROBE_MAX_SECONDS: float = Field(30.0, description="Espera máxima entre sondeos (crece de forma exponencial).")
+    DB_READY_MAX_POOL_SATURATION: float = Field(0.9, description="Fracción del pool en uso a partir de la cual /ready responde 503.")
+
+    # --- Agrupación de Búsquedas por ID ---
+    ID_BATCH_ENABLED: bool = Field(True, description="Agrupa las búsquedas por ID concurrentes (usuarios y tareas) en consultas $in.")
+    ID_BATCH_WINDOW_MS: float = Field(1.0, description="Ventana en la que se acumulan búsquedas antes de enviar el lote (0: siguiente vuelta del event loop).")
+    ID_BATCH_MAX_SIZE: int = Field(100, description="IDs máximos por lote; al alcanzarlo se envía sin esperar la ventana.")
+
+    # --- Caché de Tokens Verificados ---
+    TOKEN_CACHE_ENABLED: bool = Field(True, description="Cachea los payloads de JWT ya verificados.")
+    TOKEN_CACHE_MAX_SIZE: int = Field(10_000, description="Número máximo de tokens en caché (LRU).")
+    TOKEN_CACHE_TTL_SECONDS: int = Field(300, description="TTL máximo de un token en caché (nunca supera su 'exp').")
+
+    # --- Caché de Usuarios Autenticados ---
+    USER_CACHE_ENABLED: bool = Field(True, description="Cachea el usuario autenticado para evitar un find_one por petición.")
+    USER_CACHE_MAX_SIZE: int = Field(10_000, description="Número máximo de usuarios en caché (LRU).")
+    # Con el backend en memoria, es el tiempo máximo que otro worker puede ver datos viejos
+    USER_CACHE_TTL_SECONDS: int = Field(60, description="TTL de un usuario en caché.")
+
+    # --- Pool de Hashing de Contraseñas (Argon2) ---
+    PASSWORD_HASH_WORKERS: int = Field(4, description="Hilos dedicados a calcular/verificar hashes Argon2.")
+    PASSWORD_HASH_MAX_QUEUE: int = Field(64, description="Operaciones en espera antes de responder 503.")
+
+    # --- Autenticación sin Estado (claims de usuario en el JWT) ---
+    AUTH_STATELESS_MODE: bool = Field(False, description="Incluye email/full_name/is_active en el token y autentica sin consultar 'users'.")
+    REVOCATION_REFRESH_SECONDS: int = Field(5, description="Intervalo de sincronización de la lista de revocación con MongoDB.")
+    REVOCATION_BLOOM_SIZE_BITS: int = Field(1 << 20, description="Tamaño en bits del filtro de Bloom de revocación.")
+    REVOCATION_BLOOM_HASHES: int = Field(7, description="Número de funciones hash del filtro de Bloom.")
+
+    # --- Consultas de Tareas ---
+    TASK_QUERY_STRICT_INDEXES: bool = Field(False, description="Rechaza (400) los listados que ningún índice declarado puede servir; si no, solo avisa en el log.")
+    TASKS_BACKFILL_ON_STARTUP: bool = Field(True, description="Completa 'completed: False' y 'wid' en tareas antiguas al arrancar (en segundo plano).")
+    TASK_STATS_RECONCILE_SECONDS: int = Field(3600, description="Intervalo del job que corrige desvíos en los contadores de tareas (0 lo desactiva).")
+    TASK_STATS_CACHE_MAX_SIZE: int = Field(10_000, description="Usuarios con estadísticas de tareas en caché (LRU).")
+    # Acota también cuánto tarda en reflejarse una tarea que vence sin que haya escrituras
+    TASK_STATS_CACHE_TTL_SECONDS: int = Field(60, description="TTL de las estadísticas de tareas en caché.")
+    TASK_CACHE_ENABLED: bool = Field(True, description="Cachea las tareas leídas por ID (GET /tasks/{id}).")
+    TASK_CACHE_MAX_SIZE: int = Field(50_000, description="Número máximo de entradas en la caché de tareas (LRU).")
+    TASK_CACHE_MAX_BYTES: int = Field(64 * 1024 * 1024, description="Presupuesto de memoria de la caché de tareas (tamaño estimado en JSON).")
+    TASK_CACHE_TTL_SECONDS: int = Field(60, description="TTL de una tarea en caché (acota lo que tarda en verse una escritura de otro worker).")
+    TASK_CACHE_NEGATIVE_TTL_SECONDS: int = Field(10, description="TTL de las búsquedas sin resultado en caché.")
+    TASK_PAGE_CACHE_ENABLED: bool = Field(True, description="Cachea las primeras páginas de GET /tasks ya serializadas (requiere TASK_TRUSTED_READS).")
+    TASK_PAGE_CACHE_MAX_PAGE: int = Field(3, description="Páginas (modo page/size) que se cachean; en modo cursor solo la primera.")
+    TASK_PAGE_CACHE_MAX_SIZE: int = Field(10_000, description="Número máximo de páginas en caché (LRU).")
+    TASK_PAGE_CACHE_MAX_BYTES: int = Field(64 * 1024 * 1024, description="Presupuesto de memoria de la caché de páginas (bytes de las respuestas).")
+    TASK_PAGE_CACHE_TTL_SECONDS: int = Field(60, description="TTL de una página en caché.")
+    # Acota lo que tarda en verse en este worker una escritura hecha en otro
+    TASK_PAGE_CACHE_VERSION_TTL_SECONDS: float = Field(1.0, description="TTL de la versión de tareas por propietario cacheada en el worker.")
+    ETAG_ENABLED: bool = Field(True, description="ETag e If-None-Match (304 Not Modified) en GET /tasks, /tasks/{id} y /users/me.")
+    # Respuestas por usuario: ninguna caché compartida debe guardarlas, y el cliente revalida con el ETag
+    HTTP_CACHE_CONTROL: str = Field("private, no-cache", description="Cache-Control de las respuestas con ETag.")
+    EXPORT_BATCH_SIZE: int = Field(1000, description="Documentos por lote del cursor al exportar tareas (memoria por petición).")
+    # Las tareas leídas ya se validaron al convertirlas en el repositorio
+    TASK_TRUSTED_READS: bool = Field(True, description="Serializa los listados y lecturas de tareas con orjson (si está instalado) sin revalidar contra el response_model.")
+
+    # --- Sincronización Incremental (GET /tasks/changes) ---
+    TASK_CHANGES_MAX_LIMIT: int = Field(1000, description="Máximo de cambios por respuesta de GET /tasks/changes.")
+    # Cada entrada ocupa ~17 bytes en el documento de contadores del usuario, que se reescribe en cada escritura
+    TASK_CHANGES_LOG_SIZE: int = Field(500, description="Últimas escrituras por usuario que recuerda la secuencia de cambios; un token más atrasado exige sincronizar desde cero (410).")
+    TASK_TOMBSTONE_RETENTION_DAYS: int = Field(30, description="Días que se conservan las lápidas de tareas borradas; un token más antiguo exige sincronizar desde cero (410).")
+    TASK_TOMBSTONE_COMPACT_SECONDS: int = Field(3600, description="Intervalo del job que compacta las lápidas vencidas (0 lo desactiva).")
+
+    # --- Streaming de Cambios (GET /tasks/stream y WebSocket) ---
+    TASK_STREAM_ENABLED: bool = Field(True, description="Publica las escrituras de tareas para GET /tasks/stream (SSE) y /tasks/stream/ws.")
+    TASK_STREAM_QUEUE_SIZE: int = Field(100, description="Eventos pendientes por conexión; al superarlos la conexión se cierra (consumidor lento).")
+    TASK_STREAM_HEARTBEAT_SECONDS: float = Field(15.0, description="Intervalo de heartbeat sin eventos (mantiene vivos proxies y detecta conexiones caídas).")
+    TASK_STREAM_MAX_CONNECTIONS_PER_USER: int = Field(5, description="Conexiones de streaming abiertas a la vez por usuario y worker.")
+
+    # --- Operaciones Masivas ---
+    BULK_MAX_ITEMS: int = Field(5000, description="Máximo de elementos por petición bulk.")
+    BULK_CHUNK_SIZE: int = Field(500, description="Tamaño de cada bloque enviado a MongoDB en operaciones bulk.")
+
+    # --- Importación de Tareas ---
+    IMPORT_BATCH_SIZE: int = Field(1000, description="Tareas validadas por lote antes de insertarlas con insert_many.")
+    IMPORT_MAX_IN_FLIGHT: int = Field(4, description="Lotes insertándose a la vez; al alcanzarlo se deja de leer el cuerpo de la petición.")
+    IMPORT_MAX_ERRORS: int = Field(1000, description="Errores por línea detallados en la respuesta de una importación.")
+    IMPORT_MAX_RECORD_BYTES: int = Field(1024 * 1024, description="Tamaño máximo de un registro NDJSON/CSV; uno mayor se informa como error y se descarta sin acumularlo en memoria.")
 
     # El modelo debe leer del archivo .env
     model_config = SettingsConfigDict(
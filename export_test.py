@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Pruebas de integración de la exportación de tareas (GET /tasks/export).
+Requiere el servidor en marcha (python run.py).
+"""
+
+import csv
+import io
+import json
+import random
+import requests
+
+BASE_URL = "http://127.0.0.1:8000/api/v1"
+
+# Más tareas que EXPORT_BATCH_SIZE (1000) para que la respuesta llegue en varios bloques
+TOTAL_TASKS = 1200
+
+failures = 0
+
+def check(condition, message, response=None):
+    global failures
+    if condition:
+        print(f"OK - {message}")
+    else:
+        failures += 1
+        detail = f" ({response.status_code}: {response.text[:300]})" if response is not None else ""
+        print(f"FALLO - {message}{detail}")
+    return condition
+
+def register():
+    email = f"export_{random.randint(100000, 999999)}@example.com"
+    response = requests.post(f"{BASE_URL}/auth/register", json={
+        "email": email,
+        "password": "TestPass123",
+        "full_name": "Export User"
+    })
+    if response.status_code != 201:
+        print(f"FALLO - Registro: {response.text}")
+        exit(1)
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+def create_tasks(headers):
+    print("\n=== PREPARACIÓN: CREAR TAREAS ===")
+    tasks = [{"title": f"Exportar {i}"} for i in range(TOTAL_TASKS - 3)]
+    # Vencimientos con distinto desfase: 08:00Z, 09:00Z y 10:00Z
+    tasks += [
+        {"title": "Vence 08:00Z", "due_date": "2030-01-01T10:00:00+02:00"},
+        {"title": "Vence 09:00Z", "due_date": "2030-01-01T09:00:00Z"},
+        {"title": "Vence 10:00Z", "due_date": "2030-01-01T05:00:00-05:00"},
+    ]
+    response = requests.post(f"{BASE_URL}/tasks/bulk", json={"tasks": tasks}, headers=headers)
+    check(response.status_code == 200 and response.json()["succeeded"] == TOTAL_TASKS, f"{TOTAL_TASKS} tareas creadas", response)
+    ids = [item["id"] for item in response.json()["results"]]
+    requests.patch(f"{BASE_URL}/tasks/bulk", json={"tasks": [{"id": task_id, "completed": True} for task_id in ids[:10]]}, headers=headers)
+
+def test_export_ndjson(headers):
+    print("\n=== TEST 1: EXPORTAR NDJSON ===")
+    response = requests.get(f"{BASE_URL}/tasks/export", headers=headers, stream=True)
+    print(f"Status: {response.status_code}")
+    if not check(response.status_code == 200, "Respuesta 200", response):
+        return
+    check(response.headers["content-type"].startswith("application/x-ndjson"), "Content-Type NDJSON")
+    check('filename="tasks.ndjson"' in response.headers.get("content-disposition", ""), "Se descarga como tasks.ndjson")
+    # Se consume línea a línea, como haría un cliente con un archivo grande
+    tasks = [json.loads(line) for line in response.iter_lines() if line]
+    check(len(tasks) == TOTAL_TASKS, f"Todas las tareas ({len(tasks)})")
+    check(len({task["id"] for task in tasks}) == TOTAL_TASKS, "Sin duplicados entre bloques")
+    created = [task["created_at"] for task in tasks]
+    check(created == sorted(created, reverse=True), "Orden por defecto: -created_at")
+
+def test_export_csv_fields(headers):
+    print("\n=== TEST 2: EXPORTAR CSV CON CAMPOS Y FILTRO ===")
+    response = requests.get(
+        f"{BASE_URL}/tasks/export",
+        params={"format": "csv", "fields": "completed,title", "completed": "true"},
+        headers=headers,
+    )
+    print(f"Status: {response.status_code}")
+    if not check(response.status_code == 200, "Respuesta 200", response):
+        return
+    check(response.headers["content-type"].startswith("text/csv"), "Content-Type CSV")
+    rows = list(csv.reader(io.StringIO(response.text)))
+    check(rows[0] == ["id", "title", "completed"], f"Cabecera en orden estable: {rows[0]}")
+    check(len(rows) == 11, f"Solo las 10 completadas ({len(rows) - 1})")
+    check(all(row[2] == "True" for row in rows[1:]), "Todas completadas")
+
+def test_export_mixed_offsets(headers):
+    print("\n=== TEST 3: FILTRO DE FECHAS CON DISTINTO DESFASE ===")
+    # [08:30Z, 10:00Z) expresado en +02:00 y -05:00: solo la de las 09:00Z
+    response = requests.get(f"{BASE_URL}/tasks/export", params={
+        "due_after": "2030-01-01T10:30:00+02:00",
+        "due_before": "2030-01-01T05:00:00-05:00",
+        "sort": "due_date",
+    }, headers=headers)
+    titles = [json.loads(line)["title"] for line in response.text.splitlines() if line]
+    check(response.status_code == 200 and titles == ["Vence 09:00Z"], f"Rango comparado como instantes: {titles}", response)
+
+    # 20:00-12:00 del día anterior = 08:00Z: due_after es inclusivo
+    response = requests.get(f"{BASE_URL}/tasks/export", params={"due_after": "2029-12-31T20:00:00-12:00", "sort": "due_date"}, headers=headers)
+    titles = [json.loads(line)["title"] for line in response.text.splitlines() if line]
+    check(titles == ["Vence 08:00Z", "Vence 09:00Z", "Vence 10:00Z"], f"Orden por vencimiento: {titles}", response)
+
+def test_export_errors(headers):
+    print("\n=== TEST 4: PARÁMETROS INVÁLIDOS Y SIN TAREAS ===")
+    response = requests.get(f"{BASE_URL}/tasks/export", params={"sort": "title"}, headers=headers)
+    check(response.status_code == 400, "Orden no soportado: 400", response)
+    response = requests.get(f"{BASE_URL}/tasks/export", params={"fields": "nope"}, headers=headers)
+    check(response.status_code == 400, "Campo desconocido: 400", response)
+    response = requests.get(f"{BASE_URL}/tasks/export")
+    check(response.status_code == 401, "Sin token: 401", response)
+
+    response = requests.get(f"{BASE_URL}/tasks/export", params={"format": "csv"}, headers=register())
+    check(response.status_code == 200 and response.text.strip().count("\n") == 0, "Usuario sin tareas: solo la cabecera CSV", response)
+
+if __name__ == "__main__":
+    print("INICIANDO PRUEBAS DE EXPORTACIÓN")
+    print("=" * 50)
+
+    headers = register()
+    create_tasks(headers)
+    test_export_ndjson(headers)
+    test_export_csv_fields(headers)
+    test_export_mixed_offsets(headers)
+    test_export_errors(headers)
+
+    print("\n" + "=" * 50)
+    print("PRUEBAS COMPLETADAS" if not failures else f"PRUEBAS COMPLETADAS CON {failures} FALLOS")
+    print("=" * 50)
+    exit(1 if failures else 0)
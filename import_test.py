@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Pruebas de integración de la importación de tareas (POST /tasks/import).
+Requiere el servidor en marcha (python run.py).
+"""
+
+import json
+import os
+import random
+import time
+import requests
+
+BASE_URL = "http://127.0.0.1:8000/api/v1"
+
+# Más registros que IMPORT_BATCH_SIZE (1000) para que haya varios lotes en vuelo
+TOTAL_RECORDS = 2500
+# Tamaño máximo de un registro en el servidor (IMPORT_MAX_RECORD_BYTES)
+MAX_RECORD_BYTES = int(os.getenv("IMPORT_MAX_RECORD_BYTES", str(1024 * 1024)))
+
+failures = 0
+
+def check(condition, message, response=None):
+    global failures
+    if condition:
+        print(f"OK - {message}")
+    else:
+        failures += 1
+        detail = f" ({response.status_code}: {response.text[:300]})" if response is not None else ""
+        print(f"FALLO - {message}{detail}")
+    return condition
+
+def register():
+    email = f"import_{random.randint(100000, 999999)}@example.com"
+    response = requests.post(f"{BASE_URL}/auth/register", json={
+        "email": email,
+        "password": "TestPass123",
+        "full_name": "Import User"
+    })
+    if response.status_code != 201:
+        print(f"FALLO - Registro: {response.text}")
+        exit(1)
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+def total_tasks(headers):
+    return requests.get(f"{BASE_URL}/tasks/", headers=headers).json()["total"]
+
+def ndjson_body():
+    """Cuerpo enviado por trozos (chunked): el servidor lo procesa sin recibirlo entero."""
+    for i in range(1, TOTAL_RECORDS + 1):
+        if i == 10:
+            yield b'{"title": "json roto"\n'
+        elif i == 20:
+            yield b'["no", "es", "un", "objeto"]\n'
+        elif i == 30:
+            yield b'{"description": "sin titulo"}\n'
+        elif i == 40:
+            yield b"\n"  # Las líneas vacías se ignoran
+        else:
+            # Con caracteres multibyte para que alguno quede partido entre trozos
+            yield json.dumps({"title": f"Importada {i} ñandú", "due_date": "2030-01-01T10:00:00+02:00"}).encode("utf-8") + b"\n"
+
+def test_import_ndjson(headers):
+    print("\n=== TEST 1: IMPORTAR NDJSON EN STREAMING ===")
+    response = requests.post(
+        f"{BASE_URL}/tasks/import",
+        data=ndjson_body(),
+        headers={**headers, "Content-Type": "application/x-ndjson"},
+    )
+    print(f"Status: {response.status_code}")
+    if not check(response.status_code == 200, "Respuesta 200", response):
+        return
+    data = response.json()
+    check(data["processed"] == TOTAL_RECORDS - 1, f"Registros leídos sin la línea vacía ({data['processed']})")
+    check(data["created"] == TOTAL_RECORDS - 4, f"Creadas todas las válidas ({data['created']})")
+    check(data["failed"] == 3 and not data["errors_truncated"], f"3 errores ({data['failed']})")
+    check([error["line"] for error in data["errors"]] == [10, 20, 30], f"Errores con su línea: {data['errors']}")
+    check(total_tasks(headers) == TOTAL_RECORDS - 4, "Los contadores del listado incluyen lo importado")
+
+    task = requests.get(f"{BASE_URL}/tasks/", params={"size": 1}, headers=headers).json()["tasks"][0]
+    check(task["title"].endswith("ñandú"), f"Texto UTF-8 intacto: {task['title']}")
+
+def test_import_csv():
+    print("\n=== TEST 2: IMPORTAR CSV ===")
+    headers = register()
+    body = (
+        "title,description,due_date\r\n"
+        "Simple,,\r\n"
+        '"Con, coma","Descripción\nen dos líneas",2030-01-01T09:00:00Z\r\n'
+        "Columnas de más,a,b,c\r\n"
+        "Fecha mala,,no-es-fecha\r\n"
+        "Última sin salto de línea,,"
+    )
+    response = requests.post(
+        f"{BASE_URL}/tasks/import",
+        params={"format": "csv"},
+        data=body.encode("utf-8"),
+        headers={**headers, "Content-Type": "text/csv"},
+    )
+    print(f"Status: {response.status_code}")
+    if not check(response.status_code == 200, "Respuesta 200", response):
+        return
+    data = response.json()
+    check(data["created"] == 3 and data["failed"] == 2, f"3 creadas y 2 errores ({data['created']}/{data['failed']})")
+    # El registro con salto de línea ocupa las líneas 3 y 4
+    check([error["line"] for error in data["errors"]] == [5, 6], f"Líneas de los errores: {data['errors']}")
+
+    tasks = requests.get(f"{BASE_URL}/tasks/", params={"sort": "created_at"}, headers=headers).json()["tasks"]
+    multiline = [task for task in tasks if task["title"] == "Con, coma"]
+    check(bool(multiline) and multiline[0]["description"] == "Descripción\nen dos líneas", "Campo entre comillas con salto de línea")
+
+def test_import_malformed_bodies():
+    print("\n=== TEST 3: CUERPOS MAL FORMADOS ===")
+    headers = register()
+    # Una comilla sin cerrar no debe arrastrar el resto del archivo a un único registro
+    rows = 20000
+    body = "title\n" + 'Comilla "sin cerrar\n' + "".join(f"Fila {i}\n" for i in range(rows))
+    started = time.perf_counter()
+    response = requests.post(f"{BASE_URL}/tasks/import", params={"format": "csv"}, data=body.encode("utf-8"), headers=headers)
+    elapsed = time.perf_counter() - started
+    if check(response.status_code == 200, "CSV con una comilla sin cerrar: 200", response):
+        data = response.json()
+        check(data["created"] == rows, f"Se importan las filas posteriores ({data['created']} de {rows})")
+        check([error["line"] for error in data["errors"]] == [2], f"Solo se rechaza la fila de la comilla: {data['errors'][:3]}")
+    check(elapsed < 30, f"Tiempo de la importación: {elapsed:.1f} s")
+
+    # Una línea más larga que el máximo se informa y se descarta sin acumularla
+    def long_line_body():
+        yield b'{"title": "Antes"}\n'
+        yield b'{"title": "' + b"x" * (64 * 1024)
+        for _ in range(MAX_RECORD_BYTES // (64 * 1024) + 16):
+            yield b"x" * (64 * 1024)
+        yield '"}\n{"title": "Después"}\n'.encode("utf-8")
+
+    response = requests.post(f"{BASE_URL}/tasks/import", data=long_line_body(), headers=headers)
+    if check(response.status_code == 200, "NDJSON con una línea enorme: 200", response):
+        data = response.json()
+        check(data["created"] == 2 and data["failed"] == 1, f"Se importan las líneas de alrededor ({data['created']}/{data['failed']})")
+        check([error["line"] for error in data["errors"]] == [2], f"Error en la línea larga: {data['errors']}")
+
+def test_import_msgpack():
+    print("\n=== TEST 4: IMPORTAR MESSAGEPACK ===")
+    try:
+        import msgpack
+    except ImportError:
+        print("OMITIDO - msgpack no está instalado en el cliente")
+        return
+    headers = register()
+    body = b"".join(msgpack.packb(record) for record in [{"title": "mp 1"}, {"title": "mp 2"}, [1, 2]])
+    response = requests.post(
+        f"{BASE_URL}/tasks/import",
+        data=body,
+        headers={**headers, "Content-Type": "application/msgpack"},
+    )
+    if response.status_code == 415:
+        print("OMITIDO - msgpack no está instalado en el servidor")
+        return
+    data = response.json() if response.status_code == 200 else {}
+    check(data.get("created") == 2 and [error["line"] for error in data.get("errors", [])] == [3], f"2 creadas y el objeto 3 rechazado: {data}", response)
+
+def test_export_import_roundtrip(headers):
+    print("\n=== TEST 5: EXPORTAR E IMPORTAR EN OTRA CUENTA ===")
+    exported = requests.get(f"{BASE_URL}/tasks/export", params={"format": "csv"}, headers=headers)
+    other = register()
+    # Columnas como id u owner_id se ignoran: las tareas pasan a ser de quien importa
+    response = requests.post(f"{BASE_URL}/tasks/import", params={"format": "csv"}, data=exported.content, headers=other)
+    if check(response.status_code == 200, "Respuesta 200", response):
+        check(response.json()["created"] == TOTAL_RECORDS - 4, f"Todas reimportadas ({response.json()['created']})")
+    check(total_tasks(other) == TOTAL_RECORDS - 4, "La otra cuenta ve las tareas importadas")
+    check(total_tasks(headers) == TOTAL_RECORDS - 4, "La cuenta original no cambia")
+
+if __name__ == "__main__":
+    print("INICIANDO PRUEBAS DE IMPORTACIÓN")
+    print("=" * 50)
+
+    headers = register()
+    test_import_ndjson(headers)
+    test_import_csv()
+    test_import_malformed_bodies()
+    test_import_msgpack()
+    test_export_import_roundtrip(headers)
+
+    print("\n" + "=" * 50)
+    print("PRUEBAS COMPLETADAS" if not failures else f"PRUEBAS COMPLETADAS CON {failures} FALLOS")
+    print("=" * 50)
+    exit(1 if failures else 0)
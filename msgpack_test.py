@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Pruebas de integración de la negociación de formato (JSON / MessagePack) en
+GET /tasks, /tasks/{id}, /users/me y en los cuerpos de POST y PUT /tasks.
+Requiere el servidor en marcha (python run.py) y la librería 'msgpack' en el
+cliente. Si el servidor no tiene 'msgpack', solo se comprueba que responde en
+JSON y rechaza los cuerpos MessagePack con 415.
+"""
+
+import random
+import requests
+from datetime import datetime, timezone
+
+BASE_URL = "http://127.0.0.1:8000/api/v1"
+MSGPACK = "application/msgpack"
+
+failures = 0
+
+def check(condition, message, response=None):
+    global failures
+    if condition:
+        print(f"OK - {message}")
+    else:
+        failures += 1
+        detail = f" ({response.status_code}: {response.text[:300]})" if response is not None else ""
+        print(f"FALLO - {message}{detail}")
+    return condition
+
+def register():
+    email = f"msgpack_{random.randint(100000, 999999)}@example.com"
+    response = requests.post(f"{BASE_URL}/auth/register", json={
+        "email": email,
+        "password": "TestPass123",
+        "full_name": "MsgPack User"
+    })
+    if response.status_code != 201:
+        print(f"FALLO - Registro: {response.text}")
+        exit(1)
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+def is_msgpack(response):
+    return response.headers.get("content-type", "").startswith(MSGPACK)
+
+def get_both(url, headers, **params):
+    """La misma lectura en JSON y en MessagePack."""
+    as_json = requests.get(url, params=params, headers=headers)
+    as_msgpack = requests.get(url, params=params, headers={**headers, "Accept": MSGPACK})
+    return as_json, as_msgpack
+
+def test_responses(headers, task_id):
+    print("\n=== TEST 1: RESPUESTAS EN MESSAGEPACK ===")
+    for name, url, params in (
+        ("GET /tasks", f"{BASE_URL}/tasks/", {}),
+        ("GET /tasks?fields=", f"{BASE_URL}/tasks/", {"fields": "title,due_date"}),
+        ("GET /tasks/{id}", f"{BASE_URL}/tasks/{task_id}", {}),
+        ("GET /users/me", f"{BASE_URL}/users/me", {}),
+    ):
+        as_json, as_msgpack = get_both(url, headers, **params)
+        if not check(as_msgpack.status_code == 200 and is_msgpack(as_msgpack), f"{name}: Content-Type {MSGPACK}", as_msgpack):
+            continue
+        # Mismos datos en ambos formatos: fechas en ISO 8601 e IDs como texto
+        check(msgpack.unpackb(as_msgpack.content) == as_json.json(), f"{name}: mismo contenido que en JSON")
+        check(len(as_msgpack.content) < len(as_json.content), f"{name}: más compacto ({len(as_msgpack.content)} frente a {len(as_json.content)} bytes)")
+        vary = [value.strip() for value in as_msgpack.headers.get("vary", "").split(",")]
+        check("Accept" in vary and "Accept" in as_json.headers.get("vary", ""), f"{name}: Vary: Accept en ambos formatos")
+
+    # Cada formato tiene su propio ETag: un 304 nunca confirma la copia del otro
+    url = f"{BASE_URL}/tasks/{task_id}"
+    as_json, as_msgpack = get_both(url, headers)
+    check(as_json.headers.get("etag") != as_msgpack.headers.get("etag"), "ETag distinto por formato")
+    response = requests.get(url, headers={**headers, "Accept": MSGPACK, "If-None-Match": as_msgpack.headers.get("etag")})
+    check(response.status_code == 304, "304 con el ETag de MessagePack", response)
+    response = requests.get(url, headers={**headers, "If-None-Match": as_msgpack.headers.get("etag")})
+    check(response.status_code == 200 and not is_msgpack(response), "El ETag de MessagePack no vale para JSON", response)
+
+def test_accept_preferences(headers):
+    print("\n=== TEST 2: PREFERENCIAS DEL ACCEPT ===")
+    url = f"{BASE_URL}/users/me"
+    for accept, expected in (
+        ("application/x-msgpack", True),
+        ("application/json, application/msgpack;q=0.5", False),
+        ("application/msgpack, */*;q=0.1", True),
+        ("*/*", False),
+        ("text/html", False),
+    ):
+        response = requests.get(url, headers={**headers, "Accept": accept})
+        check(response.status_code == 200 and is_msgpack(response) == expected, f"Accept '{accept}': {'MessagePack' if expected else 'JSON'}", response)
+
+def test_request_bodies(headers):
+    print("\n=== TEST 3: CUERPOS EN MESSAGEPACK ===")
+    due = datetime(2030, 5, 1, 10, 30, tzinfo=timezone.utc)
+    # La fecha como marca de tiempo nativa de MessagePack
+    body = msgpack.packb({"title": "Creada en MessagePack", "due_date": due}, datetime=True)
+    response = requests.post(f"{BASE_URL}/tasks/", data=body, headers={**headers, "Content-Type": MSGPACK})
+    if not check(response.status_code == 201, "POST /tasks con cuerpo MessagePack: 201", response):
+        return
+    task = response.json()
+    check(task["title"] == "Creada en MessagePack", "Título recibido")
+    check(datetime.fromisoformat(task["due_date"]).replace(tzinfo=timezone.utc) == due, f"Fecha recibida: {task['due_date']}")
+
+    body = msgpack.packb({"completed": True, "description": "ñandú"})
+    response = requests.put(
+        f"{BASE_URL}/tasks/{task['id']}", data=body,
+        headers={**headers, "Content-Type": MSGPACK, "Accept": MSGPACK},
+    )
+    if check(response.status_code == 200 and is_msgpack(response), "PUT /tasks/{id} en MessagePack de ida y vuelta", response):
+        updated = msgpack.unpackb(response.content)
+        check(updated["completed"] is True and updated["description"] == "ñandú", "Cambios aplicados")
+
+    response = requests.post(f"{BASE_URL}/tasks/", data=b"\xc1\xff", headers={**headers, "Content-Type": MSGPACK})
+    check(response.status_code == 400, "MessagePack inválido: 400", response)
+    response = requests.post(f"{BASE_URL}/tasks/", data=msgpack.packb({"description": "sin título"}), headers={**headers, "Content-Type": MSGPACK})
+    check(response.status_code == 422, "Cuerpo sin título: 422, como en JSON", response)
+
+def test_without_server_msgpack(headers):
+    print("\n=== TEST 4: SERVIDOR SIN MSGPACK ===")
+    response = requests.get(f"{BASE_URL}/users/me", headers={**headers, "Accept": MSGPACK})
+    check(response.status_code == 200 and response.json()["id"], "Con Accept MessagePack responde en JSON", response)
+    response = requests.post(
+        f"{BASE_URL}/tasks/", data=msgpack.packb({"title": "x"}),
+        headers={**headers, "Content-Type": MSGPACK},
+    )
+    check(response.status_code == 415, "Cuerpo MessagePack: 415", response)
+
+if __name__ == "__main__":
+    print("INICIANDO PRUEBAS DE MESSAGEPACK")
+    print("=" * 50)
+
+    try:
+        import msgpack
+    except ImportError:
+        print("OMITIDO - msgpack no está instalado en el cliente")
+        exit(0)
+
+    headers = register()
+    task_id = requests.post(f"{BASE_URL}/tasks/", json={"title": "En dos formatos", "due_date": "2030-01-01T09:00:00Z"}, headers=headers).json()["id"]
+    probe = requests.get(f"{BASE_URL}/users/me", headers={**headers, "Accept": MSGPACK})
+    if is_msgpack(probe):
+        test_responses(headers, task_id)
+        test_accept_preferences(headers)
+        test_request_bodies(headers)
+    else:
+        print("msgpack no está instalado en el servidor")
+        test_without_server_msgpack(headers)
+
+    print("\n" + "=" * 50)
+    print("PRUEBAS COMPLETADAS" if not failures else f"PRUEBAS COMPLETADAS CON {failures} FALLOS")
+    print("=" * 50)
+    exit(1 if failures else 0)
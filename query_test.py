@@ -0,0 +1,258 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Pruebas de integración del listado de tareas (GET /tasks): paginación por cursor,
+filtros, orden y campos parciales (?fields=).
+Requiere el servidor en marcha (python run.py).
+"""
+
+import random
+import time
+import requests
+from datetime import datetime, timedelta
+
+BASE_URL = "http://127.0.0.1:8000/api/v1"
+
+# Varias páginas de PAGE_SIZE, con la última incompleta
+TOTAL_TASKS = 45
+PAGE_SIZE = 10
+FIRST_DUE = datetime(2030, 1, 1, 9, 0)
+
+failures = 0
+
+def check(condition, message, response=None):
+    global failures
+    if condition:
+        print(f"OK - {message}")
+    else:
+        failures += 1
+        detail = f" ({response.status_code}: {response.text[:300]})" if response is not None else ""
+        print(f"FALLO - {message}{detail}")
+    return condition
+
+def register():
+    email = f"query_{random.randint(100000, 999999)}@example.com"
+    response = requests.post(f"{BASE_URL}/auth/register", json={
+        "email": email,
+        "password": "TestPass123",
+        "full_name": "Query User"
+    })
+    if response.status_code != 201:
+        print(f"FALLO - Registro: {response.text}")
+        exit(1)
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+def create_tasks(headers):
+    """
+    Crea TOTAL_TASKS tareas en un solo bloque (mismo created_at: el orden lo
+    desempata el _id). Una de cada tres no tiene fecha de vencimiento y la
+    mitad quedan completadas. Retorna {id: tarea} tal como se creó.
+    """
+    specs = []
+    for i in range(TOTAL_TASKS):
+        due = None if i % 3 == 0 else FIRST_DUE + timedelta(days=i)
+        specs.append({"title": f"Tarea {i:02d}", "due_date": due.isoformat() if due else None})
+    response = requests.post(f"{BASE_URL}/tasks/bulk", json={"tasks": specs}, headers=headers)
+    if not check(response.status_code == 200 and response.json()["failed"] == 0, f"{TOTAL_TASKS} tareas creadas", response):
+        exit(1)
+    ids = [result["id"] for result in response.json()["results"]]
+    completed = ids[::2]
+    requests.patch(f"{BASE_URL}/tasks/bulk", json={"tasks": [{"id": task_id, "completed": True} for task_id in completed]}, headers=headers)
+    return {
+        task_id: {"due_date": FIRST_DUE + timedelta(days=i) if i % 3 else None, "completed": task_id in completed}
+        for i, task_id in enumerate(ids)
+    }
+
+def list_tasks(headers, **params):
+    return requests.get(f"{BASE_URL}/tasks/", params=params, headers=headers)
+
+def walk_cursor(headers, **params):
+    """Recorre todas las páginas en modo cursor. Retorna (tareas, páginas, respuesta fallida o None)."""
+    tasks, pages, cursor = [], 0, ""
+    while True:
+        response = list_tasks(headers, cursor=cursor, size=PAGE_SIZE, **params)
+        if response.status_code != 200:
+            return tasks, pages, response
+        data = response.json()
+        tasks += data["tasks"]
+        pages += 1
+        if not data["has_more"]:
+            if data["next_cursor"] is not None:
+                check(False, f"La última página (la {pages}) no trae next_cursor")
+            return tasks, pages, None
+        if not data["next_cursor"] or len(data["tasks"]) != PAGE_SIZE:
+            check(False, f"La página {pages} está completa y trae next_cursor", response)
+            return tasks, pages, None
+        cursor = data["next_cursor"]
+
+def page_ids(headers, **params):
+    """IDs de todas las tareas en modo page/size, como referencia del orden."""
+    ids, page = [], 1
+    while True:
+        tasks = list_tasks(headers, page=page, size=PAGE_SIZE, **params).json()["tasks"]
+        ids += [task["id"] for task in tasks]
+        if len(tasks) < PAGE_SIZE:
+            return ids
+        page += 1
+
+def test_cursor_paging(headers, expected):
+    print("\n=== TEST 1: PAGINACIÓN POR CURSOR ===")
+    for sort in ("-created_at", "created_at"):
+        tasks, pages, failed = walk_cursor(headers, sort=sort)
+        check(failed is None, f"sort={sort}: todas las páginas 200", failed)
+        ids = [task["id"] for task in tasks]
+        check(len(ids) == TOTAL_TASKS and set(ids) == set(expected), f"sort={sort}: {len(ids)} tareas sin huecos ni repetidas en {pages} páginas")
+        check(ids == page_ids(headers, sort=sort), f"sort={sort}: mismo orden que en modo page/size")
+
+    first = list_tasks(headers, cursor="", size=PAGE_SIZE).json()
+    check(first["total"] == TOTAL_TASKS, f"El total cuenta todas las tareas ({first['total']})")
+
+    # Una tarea creada entre páginas queda antes del cursor (orden descendente): no desplaza las siguientes
+    seen = [task["id"] for task in first["tasks"]]
+    extra_id = requests.post(f"{BASE_URL}/tasks/", json={"title": "Creada durante el recorrido"}, headers=headers).json()["id"]
+    cursor = first["next_cursor"]
+    while cursor:
+        data = list_tasks(headers, cursor=cursor, size=PAGE_SIZE).json()
+        seen += [task["id"] for task in data["tasks"]]
+        cursor = data["next_cursor"]
+    check(len(seen) == len(set(seen)) and set(seen) == set(expected), "Escribir durante el recorrido no produce huecos ni repetidas")
+    requests.delete(f"{BASE_URL}/tasks/{extra_id}", headers=headers)
+
+def test_cursor_errors(headers):
+    print("\n=== TEST 2: CURSORES INVÁLIDOS ===")
+    response = list_tasks(headers, cursor="no-es-un-cursor")
+    check(response.status_code == 400, "Cursor mal formado: 400", response)
+
+    cursor = list_tasks(headers, cursor="", size=PAGE_SIZE, sort="created_at").json()["next_cursor"]
+    response = list_tasks(headers, cursor=cursor, sort="updated_at")
+    check(response.status_code == 400, "Cursor de otro orden: 400", response)
+
+    response = list_tasks(headers, cursor="", sort="due_date")
+    check(response.status_code == 400, "sort=due_date sin rango de vencimiento: 400", response)
+
+def test_cursor_by_due_date(headers, expected):
+    print("\n=== TEST 3: CURSOR POR FECHA DE VENCIMIENTO ===")
+    due_after = FIRST_DUE.isoformat()
+    tasks, pages, failed = walk_cursor(headers, sort="due_date", due_after=due_after)
+    check(failed is None, "Con due_after: todas las páginas 200", failed)
+    with_due = sorted((task["due_date"] for task in expected.values() if task["due_date"]))
+    check(
+        [datetime.fromisoformat(task["due_date"]) for task in tasks] == with_due,
+        f"Las {len(with_due)} tareas con fecha, ordenadas por vencimiento ({len(tasks)} en {pages} páginas)",
+    )
+
+def ids_of(response):
+    return [task["id"] for task in response.json()["tasks"]] if response.status_code == 200 else []
+
+def test_filters(headers, expected):
+    print("\n=== TEST 4: FILTROS ===")
+    for completed in (True, False):
+        response = list_tasks(headers, completed=str(completed).lower(), size=100)
+        wanted = {task_id for task_id, task in expected.items() if task["completed"] == completed}
+        check(
+            set(ids_of(response)) == wanted and response.json()["total"] == len(wanted),
+            f"completed={str(completed).lower()}: {len(wanted)} tareas y su total",
+            response,
+        )
+
+    # Fechas con zona horaria: se comparan en UTC con lo guardado
+    low, high = FIRST_DUE + timedelta(days=10), FIRST_DUE + timedelta(days=20)
+    response = list_tasks(
+        headers, size=100,
+        due_after=(low + timedelta(hours=2)).isoformat() + "+02:00",
+        due_before=(high - timedelta(hours=5)).isoformat() + "-05:00",
+    )
+    wanted = {task_id for task_id, task in expected.items() if task["due_date"] and low <= task["due_date"] < high}
+    check(
+        set(ids_of(response)) == wanted and response.json()["total"] == len(wanted),
+        f"due_after/due_before con zona horaria: {len(wanted)} tareas en [día 10, día 20)",
+        response,
+    )
+
+    response = list_tasks(headers, due_after=high.isoformat(), due_before=low.isoformat())
+    check(response.status_code == 400, "due_after posterior a due_before: 400", response)
+    response = list_tasks(headers, sort="title")
+    check(response.status_code == 400, "Orden no permitido: 400", response)
+
+def test_sort_combinations(headers, expected):
+    print("\n=== TEST 5: ORDEN Y FILTROS COMBINADOS ===")
+    response = list_tasks(headers, size=100, completed="false", due_after=FIRST_DUE.isoformat(), sort="-due_date")
+    wanted = sorted(
+        ((task["due_date"], task_id) for task_id, task in expected.items() if task["due_date"] and not task["completed"]),
+        reverse=True,
+    )
+    check(ids_of(response) == [task_id for _, task_id in wanted], f"Abiertas con fecha, de la que vence más tarde a la primera ({len(wanted)})", response)
+
+    tasks, pages, failed = walk_cursor(headers, completed="true", due_after=FIRST_DUE.isoformat(), sort="due_date")
+    wanted = sorted((task["due_date"], task_id) for task_id, task in expected.items() if task["due_date"] and task["completed"])
+    check(
+        failed is None and [task["id"] for task in tasks] == [task_id for _, task_id in wanted],
+        f"Modo cursor con filtros: completadas con fecha por vencimiento ({len(tasks)} en {pages} páginas)",
+        failed,
+    )
+
+    # La última tarea modificada encabeza el orden por updated_at descendente
+    touched = random.choice(list(expected))
+    requests.put(f"{BASE_URL}/tasks/{touched}", json={"description": "Modificada la última"}, headers=headers)
+    tasks, _, failed = walk_cursor(headers, sort="-updated_at")
+    ids = [task["id"] for task in tasks]
+    check(failed is None and ids[:1] == [touched], "sort=-updated_at: la tarea recién modificada primero", failed)
+    check(len(ids) == len(set(ids)) == TOTAL_TASKS, f"sort=-updated_at en modo cursor sin repetidas ({len(ids)})")
+
+def test_created_since(headers):
+    print("\n=== TEST 6: CREADAS DESDE UNA FECHA ===")
+    # Otro bloque un instante después, para que su created_at sea posterior
+    time.sleep(1.1)
+    response = requests.post(f"{BASE_URL}/tasks/bulk", json={"tasks": [{"title": f"Nueva {i}"} for i in range(3)]}, headers=headers)
+    new_ids = {result["id"] for result in response.json()["results"]}
+    since = requests.get(f"{BASE_URL}/tasks/{next(iter(new_ids))}", headers=headers).json()["created_at"]
+    response = list_tasks(headers, created_since=since, size=100)
+    check(set(ids_of(response)) == new_ids and response.json()["total"] == 3, "created_since: solo las tareas del último bloque", response)
+    response = list_tasks(headers, created_since=since, completed="true")
+    check(response.status_code == 200 and response.json()["total"] == 0, "created_since combinado con completed=true: ninguna", response)
+
+def test_fields(headers, expected):
+    print("\n=== TEST 7: CAMPOS PARCIALES (?fields=) ===")
+    response = list_tasks(headers, fields="title,completed", size=5)
+    keys = [set(task) for task in response.json()["tasks"]] if response.status_code == 200 else []
+    check(keys and all(key == {"id", "title", "completed"} for key in keys), "Listado: solo id, title y completed", response)
+    check(response.json()["total"] >= TOTAL_TASKS and "counts" in response.json(), "El sobre del listado no cambia")
+
+    # El campo de orden se lee para el cursor, pero solo se devuelve si se pide
+    tasks, pages, failed = walk_cursor(headers, fields="title", due_after=FIRST_DUE.isoformat(), sort="due_date")
+    with_due = sum(1 for task in expected.values() if task["due_date"])
+    check(
+        failed is None and len(tasks) == with_due and all(set(task) == {"id", "title"} for task in tasks),
+        f"Modo cursor por due_date sin pedir due_date ({len(tasks)} en {pages} páginas)",
+        failed,
+    )
+    check(len({task["id"] for task in tasks}) == with_due, "Sin repetidas con campos parciales")
+
+    task_id = next(iter(expected))
+    response = requests.get(f"{BASE_URL}/tasks/{task_id}", params={"fields": "due_date, completed"}, headers=headers)
+    check(response.status_code == 200 and set(response.json()) == {"id", "due_date", "completed"}, "Tarea: solo los campos pedidos", response)
+    full = requests.get(f"{BASE_URL}/tasks/{task_id}", params={"fields": " "}, headers=headers)
+    check(full.status_code == 200 and "owner_id" in full.json(), "'fields' vacío: la tarea completa", full)
+
+    for name, url in (("Listado", f"{BASE_URL}/tasks/"), ("Tarea", f"{BASE_URL}/tasks/{task_id}")):
+        response = requests.get(url, params={"fields": "title,password"}, headers=headers)
+        check(response.status_code == 400, f"{name} con un campo desconocido: 400", response)
+
+if __name__ == "__main__":
+    print("INICIANDO PRUEBAS DEL LISTADO DE TAREAS")
+    print("=" * 50)
+
+    headers = register()
+    expected = create_tasks(headers)
+    test_cursor_paging(headers, expected)
+    test_cursor_errors(headers)
+    test_cursor_by_due_date(headers, expected)
+    test_filters(headers, expected)
+    test_sort_combinations(headers, expected)
+    test_created_since(headers)
+    test_fields(headers, expected)
+
+    print("\n" + "=" * 50)
+    print("PRUEBAS COMPLETADAS" if not failures else f"PRUEBAS COMPLETADAS CON {failures} FALLOS")
+    print("=" * 50)
+    exit(1 if failures else 0)
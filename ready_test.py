@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Pruebas de integración de la disponibilidad (GET /ready) y del cortocircuito de MongoDB.
+Requiere el servidor en marcha (python run.py).
+
+La prueba de caída de MongoDB solo se ejecuta si se indican los comandos para
+pararlo y arrancarlo, p. ej.:
+    MONGO_STOP_CMD="docker stop mongo" MONGO_START_CMD="docker start mongo" python ready_test.py
+"""
+
+import os
+import random
+import subprocess
+import time
+import requests
+from concurrent.futures import ThreadPoolExecutor
+
+SERVER_URL = "http://127.0.0.1:8000"
+BASE_URL = f"{SERVER_URL}/api/v1"
+
+failures = 0
+
+def check(condition, message, response=None):
+    global failures
+    if condition:
+        print(f"OK - {message}")
+    else:
+        failures += 1
+        detail = f" ({response.status_code}: {response.text[:300]})" if response is not None else ""
+        print(f"FALLO - {message}{detail}")
+    return condition
+
+def register(email=None):
+    email = email or f"ready_{random.randint(100000, 999999)}@example.com"
+    return requests.post(f"{BASE_URL}/auth/register", json={
+        "email": email,
+        "password": "TestPass123",
+        "full_name": "Ready User"
+    })
+
+def test_ready():
+    print("\n=== TEST 1: WORKER DISPONIBLE ===")
+    response = requests.get(f"{SERVER_URL}/ready")
+    print(f"Status: {response.status_code}")
+    if not check(response.status_code == 200, "Respuesta 200", response):
+        return
+    data = response.json()
+    check(data["status"] == "ready", f"Estado: {data['status']}")
+    check(data["breaker"]["state"] == "closed" and data["breaker"]["consecutive_failures"] == 0, f"Circuito cerrado: {data['breaker']}")
+    check(0 <= data["pool_saturation"] < 1, f"Saturación del pool: {data['pool_saturation']}")
+
+def test_application_errors_do_not_trip_breaker():
+    print("\n=== TEST 2: LOS ERRORES DE APLICACIÓN NO ABREN EL CIRCUITO ===")
+    email = f"ready_{random.randint(100000, 999999)}@example.com"
+    token = register(email).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    # Respuestas de error del servidor de MongoDB (clave duplicada, ID inexistente) y rechazos de la API
+    for _ in range(10):
+        duplicate = register(email)
+        requests.get(f"{BASE_URL}/tasks/0123456789abcdef01234567", headers=headers)
+        requests.get(f"{BASE_URL}/tasks/", params={"sort": "nope"}, headers=headers)
+    check(duplicate.status_code < 500, "Registro duplicado rechazado sin 5xx", duplicate)
+
+    data = requests.get(f"{SERVER_URL}/ready").json()
+    check(data["status"] == "ready" and data["breaker"]["consecutive_failures"] == 0, f"El circuito sigue cerrado: {data['breaker']}")
+
+def test_ready_under_load():
+    print("\n=== TEST 3: DISPONIBLE CON PETICIONES CONCURRENTES ===")
+    headers = {"Authorization": f"Bearer {register().json()['access_token']}"}
+    requests.post(f"{BASE_URL}/tasks/bulk", json={"tasks": [{"title": f"Carga {i}"} for i in range(50)]}, headers=headers)
+
+    def list_tasks(page):
+        return requests.get(f"{BASE_URL}/tasks/", params={"page": page % 5 + 1}, headers=headers).status_code
+
+    with ThreadPoolExecutor(max_workers=20) as pool:
+        statuses = list(pool.map(list_tasks, range(200)))
+        ready = requests.get(f"{SERVER_URL}/ready")
+    check(statuses.count(200) == len(statuses), f"Listados correctos ({statuses.count(200)}/{len(statuses)})")
+    check(ready.status_code == 200, "/ready responde 200 durante la carga", ready)
+
+    # /ready no hace I/O: responde rápido aunque haya tráfico
+    started = time.perf_counter()
+    for _ in range(20):
+        requests.get(f"{SERVER_URL}/ready")
+    elapsed_ms = (time.perf_counter() - started) / 20 * 1000
+    check(elapsed_ms < 100, f"Latencia media de /ready: {elapsed_ms:.1f} ms")
+
+def test_database_down():
+    print("\n=== TEST 4: MONGODB CAÍDO ===")
+    stop_cmd, start_cmd = os.getenv("MONGO_STOP_CMD"), os.getenv("MONGO_START_CMD")
+    if not stop_cmd or not start_cmd:
+        print("OMITIDO - define MONGO_STOP_CMD y MONGO_START_CMD para ejecutarla")
+        return
+    headers = {"Authorization": f"Bearer {register().json()['access_token']}"}
+
+    subprocess.run(stop_cmd, shell=True, check=True)
+    try:
+        # Cada petición espera como mucho MONGODB_SERVER_SELECTION_TIMEOUT_MS hasta abrir el circuito
+        statuses = []
+        for _ in range(10):
+            response = requests.get(f"{BASE_URL}/tasks/", headers=headers, timeout=30)
+            statuses.append(response.status_code)
+            if requests.get(f"{SERVER_URL}/ready").status_code == 503:
+                break
+        check(set(statuses) == {503}, f"Las peticiones responden 503: {statuses}")
+        check("Retry-After" in response.headers, "Con Retry-After", response)
+
+        ready = requests.get(f"{SERVER_URL}/ready")
+        check(ready.status_code == 503 and ready.json()["breaker"]["state"] != "closed", "/ready responde 503 con el circuito abierto", ready)
+        started = time.perf_counter()
+        response = requests.get(f"{BASE_URL}/tasks/", headers=headers, timeout=30)
+        check(response.status_code == 503 and time.perf_counter() - started < 1, "Con el circuito abierto se rechaza al instante", response)
+    finally:
+        subprocess.run(start_cmd, shell=True, check=True)
+
+    # El sondeo en segundo plano cierra el circuito cuando MongoDB vuelve
+    deadline = time.time() + 90
+    while time.time() < deadline and requests.get(f"{SERVER_URL}/ready").status_code != 200:
+        time.sleep(1)
+    check(requests.get(f"{SERVER_URL}/ready").status_code == 200, "El worker vuelve a estar disponible")
+    response = requests.get(f"{BASE_URL}/tasks/", headers=headers)
+    check(response.status_code == 200, "Las peticiones vuelven a funcionar", response)
+
+if __name__ == "__main__":
+    print("INICIANDO PRUEBAS DE DISPONIBILIDAD")
+    print("=" * 50)
+
+    test_ready()
+    test_application_errors_do_not_trip_breaker()
+    test_ready_under_load()
+    test_database_down()
+
+    print("\n" + "=" * 50)
+    print("PRUEBAS COMPLETADAS" if not failures else f"PRUEBAS COMPLETADAS CON {failures} FALLOS")
+    print("=" * 50)
+    exit(1 if failures else 0)
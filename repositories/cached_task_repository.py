@@ -0,0 +1,110 @@
+from typing import Any, FrozenSet, List, Optional, Tuple
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClientSession, AsyncIOMotorDatabase
+from pydantic import BaseModel
+
+from app.core.task_cache import TaskCache, task_cache
+from repositories.task_query import TaskQuery
+from repositories.task_repository import TaskRepository
+from schemas.task_schema import (
+    TaskInDB, TaskCreate, TaskUpdate, TaskBulkUpdateItem, BulkItemResult, get_partial_task_model,
+)
+
+
+class CachedTaskRepository(TaskRepository):
+    """
+    TaskRepository con caché de lectura (read-through) para get_by_id.
+
+    Las escrituras de este repositorio mantienen la caché al día: crear y
+    actualizar guardan la tarea resultante, borrar deja una entrada negativa,
+    las operaciones masivas invalidan sus IDs y las actualizaciones por
+    filtro invalidan todas las tareas del propietario. Las escrituras de otros
+    workers (con el backend en memoria) se ven como mucho tras TASK_CACHE_TTL_SECONDS.
+    """
+
+    def __init__(
+        self,
+        db: AsyncIOMotorDatabase,
+        read_db: Optional[AsyncIOMotorDatabase] = None,
+        session: Optional[AsyncIOMotorClientSession] = None,
+        cache: TaskCache = task_cache,
+    ):
+        super().__init__(db, read_db, session)
+        self.cache = cache
+
+    # --- Lectura ---
+
+    async def get_by_id(
+        self, task_id: str, owner_id: str, fields: Optional[FrozenSet[str]] = None
+    ) -> Optional[TaskInDB]:
+        """Busca la tarea en la caché y, si no está, en MongoDB (guardando el resultado)."""
+        found = await self.get_with_version(task_id, owner_id, fields)
+        return None if found is None else found[0]
+
+    async def get_with_version(
+        self, task_id: str, owner_id: str, fields: Optional[FrozenSet[str]] = None
+    ) -> Optional[Tuple[BaseModel, Any]]:
+        """get_by_id con el 'updated_at' de la copia servida (de la entrada de la caché)."""
+        if not ObjectId.is_valid(task_id):
+            return None
+
+        found, data = await self.cache.get(owner_id, task_id)
+        if not found:
+            # Se cachea la tarea completa: sirve para cualquier '?fields=' posterior.
+            # La época se toma antes de leer: si una escritura la avanza mientras
+            # tanto, lo leído puede ser anterior a ella y no se guarda
+            epoch = self.cache.write_epoch(owner_id)
+            task = await super().get_by_id(task_id, owner_id)
+            await self.cache.fill(owner_id, task_id, task, epoch)
+            if task is None:
+                return None
+            # En el mismo formato (JSON) que las entradas de la caché: la versión,
+            # y con ella el ETag, no depende de si la lectura acertó o no
+            data = task.model_dump(mode="json")
+        elif data is None:
+            return None
+
+        model = TaskInDB if fields is None else get_partial_task_model(fields)
+        return model(**data), data.get("updated_at")
+
+    # --- Escrituras (mantienen la caché) ---
+
+    async def create_task(self, task: TaskCreate, owner_id: str) -> TaskInDB:
+        new_task = await super().create_task(task, owner_id)
+        await self.cache.set(new_task)
+        return new_task
+
+    async def update_task(self, task_id: str, owner_id: str, update_data: TaskUpdate) -> Optional[TaskInDB]:
+        updated_task = await super().update_task(task_id, owner_id, update_data)
+        if updated_task is not None:
+            await self.cache.set(updated_task)
+        elif ObjectId.is_valid(task_id):
+            await self.cache.invalidate(owner_id, task_id)
+        return updated_task
+
+    async def delete_task(self, task_id: str, owner_id: str) -> bool:
+        deleted = await super().delete_task(task_id, owner_id)
+        if deleted:
+            await self.cache.set_missing(owner_id, task_id)
+        return deleted
+
+    async def update_tasks(self, items: List[TaskBulkUpdateItem], owner_id: str) -> List[BulkItemResult]:
+        results = await super().update_tasks(items, owner_id)
+        for item in items:
+            await self.cache.invalidate(owner_id, item.id)
+        return results
+
+    async def delete_tasks(self, task_ids: List[str], owner_id: str) -> List[BulkItemResult]:
+        results = await super().delete_tasks(task_ids, owner_id)
+        for task_id in task_ids:
+            await self.cache.invalidate(owner_id, task_id)
+        return results
+
+    async def update_tasks_matching(
+        self, owner_id: str, query: TaskQuery, update_data: TaskUpdate
+    ) -> Tuple[int, int]:
+        matched, modified = await super().update_tasks_matching(owner_id, query, update_data)
+        if modified:
+            await self.cache.invalidate_owner(owner_id)
+        return matched, modified
@@ -0,0 +1,176 @@
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from pymongo import ASCENDING, DESCENDING
+
+from config.indexes import INDEX_REGISTRY, TASKS_COLLECTION
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Campos por los que se permite ordenar (lista blanca)
+SORTABLE_FIELDS = ("created_at", "due_date", "updated_at")
+
+
+def _naive_utc(dt: Optional[datetime]) -> Optional[datetime]:
+    """Lleva una fecha de filtro a como se guardan las fechas: UTC sin zona horaria."""
+    if dt is not None and dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+class TaskQuery:
+    """
+    Constructor de consultas de listado de tareas.
+
+    Traduce los filtros y el orden de GET /tasks a un filtro y un sort de MongoDB,
+    y comprueba contra el registro de índices (config/indexes.py) que la forma
+    de la consulta la pueda servir un índice declarado. Las formas que obligarían
+    a ordenar en memoria todas las tareas del usuario se registran como aviso o,
+    con TASK_QUERY_STRICT_INDEXES activo, se rechazan con ValueError.
+    """
+
+    def __init__(
+        self,
+        completed: Optional[bool] = None,
+        due_before: Optional[datetime] = None,
+        due_after: Optional[datetime] = None,
+        created_since: Optional[datetime] = None,
+        sort: str = "-created_at",
+    ):
+        self.completed = completed
+        # Con y sin zona horaria mezcladas no se podrían comparar entre sí ni con lo guardado
+        self.due_before = _naive_utc(due_before)
+        self.due_after = _naive_utc(due_after)
+        self.created_since = _naive_utc(created_since)
+
+        # 1. Validar el orden: "campo" ascendente, "-campo" descendente
+        descending = sort.startswith("-")
+        field = sort[1:] if descending else sort
+        if field not in SORTABLE_FIELDS:
+            raise ValueError(f"Orden no permitido: '{sort}'. Campos válidos: {', '.join(SORTABLE_FIELDS)}")
+        self.sort_field = field
+        self.sort_direction = DESCENDING if descending else ASCENDING
+
+        if self.due_before is not None and self.due_after is not None and self.due_after >= self.due_before:
+            raise ValueError("'due_after' debe ser anterior a 'due_before'")
+
+    # --- Forma de la consulta ---
+
+    def _equality_fields(self) -> Set[str]:
+        fields = {"owner_id"}
+        if self.completed is not None:
+            fields.add("completed")
+        return fields
+
+    def _range_fields(self) -> Set[str]:
+        fields = set()
+        if self.due_before is not None or self.due_after is not None:
+            fields.add("due_date")
+        if self.created_since is not None:
+            fields.add("created_at")
+        return fields
+
+    @property
+    def has_due_range(self) -> bool:
+        return "due_date" in self._range_fields()
+
+    def counter_field(self) -> Optional[str]:
+        """
+        Contador por propietario (ver TaskStatsRepository) que coincide con el
+        total de esta consulta, o None si los filtros de rango lo impiden.
+        """
+        if self._range_fields():
+            return None
+        if self.completed is None:
+            return "total"
+        return "completed" if self.completed else "open"
+
+    def shape(self) -> str:
+        """Descripción legible de la forma de la consulta (para logs y errores)."""
+        return (
+            f"eq={sorted(self._equality_fields())} "
+            f"range={sorted(self._range_fields())} sort={self.sort_field}"
+        )
+
+    def cache_key(self) -> Tuple[Any, ...]:
+        """Filtros y orden de la consulta como clave hashable (caché de páginas)."""
+        return (
+            self.completed, self.due_before, self.due_after, self.created_since,
+            self.sort_field, self.sort_direction,
+        )
+
+    # --- Validación contra el registro de índices ---
+
+    def _index_serves(self, keys: List[str], partial: Dict[str, Any], next_field: str) -> bool:
+        """
+        True si el índice empieza por campos de igualdad de la consulta (al menos
+        'owner_id') seguidos de 'next_field', y su filtro parcial queda implicado
+        por la consulta. Los filtros de igualdad restantes se aplican al leer.
+        """
+        if next_field not in keys:
+            return False
+        prefix = keys[:keys.index(next_field)]
+        if "owner_id" not in prefix or not set(prefix) <= self._equality_fields():
+            return False
+        # Los índices parciales del registro son {"campo": {"$exists": True}}: la consulta
+        # debe tener una condición sobre ese campo para que MongoDB pueda usarlos
+        constrained = self._equality_fields() | self._range_fields()
+        return all(field in constrained for field in partial)
+
+    def index_plan(self) -> str:
+        """
+        Clasifica la consulta:
+        - 'sorted': un índice sirve filtro y orden (sin ordenación en memoria).
+        - 'bounded': un índice acota el rango pero el orden se hace en memoria.
+        - 'unindexed': el orden exige recorrer y ordenar todas las tareas del usuario.
+        """
+        candidates = [
+            ([key for key, _ in index.document["key"].items()], index.document.get("partialFilterExpression", {}))
+            for index in INDEX_REGISTRY[TASKS_COLLECTION]
+        ]
+        if any(self._index_serves(keys, partial, self.sort_field) for keys, partial in candidates):
+            return "sorted"
+        if any(
+            self._index_serves(keys, partial, field)
+            for keys, partial in candidates
+            for field in self._range_fields()
+        ):
+            return "bounded"
+        return "unindexed"
+
+    def validate(self) -> "TaskQuery":
+        """Comprueba el plan de índices; lanza ValueError en modo estricto si no hay índice."""
+        plan = self.index_plan()
+        if plan == "unindexed":
+            if settings.TASK_QUERY_STRICT_INDEXES:
+                raise ValueError(f"Combinación de filtros y orden no soportada por ningún índice ({self.shape()})")
+            logger.warning(f"Consulta de tareas sin índice adecuado: {self.shape()}")
+        elif plan == "bounded":
+            logger.info(f"Consulta de tareas con ordenación en memoria: {self.shape()}")
+        return self
+
+    # --- Construcción ---
+
+    def build(self, owner_id: str) -> Tuple[Dict[str, Any], List[Tuple[str, int]]]:
+        """Retorna (filtro, sort) listos para collection.find()."""
+        query: Dict[str, Any] = {"owner_id": owner_id}
+
+        if self.completed is not None:
+            query["completed"] = self.completed
+
+        due: Dict[str, Any] = {}
+        if self.due_before is not None:
+            due["$lt"] = self.due_before
+        if self.due_after is not None:
+            due["$gte"] = self.due_after
+        if due:
+            query["due_date"] = due
+
+        if self.created_since is not None:
+            query["created_at"] = {"$gte": self.created_since}
+
+        # _id como desempate: orden total y estable (necesario para la paginación por cursor)
+        sort = [(self.sort_field, self.sort_direction), ("_id", self.sort_direction)]
+        return query, sort
@@ -1,71 +1,300 @@
-from typing import Optional, List, Dict, Any
-from motor.motor_asyncio import AsyncIOMotorDatabase
+import asyncio
+from typing import Optional, List, Dict, Any, Tuple, FrozenSet, Iterable, Iterator, AsyncGenerator, Awaitable
+from motor.motor_asyncio import AsyncIOMotorClientSession, AsyncIOMotorDatabase
 from bson import ObjectId
-from datetime import datetime
+from pymongo import ASCENDING, DESCENDING, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+from datetime import datetime, timedelta, timezone
+from pydantic import BaseModel
 
 # Importamos las configuraciones de la nueva ubicación
 # El archivo es 'config/settings.py' y la variable es 'settings'
 from config.settings import settings 
 
 # Importamos los esquemas
-from schemas.task_schema import TaskInDB, TaskCreate, TaskUpdate 
+from schemas.task_schema import (
+    TaskInDB, TaskCreate, TaskUpdate, TaskBulkUpdateItem, BulkItemResult, TaskCounts, TaskStats,
+    get_partial_task_model, get_task_list_adapter,
+)
+from utils.pagination import encode_cursor, decode_cursor, encode_sync_token, decode_sync_token
+from repositories.task_query import TaskQuery
+from repositories.task_stats_repository import TaskStatsRepository, sum_contributions
+from repositories.task_tombstone_repository import TaskTombstoneRepository
+from app.core.task_stats_cache import task_stats_cache
+from app.core.batch_loader import id_loader
+from app.core.task_page_cache import task_page_cache
+from app.core.event_hub import StreamEvent, event_hub, task_event
 
 # Usamos la clave de configuración correcta
 TASKS_COLLECTION = settings.MONGODB_TASKS_COLLECTION
 
+def _as_stored(dt: datetime) -> datetime:
+    """
+    Normaliza una fecha a como la devuelve MongoDB: UTC sin zona horaria y con
+    precisión de milisegundos. Así las tareas construidas en memoria coinciden
+    con lo que queda guardado.
+    """
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt.replace(microsecond=dt.microsecond - dt.microsecond % 1000)
+
+def _utcnow() -> datetime:
+    """Hora UTC actual normalizada con _as_stored."""
+    return _as_stored(datetime.utcnow())
+
+# Campos cuyo cambio afecta a los contadores por propietario
+COUNTED_FIELDS = frozenset({"completed", "due_date"})
+
+# 'wid' de las tareas escritas antes de la secuencia de cambios (ver backfill_wid)
+INITIAL_WID = ObjectId("0" * 24)
+
+class SyncTokenExpired(ValueError):
+    """El token de sincronización es anterior a las lápidas conservadas: hay que sincronizar desde cero."""
+
 class TaskRepository:
     """Clase que encapsula la lógica de acceso a datos para la colección de Tareas."""
     
     # El repositorio recibe la instancia de la base de datos (db) directamente
     # La inyección de dependencia 'Depends(get_database)' se realiza en la función de factory 
     # de las rutas, no aquí.
-    def __init__(self, db: AsyncIOMotorDatabase):
-        """Inicializa el repositorio con la colección de tareas."""
+    def __init__(
+        self,
+        db: AsyncIOMotorDatabase,
+        read_db: Optional[AsyncIOMotorDatabase] = None,
+        session: Optional[AsyncIOMotorClientSession] = None,
+    ):
+        """
+        Inicializa el repositorio con la colección de tareas. Las consultas de solo
+        lectura usan 'read_db' si se indica (p. ej. con secondaryPreferred); la
+        sesión causal, si la hay, se usa en todas las operaciones del propietario.
+        """
         self.collection = db[TASKS_COLLECTION] 
+        self.read_collection = (read_db if read_db is not None else db)[TASKS_COLLECTION]
+        self.session = session
+        self.stats = TaskStatsRepository(db, session)
+        self.tombstones = TaskTombstoneRepository(db, read_db, session)
 
-    def _convert_doc(self, doc: Dict[str, Any]) -> Optional[TaskInDB]:
-        """Convierte el documento de MongoDB a TaskInDB Pydantic model."""
+    def _convert_doc(self, doc: Dict[str, Any], fields: Optional[FrozenSet[str]] = None) -> Optional[BaseModel]:
+        """
+        Convierte el documento de MongoDB a TaskInDB Pydantic model, o al modelo
+        parcial correspondiente si se pidió un subconjunto de campos.
+        """
         if doc:
             # Reemplaza _id con 'id' y asegura que se pueda instanciar TaskInDB
             doc['id'] = str(doc.pop('_id'))
-            return TaskInDB(**doc)
+            if fields is None:
+                return TaskInDB(**doc)
+            return get_partial_task_model(fields)(**doc)
         return None
 
+    def _convert_docs(self, docs: List[Dict[str, Any]], fields: Optional[FrozenSet[str]] = None) -> List[BaseModel]:
+        """
+        Convierte una página de documentos con una sola validación (TypeAdapter
+        compilado y cacheado por conjunto de campos), en lugar de instanciar el
+        modelo documento a documento desde Python.
+        """
+        for doc in docs:
+            doc['id'] = str(doc.pop('_id'))
+        return get_task_list_adapter(fields).validate_python(docs)
+
+    async def gather(self, *operations: Awaitable[Any]) -> List[Any]:
+        """
+        Ejecuta varias operaciones a la vez. Una sesión de MongoDB no admite
+        operaciones concurrentes, así que con sesión causal se ejecutan en serie.
+        """
+        if self.session is None:
+            return list(await asyncio.gather(*operations))
+        return [await operation for operation in operations]
+
+    @staticmethod
+    def _owner_changed(owner_id: str) -> None:
+        """
+        Punto único de aviso tras una escritura en las tareas de un propietario
+        (ya registrada en su versión, ver TaskStatsRepository): invalida lo que
+        se haya cacheado a partir de ellas.
+        """
+        task_stats_cache.delete(owner_id)
+        task_page_cache.forget_version(owner_id)
+
+    @staticmethod
+    def _streamed(owner_id: str) -> bool:
+        """True si las escrituras del propietario deben publicarse para GET /tasks/stream."""
+        return settings.TASK_STREAM_ENABLED and event_hub.wants(owner_id)
+
+    @staticmethod
+    async def _publish(owner_id: str, events: Iterable[StreamEvent]) -> None:
+        """
+        Publica los eventos de una escritura ya terminada, de modo que al recibirlos
+        el cambio ya es visible en GET /tasks/changes.
+        """
+        for event in events:
+            await event_hub.publish(owner_id, event)
+
+    async def get_version(self, owner_id: str) -> int:
+        """
+        Versión de las tareas del propietario: la cacheada en el worker o, si no
+        la hay, la de MongoDB (dentro de la sesión causal, si la hay).
+        """
+        version = task_page_cache.cached_version(owner_id)
+        if version is None:
+            epoch = task_page_cache.write_epoch()
+            version = await self.stats.get_version(owner_id)
+            task_page_cache.set_version(owner_id, version, epoch)
+        return version
+
+    @staticmethod
+    def _projection(fields: Optional[FrozenSet[str]], *extra: str) -> Optional[Dict[str, int]]:
+        """Proyección de MongoDB para los campos pedidos ('_id' siempre se devuelve)."""
+        if fields is None:
+            return None
+        return {field: 1 for field in (fields | set(extra)) - {"id"}}
+
     # --- Operaciones de Lectura (Read) ---
 
-    async def get_all_tasks(self, owner_id: str, page: int = 1, size: int = 10) -> List[TaskInDB]:
+    async def get_all_tasks(
+        self,
+        owner_id: str,
+        page: int = 1,
+        size: int = 10,
+        query: Optional[TaskQuery] = None,
+        fields: Optional[FrozenSet[str]] = None,
+    ) -> List[TaskInDB]:
         """
-        Obtiene todas las tareas para un usuario específico con paginación.
+        Obtiene las tareas de un usuario específico con paginación, filtros y orden.
+        Con 'fields' solo se leen (proyección) y devuelven esos campos.
         """
         skip = (page - 1) * size
         
-        query = {"owner_id": owner_id}
+        filter_query, sort = (query or TaskQuery()).build(owner_id)
 
         # Consulta y aplicación de paginación
-        cursor = self.collection.find(query).sort("created_at", -1).skip(skip).limit(size)
+        cursor = (
+            self.read_collection.find(filter_query, self._projection(fields), session=self.session)
+            .sort(sort).skip(skip).limit(size)
+        )
         
-        tasks_list = []
         # Usamos to_list para consumir el cursor de manera eficiente con motor
-        for doc in await cursor.to_list(length=size):
-            tasks_list.append(self._convert_doc(doc))
+        docs = await cursor.to_list(length=size)
         
         # Retorna la lista de tareas (sin el objeto de paginación completo por ahora)
-        return tasks_list
-
+        return self._convert_docs(docs, fields)
 
-    async def get_by_id(self, task_id: str, owner_id: str) -> Optional[TaskInDB]: 
+    async def get_tasks_after(
+        self,
+        owner_id: str,
+        cursor: Optional[str] = None,
+        size: int = 10,
+        query: Optional[TaskQuery] = None,
+        fields: Optional[FrozenSet[str]] = None,
+    ) -> Tuple[List[TaskInDB], Optional[str], bool]:
         """
-        Busca una tarea por su ID, asegurando que pertenezca al propietario.
+        Paginación por cursor (keyset) sobre (campo de orden, _id).
+        El coste de cada página es constante sin importar su profundidad.
+        Retorna (tareas, siguiente_cursor, hay_más). Lanza ValueError si el cursor es inválido.
         """
+        query = query or TaskQuery()
+        if query.sort_field == "due_date" and not query.has_due_range:
+            # Sin rango de vencimiento habría tareas sin 'due_date' y no hay posición estable
+            raise ValueError("El modo cursor con sort=due_date requiere 'due_before' o 'due_after'")
+
+        filter_query, sort = query.build(owner_id)
+        field, direction = sort[0]
+
+        if cursor:
+            sort_value, last_id = decode_cursor(cursor, field)
+            # Continúa justo después del último elemento de la página anterior
+            op = "$lt" if direction == DESCENDING else "$gt"
+            filter_query = {
+                "$and": [
+                    filter_query,
+                    {"$or": [
+                        {field: {op: sort_value}},
+                        {field: sort_value, "_id": {op: last_id}},
+                    ]},
+                ]
+            }
+
+        # Se pide un elemento extra para saber si hay más páginas sin contar documentos.
+        # El campo de orden se proyecta siempre porque el siguiente cursor lo necesita.
+        projection = self._projection(fields, field)
+        cursor_db = self.read_collection.find(filter_query, projection, session=self.session).sort(sort).limit(size + 1)
+        docs = await cursor_db.to_list(length=size + 1)
+
+        has_more = len(docs) > size
+        docs = docs[:size]
+
+        next_cursor = None
+        if has_more and docs:
+            last = docs[-1]
+            next_cursor = encode_cursor(field, last[field], str(last["_id"]))
+
+        return self._convert_docs(docs, fields), next_cursor, has_more
+
+    async def _find_by_id(
+        self, task_id: str, owner_id: str, projection: Optional[Dict[str, int]]
+    ) -> Optional[Dict[str, Any]]:
+        """Documento de la tarea si existe y pertenece al propietario."""
         if not ObjectId.is_valid(task_id):
             return None
-            
-        task_doc = await self.collection.find_one({
+
+        if settings.ID_BATCH_ENABLED and self.session is None:
+            # Búsquedas concurrentes agrupadas en un solo $in (sin proyección: el
+            # modelo parcial ignora el resto). El lote mezcla peticiones de varios
+            # usuarios, así que la propiedad se comprueba aquí.
+            task_doc = await id_loader.load(self.read_collection, ObjectId(task_id))
+            if task_doc is not None and task_doc.get("owner_id") != owner_id:
+                task_doc = None
+            return task_doc
+
+        return await self.read_collection.find_one({
             "_id": ObjectId(task_id),
             "owner_id": owner_id
-        })
-        
-        return self._convert_doc(task_doc)
+        }, projection, session=self.session)
+
+    async def get_by_id(
+        self, task_id: str, owner_id: str, fields: Optional[FrozenSet[str]] = None
+    ) -> Optional[TaskInDB]: 
+        """
+        Busca una tarea por su ID, asegurando que pertenezca al propietario.
+        """
+        task_doc = await self._find_by_id(task_id, owner_id, self._projection(fields))
+        return self._convert_doc(task_doc, fields)
+
+    async def get_with_version(
+        self, task_id: str, owner_id: str, fields: Optional[FrozenSet[str]] = None
+    ) -> Optional[Tuple[BaseModel, Any]]:
+        """
+        Como get_by_id, pero retorna también el 'updated_at' de la tarea leída
+        (que se proyecta siempre, se pida o no) para derivar de él el ETag sin
+        serializar la tarea.
+        """
+        task_doc = await self._find_by_id(task_id, owner_id, self._projection(fields, "updated_at"))
+        if task_doc is None:
+            return None
+        updated_at = task_doc.get("updated_at")
+        return self._convert_doc(task_doc, fields), updated_at
+
+    async def iter_tasks(
+        self,
+        owner_id: str,
+        query: Optional[TaskQuery] = None,
+        fields: Optional[FrozenSet[str]] = None,
+    ) -> AsyncGenerator[BaseModel, None]:
+        """
+        Recorre todas las tareas del usuario (filtradas y ordenadas) sin cargarlas
+        en memoria: el cursor trae lotes de EXPORT_BATCH_SIZE documentos. Cerrar
+        el generador antes de tiempo cierra también el cursor en el servidor.
+        """
+        filter_query, sort = (query or TaskQuery()).build(owner_id)
+        cursor = self.read_collection.find(
+            filter_query, self._projection(fields), sort=sort,
+            batch_size=settings.EXPORT_BATCH_SIZE, session=self.session,
+        )
+        try:
+            async for doc in cursor:
+                yield self._convert_doc(doc, fields)
+        finally:
+            await cursor.close()
 
     # --- Operaciones de Creación (Create) ---
 
@@ -73,24 +302,59 @@ class TaskRepository:
         """
         Crea una nueva tarea, asignándola al usuario propietario.
         """
-        now = datetime.utcnow()
+        async with self.stats.changes(owner_id) as change:
+            task_data = self._new_task_doc(task, owner_id, _utcnow(), change.wid)
+            insert_result = await self.collection.insert_one(task_data, session=self.session)
+            change.record(None, task_data)
+
+        # Construir la tarea a partir del documento insertado (sin volver a leerlo)
+        task_data["_id"] = insert_result.inserted_id
+        self._owner_changed(owner_id)
+        created = self._convert_doc(task_data)
+        if self._streamed(owner_id):
+            await self._publish(owner_id, [
+                task_event("created", created.id, change.seq, created.model_dump(mode="json"))
+            ])
+        return created
+
+    @staticmethod
+    def _new_task_doc(task: TaskCreate, owner_id: str, now: datetime, wid: ObjectId) -> Dict[str, Any]:
+        """Documento de MongoDB para una tarea nueva, con los campos de control."""
         task_data = task.model_dump(exclude_unset=True)
+        if task_data.get("due_date") is not None:
+            task_data["due_date"] = _as_stored(task_data["due_date"])
         
         # Añadir campos de control
         task_data.update({
             "owner_id": owner_id,
+            "completed": False, # Explícito para que los filtros usen el índice parcial
             "created_at": now,
             "updated_at": now,
+            "wid": wid,
         })
-        
-        insert_result = await self.collection.insert_one(task_data)
-        
-        # Recuperar el documento insertado
-        new_task_doc = await self.collection.find_one({"_id": insert_result.inserted_id})
-        
-        return self._convert_doc(new_task_doc)
+        return task_data
 
 
+    async def backfill_completed(self) -> int:
+        """
+        Migración: añade 'completed: False' a las tareas antiguas que no lo tienen,
+        para que el filtro por estado (y su índice parcial) las incluya.
+        """
+        result = await self.collection.update_many(
+            {"completed": {"$exists": False}},
+            {"$set": {"completed": False}},
+        )
+        return result.modified_count
+
+    async def backfill_wid(self) -> int:
+        """
+        Migración: da a las tareas anteriores a la secuencia de cambios un 'wid'
+        nulo (ObjectId de ceros), para que una sincronización desde cero
+        (GET /tasks/changes) las incluya.
+        """
+        result = await self.collection.update_many({"wid": {"$exists": False}}, {"$set": {"wid": INITIAL_WID}})
+        return result.modified_count
+
     # --- Operaciones de Actualización (Update) ---
 
     async def update_task(self, task_id: str, owner_id: str, update_data: TaskUpdate) -> Optional[TaskInDB]: 
@@ -108,32 +372,428 @@ class TaskRepository:
             return await self.get_by_id(task_id, owner_id)
 
         # 2. Añadir marca de tiempo de actualización
-        update_fields["updated_at"] = datetime.utcnow()
+        update_fields = self._normalize_update(update_fields)
+        update_fields["updated_at"] = _utcnow()
+        task_filter = {"_id": ObjectId(task_id), "owner_id": owner_id}
         
-        # 3. Realizar la actualización
-        result = await self.collection.update_one(
-            {"_id": ObjectId(task_id), "owner_id": owner_id},
-            {"$set": update_fields}
-        )
+        # 3. Actualizar y obtener el documento en un solo round trip (marcado con la escritura)
+        async with self.stats.changes(owner_id) as change:
+            update_fields["wid"] = change.wid
+            if COUNTED_FIELDS.isdisjoint(update_fields):
+                updated_doc = await self.collection.find_one_and_update(
+                    task_filter, {"$set": update_fields}, return_document=ReturnDocument.AFTER, session=self.session,
+                )
+                if updated_doc is not None:
+                    change.touch()
+            else:
+                # Los contadores necesitan el estado anterior: se pide ese y se aplica el cambio en memoria
+                previous_doc = await self.collection.find_one_and_update(
+                    task_filter, {"$set": update_fields}, return_document=ReturnDocument.BEFORE, session=self.session,
+                )
+                updated_doc = None
+                if previous_doc is not None:
+                    updated_doc = {**previous_doc, **update_fields}
+                    change.record(previous_doc, updated_doc)
 
-        if result.modified_count == 0 and result.matched_count == 0:
-            return None # No se encontró la tarea o no es del propietario
+        if updated_doc is None:
+            return None  # No se encontró la tarea o no es del propietario
+        self._owner_changed(owner_id)
+        updated = self._convert_doc(updated_doc)
+        if self._streamed(owner_id):
+            await self._publish(owner_id, [
+                task_event("updated", updated.id, change.seq, updated.model_dump(mode="json"))
+            ])
+        return updated
 
-        # 4. Recuperar y retornar el documento actualizado
-        return await self.get_by_id(task_id, owner_id)
+    @staticmethod
+    def _normalize_update(update_fields: Dict[str, Any]) -> Dict[str, Any]:
+        """Normaliza las fechas de un $set igual que al crear (ver _as_stored)."""
+        if update_fields.get("due_date") is not None:
+            update_fields["due_date"] = _as_stored(update_fields["due_date"])
+        return update_fields
 
     # --- Operaciones de Eliminación (Delete) ---
     
     async def delete_task(self, task_id: str, owner_id: str) -> bool:
         """
         Elimina una tarea, asegurando la propiedad, y retorna True si fue eliminada.
+        El filtro por owner_id hace innecesaria la lectura previa, el documento
+        borrado (solo los campos contados) actualiza los contadores y queda una
+        lápida para la sincronización incremental.
         """
         if not ObjectId.is_valid(task_id):
             return False
-            
-        result = await self.collection.delete_one({
-            "_id": ObjectId(task_id), 
-            "owner_id": owner_id
-        })
-        
-        return result.deleted_count > 0
\ No newline at end of file
+
+        object_id = ObjectId(task_id)
+        async with self.stats.changes(owner_id) as change:
+            # La lápida se guarda a la vez que el borrado: no se entrega hasta
+            # registrar la escritura, y se retira si no había nada que borrar
+            deleted_doc, _ = await self.gather(
+                self.collection.find_one_and_delete(
+                    {"_id": object_id, "owner_id": owner_id},
+                    projection={field: 1 for field in COUNTED_FIELDS},
+                    session=self.session,
+                ),
+                self.tombstones.record(owner_id, [object_id], change.wid, _utcnow()),
+            )
+            if deleted_doc is None:
+                await self.tombstones.discard(owner_id, change.wid)
+                return False
+            change.record(deleted_doc, None)
+
+        self._owner_changed(owner_id)
+        if self._streamed(owner_id):
+            await self._publish(owner_id, [task_event("deleted", task_id, change.seq)])
+        return True
+
+    # --- Operaciones Masivas (Bulk) ---
+
+    @staticmethod
+    def _chunks(items: List[Any]) -> Iterator[Tuple[int, List[Any]]]:
+        """Divide una lista en bloques de BULK_CHUNK_SIZE, con la posición de inicio de cada uno."""
+        chunk_size = settings.BULK_CHUNK_SIZE
+        for offset in range(0, len(items), chunk_size):
+            yield offset, items[offset:offset + chunk_size]
+
+    @staticmethod
+    def _write_errors(error: BulkWriteError) -> Dict[int, str]:
+        """Errores por operación de un BulkWriteError, indexados por posición en el bloque."""
+        return {
+            write_error["index"]: write_error.get("errmsg", "Error de escritura")
+            for write_error in error.details.get("writeErrors", [])
+        }
+
+    async def _existing_docs(self, object_ids: List[ObjectId], owner_id: str) -> Dict[ObjectId, Dict[str, Any]]:
+        """Tareas del propietario que existen (solo los campos contados), en una sola consulta por _id."""
+        if not object_ids:
+            return {}
+        projection = {field: 1 for field in COUNTED_FIELDS}
+        cursor = self.collection.find(
+            {"_id": {"$in": object_ids}, "owner_id": owner_id}, projection, session=self.session
+        )
+        return {doc["_id"]: doc async for doc in cursor}
+
+    async def create_tasks(self, tasks: List[TaskCreate], owner_id: str) -> List[BulkItemResult]:
+        """
+        Crea muchas tareas con insert_many(ordered=False) por bloques.
+        Un error en un elemento no impide insertar el resto.
+        """
+        results: List[BulkItemResult] = []
+        for offset, chunk in self._chunks(tasks):
+            now = _utcnow()
+            errors: Dict[int, str] = {}
+            async with self.stats.changes(owner_id) as change:
+                docs = [self._new_task_doc(task, owner_id, now, change.wid) for task in chunk]
+                try:
+                    # insert_many asigna el _id a cada documento antes de enviarlo
+                    await self.collection.insert_many(docs, ordered=False, session=self.session)
+                except BulkWriteError as e:
+                    errors = self._write_errors(e)
+                # Un único $inc por bloque con lo aportado por las tareas insertadas
+                inserted = [doc for position, doc in enumerate(docs) if position not in errors]
+                change.add(sum_contributions(inserted))
+            self._owner_changed(owner_id)
+            if self._streamed(owner_id):
+                await self._publish(owner_id, (
+                    task_event("created", task.id, change.seq, task.model_dump(mode="json"))
+                    for task in self._convert_docs([dict(doc) for doc in inserted])
+                ))
+
+            for position, doc in enumerate(docs):
+                if position in errors:
+                    results.append(BulkItemResult(index=offset + position, status="error", error=errors[position]))
+                else:
+                    results.append(BulkItemResult(index=offset + position, id=str(doc["_id"]), status="created"))
+        return results
+
+    async def update_tasks(self, items: List[TaskBulkUpdateItem], owner_id: str) -> List[BulkItemResult]:
+        """
+        Aplica muchas actualizaciones con bulk_write(ordered=False) por bloques,
+        cada una filtrada por owner_id. Como bulk_write no informa de coincidencias
+        por operación, una consulta previa por _id del bloque distingue 'updated' de
+        'not_found' y aporta el estado anterior para los contadores.
+        """
+        results: List[BulkItemResult] = []
+        for offset, chunk in self._chunks(items):
+            now = _utcnow()
+            operation_positions: List[int] = []
+            operation_fields: List[Dict[str, Any]] = []
+            object_ids: List[ObjectId] = []
+
+            # 1. Preparar los cambios (los IDs inválidos no llegan a MongoDB)
+            for position, item in enumerate(chunk):
+                if not ObjectId.is_valid(item.id):
+                    continue
+                object_id = ObjectId(item.id)
+                object_ids.append(object_id)
+                update_fields = self._normalize_update(item.model_dump(exclude_unset=True, exclude={"id"}))
+                if not update_fields:
+                    continue  # Nada que cambiar: solo se comprueba que exista
+                update_fields["updated_at"] = now
+                operation_positions.append(position)
+                operation_fields.append(update_fields)
+
+            # 2. Estado anterior
+            existing = await self._existing_docs(object_ids, owner_id)
+            errors: Dict[int, str] = {}
+            if operation_fields:
+                # 3. Ejecución del bloque, marcado con una única escritura
+                async with self.stats.changes(owner_id) as change:
+                    operations = []
+                    for position, update_fields in zip(operation_positions, operation_fields):
+                        update_fields["wid"] = change.wid
+                        operations.append(UpdateOne(
+                            {"_id": ObjectId(chunk[position].id), "owner_id": owner_id}, {"$set": update_fields}
+                        ))
+                    try:
+                        await self.collection.bulk_write(operations, ordered=False, session=self.session)
+                    except BulkWriteError as e:
+                        errors = {operation_positions[i]: msg for i, msg in self._write_errors(e).items()}
+
+                    # 4. Contadores: se aplican los cambios en memoria, en orden (un mismo ID puede repetirse)
+                    current = dict(existing)
+                    for position, update_fields in zip(operation_positions, operation_fields):
+                        object_id = ObjectId(chunk[position].id)
+                        if position not in errors and object_id in current:
+                            current[object_id] = {**current[object_id], **update_fields}
+                    before, after = sum_contributions(existing.values()), sum_contributions(current.values())
+                    change.add({field: after[field] - before[field] for field in after})
+                self._owner_changed(owner_id)
+                if self._streamed(owner_id):
+                    # Sin el documento resultante: el evento lleva solo ID y secuencia
+                    await self._publish(owner_id, (
+                        task_event("updated", chunk[position].id, change.seq)
+                        for position in operation_positions
+                        if position not in errors and ObjectId(chunk[position].id) in existing
+                    ))
+
+            # 5. Resultado por elemento
+            for position, item in enumerate(chunk):
+                index = offset + position
+                if not ObjectId.is_valid(item.id):
+                    results.append(BulkItemResult(index=index, id=item.id, status="invalid", error="ID de tarea inválido"))
+                elif position in errors:
+                    results.append(BulkItemResult(index=index, id=item.id, status="error", error=errors[position]))
+                elif ObjectId(item.id) in existing:
+                    results.append(BulkItemResult(index=index, id=item.id, status="updated"))
+                else:
+                    results.append(BulkItemResult(index=index, id=item.id, status="not_found"))
+        return results
+
+    async def delete_tasks(self, task_ids: List[str], owner_id: str) -> List[BulkItemResult]:
+        """
+        Elimina muchas tareas del propietario por bloques: una consulta por _id
+        para el resultado por elemento y los contadores, un único delete_many y
+        una lápida por tarea borrada en cada bloque.
+        """
+        results: List[BulkItemResult] = []
+        for offset, chunk in self._chunks(task_ids):
+            object_ids = [ObjectId(task_id) for task_id in chunk if ObjectId.is_valid(task_id)]
+            existing = await self._existing_docs(object_ids, owner_id)
+            if existing:
+                async with self.stats.changes(owner_id) as change:
+                    # Lápidas a la vez que el borrado (no se entregan hasta registrar la escritura)
+                    result, _ = await self.gather(
+                        self.collection.delete_many(
+                            {"_id": {"$in": list(existing)}, "owner_id": owner_id}, session=self.session
+                        ),
+                        self.tombstones.record(owner_id, list(existing), change.wid, _utcnow()),
+                    )
+                    if result.deleted_count == len(existing):
+                        removed = sum_contributions(existing.values())
+                        change.add({field: -value for field, value in removed.items()})
+                    else:
+                        # Otra petición borró alguna entre la consulta y el borrado: se recalcula
+                        # (su lápida repetida no cambia lo que ve el cliente al sincronizar)
+                        await self.stats.reconcile(owner_id)
+                        change.touch()
+                self._owner_changed(owner_id)
+                if self._streamed(owner_id):
+                    await self._publish(owner_id, (
+                        task_event("deleted", str(object_id), change.seq) for object_id in existing
+                    ))
+
+            for position, task_id in enumerate(chunk):
+                index = offset + position
+                if not ObjectId.is_valid(task_id):
+                    results.append(BulkItemResult(index=index, id=task_id, status="invalid", error="ID de tarea inválido"))
+                elif ObjectId(task_id) in existing:
+                    results.append(BulkItemResult(index=index, id=task_id, status="deleted"))
+                else:
+                    results.append(BulkItemResult(index=index, id=task_id, status="not_found"))
+        return results
+
+    async def update_tasks_matching(
+        self, owner_id: str, query: TaskQuery, update_data: TaskUpdate
+    ) -> Tuple[int, int]:
+        """
+        Aplica la misma actualización a todas las tareas del propietario que cumplan
+        los filtros, con un único update_many. Retorna (coincidentes, modificadas).
+        Todas las tareas modificadas quedan marcadas con la misma escritura.
+        """
+        filter_query, _ = query.build(owner_id)
+        update_fields = self._normalize_update(update_data.model_dump(exclude_unset=True))
+        update_fields["updated_at"] = _utcnow()
+
+        async with self.stats.changes(owner_id) as change:
+            update_fields["wid"] = change.wid
+            result = await self.collection.update_many(filter_query, {"$set": update_fields}, session=self.session)
+            if result.modified_count:
+                if not COUNTED_FIELDS.isdisjoint(update_fields):
+                    # El efecto por tarea no se conoce sin leerlas: se recalcula el propietario
+                    await self.stats.reconcile(owner_id)
+                change.touch()
+        if result.modified_count:
+            self._owner_changed(owner_id)
+            if self._streamed(owner_id):
+                # Las tareas afectadas no se enumeran: el cliente las pide a GET /tasks/changes
+                await self._publish(owner_id, [task_event("resync", None, change.seq)])
+        return result.matched_count, result.modified_count
+
+    # --- Sincronización Incremental ---
+
+    @staticmethod
+    def _after_position(last_wid: Optional[ObjectId], last_id: Optional[ObjectId], id_field: str) -> Dict[str, Any]:
+        """
+        Filtro de los elementos posteriores a (last_wid, last_id) en el orden
+        (wid, id). Sin posición, todos los que tienen 'wid' (ver backfill_wid).
+        """
+        if last_wid is None:
+            return {"wid": {"$gte": INITIAL_WID}}
+        return {"$or": [{"wid": {"$gt": last_wid}}, {"wid": last_wid, id_field: {"$gt": last_id}}]}
+
+    async def get_changes(
+        self, owner_id: str, since: Optional[str] = None, limit: int = 100
+    ) -> Tuple[List[Dict[str, Any]], str, bool]:
+        """
+        Cambios de las tareas del propietario posteriores al token 'since' (None:
+        todas sus tareas). Cada cambio es {"op": "upsert", "id", "seq", "task"}
+        o {"op": "delete", "id", "seq", "task": None}. Retorna (cambios,
+        siguiente_token, hay_más).
+
+        Se entregan las escrituras registradas entre la secuencia del token y
+        el 'horizonte' (la última registrada al empezar, fijo mientras se
+        pagina), buscando sus tareas y lápidas por 'wid' en el orden (wid, id).
+        Una escritura aún sin registrar tendrá una secuencia posterior, así que
+        nunca queda atrás.
+
+        Lanza ValueError si el token es inválido y SyncTokenExpired si es
+        anterior a las escrituras que recuerda el propietario ('log') o a las
+        lápidas conservadas.
+        """
+        seq, horizon, last_wid, last_id = decode_sync_token(since) if since else (-1, None, None, None)
+
+        # 1. Horizonte y escrituras a entregar
+        state = await self.stats.sync_state(owner_id)
+        if horizon is None:
+            horizon = state.seq
+        elif horizon > state.seq:
+            raise ValueError("Token de sincronización inválido")
+        if seq >= 0 and seq < horizon and (seq < state.purged_seq or seq + 1 < state.first_logged_seq):
+            raise SyncTokenExpired("El token de sincronización expiró: sincroniza de nuevo desde cero.")
+
+        if seq < 0:
+            # Desde cero: todas las tareas (los borrados anteriores no interesan)
+            task_query = {"owner_id": owner_id}
+            wids = None
+        else:
+            first = state.first_logged_seq
+            wids = state.log[seq + 1 - first:horizon + 1 - first] if seq < horizon else []
+            if not wids:
+                return [], encode_sync_token(max(seq, horizon)), False
+            task_query = {"owner_id": owner_id, "wid": {"$in": wids}}
+
+        # 2. Tareas y lápidas posteriores a la posición (se pide un elemento
+        #    extra para saber si hay más, como en get_tasks_after)
+        tasks_cursor = self.read_collection.find(
+            {"$and": [task_query, self._after_position(last_wid, last_id, "_id")]}, session=self.session
+        ).sort([("wid", ASCENDING), ("_id", ASCENDING)]).limit(limit + 1)
+        operations = [tasks_cursor.to_list(length=limit + 1)]
+        if wids is not None:
+            operations.append(self.tombstones.find_after(
+                owner_id, wids, self._after_position(last_wid, last_id, "task_id"), limit + 1
+            ))
+        docs, *tombstones = await self.gather(*operations)
+
+        # 3. Mezcla de ambos en el orden (wid, id)
+        entries = [(doc["wid"], doc["_id"], doc) for doc in docs]
+        entries += [(tombstone["wid"], tombstone["task_id"], None) for tombstone in (tombstones[0] if tombstones else [])]
+        entries.sort(key=lambda entry: (entry[0], entry[1]))
+        has_more = len(entries) > limit
+        entries = entries[:limit]
+
+        seqs = state.seqs()
+        tasks = iter(self._convert_docs([doc for _, _, doc in entries if doc is not None]))
+        changes = [
+            {"op": "upsert", "id": str(entry_id), "seq": seqs.get(wid, 0), "task": next(tasks)}
+            if doc is not None else
+            {"op": "delete", "id": str(entry_id), "seq": seqs.get(wid, 0), "task": None}
+            for wid, entry_id, doc in entries
+        ]
+
+        # 4. Siguiente posición: el último cambio entregado o, si no hay más, el horizonte
+        if has_more:
+            last_wid, last_entry_id, _ = entries[-1]
+            return changes, encode_sync_token(seq, horizon, last_wid, last_entry_id), True
+        return changes, encode_sync_token(max(seq, horizon)), False
+
+    # --- Contadores ---
+
+    async def get_counts(self, owner_id: str) -> TaskCounts:
+        """Contadores del propietario, en O(1) (ver TaskStatsRepository)."""
+        return await self.stats.get(owner_id)
+
+    async def count_tasks(self, owner_id: str, query: TaskQuery, counts: TaskCounts) -> int:
+        """
+        Total de tareas que cumplen la consulta: sale de los contadores si la
+        consulta no tiene filtros de rango y, si no, de un conteo acotado por índice.
+        """
+        counter = query.counter_field()
+        if counter is not None:
+            return getattr(counts, counter)
+        filter_query, _ = query.build(owner_id)
+        return await self.read_collection.count_documents(filter_query, session=self.session)
+
+    # --- Estadísticas ---
+
+    async def get_stats(self, owner_id: str) -> TaskStats:
+        """
+        Resumen de las tareas del propietario (abiertas, completadas, vencidas y
+        que vencen en los próximos 7 días) en una sola agregación con $facet sobre
+        el índice de owner_id. Se cachea por propietario hasta la siguiente
+        escritura (ver _owner_changed) o TASK_STATS_CACHE_TTL_SECONDS.
+        """
+        cached = task_stats_cache.get(owner_id)
+        if cached is not None:
+            return cached
+
+        now = _utcnow()
+        week_end = now + timedelta(days=7)
+        open_filter = {"completed": {"$ne": True}}
+        pipeline = [
+            {"$match": {"owner_id": owner_id}},
+            {"$facet": {
+                "by_status": [{"$group": {"_id": {"$eq": ["$completed", True]}, "count": {"$sum": 1}}}],
+                "overdue": [
+                    {"$match": {**open_filter, "due_date": {"$lt": now}}},
+                    {"$count": "count"},
+                ],
+                "due_this_week": [
+                    {"$match": {**open_filter, "due_date": {"$gte": now, "$lt": week_end}}},
+                    {"$count": "count"},
+                ],
+            }},
+        ]
+        facets = (await self.read_collection.aggregate(pipeline, session=self.session).to_list(length=1))[0]
+
+        by_status = {group["_id"]: group["count"] for group in facets["by_status"]}
+        stats = TaskStats(
+            total=sum(by_status.values()),
+            completed=by_status.get(True, 0),
+            open=by_status.get(False, 0),
+            overdue=facets["overdue"][0]["count"] if facets["overdue"] else 0,
+            due_this_week=facets["due_this_week"][0]["count"] if facets["due_this_week"] else 0,
+            generated_at=now,
+        )
+        task_stats_cache.set(owner_id, stats)
+        return stats
@@ -0,0 +1,290 @@
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterable, List, NamedTuple, Optional
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClientSession, AsyncIOMotorDatabase
+from pymongo import ReturnDocument, UpdateOne
+
+from config.settings import settings
+from schemas.task_schema import TaskCounts
+
+TASK_STATS_COLLECTION = settings.MONGODB_TASK_STATS_COLLECTION
+
+# Contadores mantenidos por propietario (mismos nombres que TaskCounts)
+COUNTER_FIELDS = ("total", "completed", "open", "open_with_due")
+
+
+def task_contribution(doc: Optional[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Lo que aporta un documento de tarea a los contadores de su propietario.
+    Un documento sin 'completed' (tareas antiguas) cuenta como abierto.
+    """
+    if doc is None:
+        return {field: 0 for field in COUNTER_FIELDS}
+    completed = doc.get("completed") is True
+    return {
+        "total": 1,
+        "completed": 1 if completed else 0,
+        "open": 0 if completed else 1,
+        # Tareas abiertas con vencimiento: las únicas que pueden llegar a estar vencidas
+        "open_with_due": 1 if not completed and doc.get("due_date") is not None else 0,
+    }
+
+
+def sum_contributions(docs: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+    totals = {field: 0 for field in COUNTER_FIELDS}
+    for doc in docs:
+        for field, value in task_contribution(doc).items():
+            totals[field] += value
+    return totals
+
+
+class ChangeSet:
+    """
+    Escritura de tareas en curso de un propietario (ver TaskStatsRepository.changes).
+
+    Tiene un identificador de escritura ('wid') generado en el worker, con el
+    que la escritura marca cada documento que toca, y acumula con
+    record()/add() su efecto en los contadores. 'written' indica si llegó a
+    cambiar algo; 'seq' es su número en la secuencia de cambios del
+    propietario, asignado al registrarla (None hasta entonces).
+    """
+
+    def __init__(self):
+        self.wid = ObjectId()
+        self.deltas = {field: 0 for field in COUNTER_FIELDS}
+        self.written = False
+        self.seq: Optional[int] = None
+
+    def touch(self) -> None:
+        """Registra una escritura que no cambia los contadores."""
+        self.written = True
+
+    def add(self, deltas: Dict[str, int]) -> None:
+        for field, value in deltas.items():
+            self.deltas[field] += value
+        self.written = True
+
+    def record(self, before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]) -> None:
+        """Registra el cambio de una tarea: before=None es una creación, after=None un borrado."""
+        old, new = task_contribution(before), task_contribution(after)
+        self.add({field: new[field] - old[field] for field in COUNTER_FIELDS})
+
+
+class SyncState(NamedTuple):
+    """Secuencia de cambios de un propietario (ver TaskStatsRepository.sync_state)."""
+    seq: int
+    log: List[ObjectId]
+    purged_seq: int
+
+    @property
+    def first_logged_seq(self) -> int:
+        """Secuencia de la escritura más antigua que sigue en 'log'."""
+        return self.seq - len(self.log) + 1
+
+    def seqs(self) -> Dict[ObjectId, int]:
+        """Secuencia de cada escritura que sigue en 'log'."""
+        first = self.first_logged_seq
+        return {wid: first + position for position, wid in enumerate(self.log)}
+
+
+class TaskStatsRepository:
+    """
+    Estado de las tareas de cada propietario en un documento pequeño
+    ({_id: owner_id, total, completed, open, open_with_due, reconciled, version, seq, log}).
+
+    - Contadores: TaskRepository los mantiene con $inc en cada escritura, así
+      que leerlos es O(1). Las operaciones por filtro o masivas cuyo efecto
+      exacto no se conoce recalculan el propietario (reconcile), y un job
+      periódico (reconcile_all) corrige cualquier desvío que haya quedado.
+      'reconciled' marca que se calcularon alguna vez desde las tareas: sin él
+      solo reflejan las escrituras posteriores a su creación.
+    - 'version' avanza al terminar cada escritura de tareas (cuente o no):
+      identifica el estado de sus tareas para la caché de páginas y los ETags.
+    - 'seq' es la secuencia de cambios: cada escritura marca las tareas (y
+      lápidas) que toca con su identificador ('wid') y, ya terminada, lo añade
+      a 'log' (las últimas TASK_CHANGES_LOG_SIZE) en la misma operación que
+      avanza 'seq'. La escritura de posición i en 'log' tiene la secuencia
+      seq - len(log) + 1 + i, y solo las registradas son visibles para
+      GET /tasks/changes: una escritura en curso nunca queda atrás.
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase, session: Optional[AsyncIOMotorClientSession] = None):
+        self.db = db
+        self.collection = db[TASK_STATS_COLLECTION]
+        self.tasks = db[settings.MONGODB_TASKS_COLLECTION]
+        # Sesión causal de la petición (solo en las operaciones de un propietario)
+        self.session = session
+
+    # --- Lectura ---
+
+    async def get(self, owner_id: str) -> TaskCounts:
+        """
+        Contadores del propietario. Si nunca se calcularon desde las tareas se
+        calculan ahora: el documento puede no existir o haberlo creado la primera
+        escritura con solo sus deltas (tareas anteriores a los contadores).
+        """
+        doc = await self.collection.find_one(
+            {"_id": owner_id}, {**{field: 1 for field in COUNTER_FIELDS}, "reconciled": 1}, session=self.session
+        )
+        if doc is None or not doc.get("reconciled"):
+            return await self.reconcile(owner_id)
+        return TaskCounts(**{field: doc.get(field, 0) for field in COUNTER_FIELDS})
+
+    async def get_version(self, owner_id: str) -> int:
+        """Versión de las tareas del propietario (0 si aún no ha escrito ninguna)."""
+        doc = await self.collection.find_one({"_id": owner_id}, {"version": 1}, session=self.session)
+        return doc.get("version", 0) if doc is not None else 0
+
+    async def sync_state(self, owner_id: str) -> SyncState:
+        """
+        Secuencia de cambios del propietario: última secuencia registrada,
+        identificadores de las últimas escrituras ('log') y hasta qué secuencia
+        se compactaron sus lápidas ('purged_seq').
+        """
+        doc = await self.collection.find_one(
+            {"_id": owner_id}, {"seq": 1, "log": 1, "purged_seq": 1}, session=self.session
+        ) or {}
+        return SyncState(doc.get("seq", 0), doc.get("log", []), doc.get("purged_seq", 0))
+
+    async def sync_logs(self, owner_ids: List[str]) -> Dict[str, SyncState]:
+        """Secuencia de cambios de varios propietarios en una consulta (compactación de lápidas)."""
+        cursor = self.collection.find({"_id": {"$in": owner_ids}}, {"seq": 1, "log": 1})
+        return {doc["_id"]: SyncState(doc.get("seq", 0), doc.get("log", []), 0) async for doc in cursor}
+
+    # --- Mantenimiento incremental ---
+
+    @asynccontextmanager
+    async def changes(self, owner_id: str) -> AsyncIterator[ChangeSet]:
+        """
+        Escritura de tareas del propietario. Al terminar (también si falla), si
+        llegó a cambiar algo, la registra en una sola operación: contadores,
+        versión y siguiente número de la secuencia de cambios (change.seq).
+
+        Si el registro no llega a hacerse (el worker muere o MongoDB falla a
+        mitad), las tareas escritas no aparecen en GET /tasks/changes hasta su
+        próxima escritura, igual que sus contadores quedan desviados hasta la
+        próxima reconciliación.
+        """
+        change = ChangeSet()
+        try:
+            yield change
+        finally:
+            if change.written:
+                increments = {field: value for field, value in change.deltas.items() if value}
+                increments.update(seq=1, version=1)
+                doc = await self.collection.find_one_and_update(
+                    {"_id": owner_id},
+                    {
+                        "$inc": increments,
+                        "$push": {"log": {"$each": [change.wid], "$slice": -settings.TASK_CHANGES_LOG_SIZE}},
+                        "$set": {"updated_at": datetime.utcnow()},
+                    },
+                    projection={"seq": 1},
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER,
+                    session=self.session,
+                )
+                change.seq = doc["seq"]
+
+    async def mark_purged(self, purged: Dict[str, int]) -> None:
+        """Registra, por propietario, hasta qué secuencia se compactaron sus lápidas."""
+        operations = [UpdateOne({"_id": owner_id}, {"$max": {"purged_seq": seq}}) for owner_id, seq in purged.items()]
+        if operations:
+            await self.collection.bulk_write(operations, ordered=False)
+
+    # --- Reconciliación ---
+
+    def _count_pipeline(self, match: Dict[str, Any]) -> list:
+        not_completed = {"$ne": ["$completed", True]}
+        return [
+            {"$match": match},
+            {"$group": {
+                "_id": "$owner_id",
+                "total": {"$sum": 1},
+                "completed": {"$sum": {"$cond": [{"$eq": ["$completed", True]}, 1, 0]}},
+                "open": {"$sum": {"$cond": [not_completed, 1, 0]}},
+                "open_with_due": {"$sum": {"$cond": [
+                    {"$and": [not_completed, {"$ne": [{"$ifNull": ["$due_date", None]}, None]}]}, 1, 0,
+                ]}},
+            }},
+        ]
+
+    async def reconcile(self, owner_id: str) -> TaskCounts:
+        """Recalcula los contadores del propietario desde la colección de tareas y los guarda."""
+        counts = TaskCounts()
+        async for doc in self.tasks.aggregate(self._count_pipeline({"owner_id": owner_id}), session=self.session):
+            counts = TaskCounts(**{field: doc[field] for field in COUNTER_FIELDS})
+
+        await self.collection.update_one(
+            {"_id": owner_id},
+            # Los totales de las páginas cacheadas pueden cambiar: también avanza la versión
+            {
+                "$set": {**counts.model_dump(), "reconciled": True, "updated_at": datetime.utcnow()},
+                "$inc": {"version": 1},
+            },
+            upsert=True,
+            session=self.session,
+        )
+        return counts
+
+    async def reconcile_all(self) -> int:
+        """
+        Recorre todos los propietarios y corrige los contadores que no coinciden.
+        Solo escribe donde hay desvío. Retorna el número de propietarios corregidos.
+
+        Una escritura concurrente con el recálculo puede dejar un desvío pequeño,
+        que corrige la siguiente ejecución.
+        """
+        repaired = 0
+        seen = set()
+        computed: Dict[str, Dict[str, int]] = {}
+
+        async def flush() -> int:
+            # Compara el lote con los contadores guardados y escribe solo los distintos
+            if not computed:
+                return 0
+            # Un documento sin 'reconciled' nunca se calculó desde las tareas: se escribe aunque coincida
+            stored = {
+                doc["_id"]: {field: doc.get(field, 0) for field in COUNTER_FIELDS}
+                async for doc in self.collection.find(
+                    {"_id": {"$in": list(computed)}, "reconciled": True}, {field: 1 for field in COUNTER_FIELDS}
+                )
+            }
+            now = datetime.utcnow()
+            operations = [
+                UpdateOne(
+                    {"_id": owner_id},
+                    {"$set": {**counts, "reconciled": True, "updated_at": now}, "$inc": {"version": 1}},
+                    upsert=True,
+                )
+                for owner_id, counts in computed.items()
+                if stored.get(owner_id) != counts
+            ]
+            computed.clear()
+            if operations:
+                await self.collection.bulk_write(operations, ordered=False)
+            return len(operations)
+
+        # 1. Propietarios con tareas, por lotes
+        async for doc in self.tasks.aggregate(self._count_pipeline({}), allowDiskUse=True):
+            seen.add(doc["_id"])
+            computed[doc["_id"]] = {field: doc[field] for field in COUNTER_FIELDS}
+            if len(computed) >= settings.BULK_CHUNK_SIZE:
+                repaired += await flush()
+        repaired += await flush()
+
+        # 2. Propietarios sin tareas que conservan contadores distintos de cero
+        zero = {field: 0 for field in COUNTER_FIELDS}
+        stale = self.collection.find(
+            {"$or": [{field: {"$ne": 0}} for field in COUNTER_FIELDS]}, {"_id": 1}
+        )
+        async for doc in stale:
+            if doc["_id"] not in seen:
+                await self.collection.update_one(
+                    {"_id": doc["_id"]}, {"$set": {**zero, "reconciled": True}, "$inc": {"version": 1}}
+                )
+                repaired += 1
+
+        return repaired
@@ -0,0 +1,87 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClientSession, AsyncIOMotorDatabase
+from pymongo import ASCENDING
+
+from config.settings import settings
+from repositories.task_stats_repository import TaskStatsRepository
+
+TASK_TOMBSTONES_COLLECTION = settings.MONGODB_TASK_TOMBSTONES_COLLECTION
+
+
+class TaskTombstoneRepository:
+    """
+    Lápidas de tareas borradas ({owner_id, task_id, wid, deleted_at}).
+
+    Las escribe TaskRepository al borrar, con el identificador de la escritura
+    ('wid', ver TaskStatsRepository.changes), para que GET /tasks/changes pueda
+    informar de los borrados igual que de las altas y modificaciones. Como las
+    tareas, una lápida solo se entrega cuando su escritura quedó registrada,
+    así que puede guardarse a la vez que el borrado. Se conservan
+    TASK_TOMBSTONE_RETENTION_DAYS: la compactación (compact) las elimina y anota
+    por propietario hasta qué secuencia lo hizo, de modo que un token de
+    sincronización más antiguo se rechaza en lugar de perder borrados en silencio.
+    """
+
+    def __init__(
+        self,
+        db: AsyncIOMotorDatabase,
+        read_db: Optional[AsyncIOMotorDatabase] = None,
+        session: Optional[AsyncIOMotorClientSession] = None,
+    ):
+        self.collection = db[TASK_TOMBSTONES_COLLECTION]
+        self.read_collection = (read_db if read_db is not None else db)[TASK_TOMBSTONES_COLLECTION]
+        self.session = session
+
+    async def record(self, owner_id: str, task_ids: List[ObjectId], wid: ObjectId, now: datetime) -> None:
+        """Guarda una lápida por cada tarea borrada por la escritura 'wid'."""
+        if not task_ids:
+            return
+        await self.collection.insert_many(
+            [{"owner_id": owner_id, "task_id": task_id, "wid": wid, "deleted_at": now} for task_id in task_ids],
+            ordered=False,
+            session=self.session,
+        )
+
+    async def discard(self, owner_id: str, wid: ObjectId) -> None:
+        """Elimina las lápidas de una escritura que al final no borró nada."""
+        await self.collection.delete_many({"owner_id": owner_id, "wid": wid}, session=self.session)
+
+    async def find_after(
+        self, owner_id: str, wids: List[ObjectId], after: Dict[str, Any], limit: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Lápidas del propietario de las escrituras 'wids' posteriores a la
+        posición 'after' (filtro sobre wid y task_id), en orden (wid, task_id).
+        """
+        query = {"$and": [{"owner_id": owner_id, "wid": {"$in": wids}}, after]}
+        cursor = self.read_collection.find(query, {"_id": 0, "task_id": 1, "wid": 1}, session=self.session)
+        return await cursor.sort([("wid", ASCENDING), ("task_id", ASCENDING)]).limit(limit).to_list(length=limit)
+
+    async def compact(self, older_than: datetime, stats: TaskStatsRepository) -> int:
+        """
+        Elimina las lápidas anteriores a 'older_than'. Antes de borrar anota en
+        los contadores de cada propietario la mayor secuencia eliminada, para
+        que ningún cliente siga sincronizando desde antes de ella. Solo hace
+        falta para las escrituras que siguen en su 'log': un token anterior a
+        él ya se rechaza.
+        """
+        pipeline = [
+            {"$match": {"deleted_at": {"$lt": older_than}}},
+            {"$group": {"_id": "$owner_id", "wids": {"$addToSet": "$wid"}}},
+        ]
+        purged_wids = {doc["_id"]: doc["wids"] async for doc in self.collection.aggregate(pipeline, allowDiskUse=True)}
+        if not purged_wids:
+            return 0
+        logs = await stats.sync_logs(list(purged_wids))
+        purged = {}
+        for owner_id, wids in purged_wids.items():
+            seqs = logs[owner_id].seqs() if owner_id in logs else {}
+            seq = max((seqs.get(wid, 0) for wid in wids), default=0)
+            if seq:
+                purged[owner_id] = seq
+        await stats.mark_purged(purged)
+        result = await self.collection.delete_many({"deleted_at": {"$lt": older_than}})
+        return result.deleted_count
@@ -2,12 +2,18 @@ from typing import Optional, List, Dict, Any
 # CRÍTICO: Usar AsyncIOMotorDatabase para el tipo de la base de datos
 from motor.motor_asyncio import AsyncIOMotorDatabase 
 from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from datetime import datetime
 
 # Importamos verify_password y get_password_hash (si se usa)
 from app.core.security import verify_password # Se mantiene la ruta absoluta
 from config.settings import settings # CORREGIDO: Usamos 'config.settings'
 
 from schemas.user_schema import UserCreate, UserInDB
+from app.core.user_cache import user_cache
+from app.core.revocation import revocation_list
+from app.core.batch_loader import id_loader
 
 # Usamos la clave de configuración correcta para la colección de usuarios
 USERS_COLLECTION = settings.MONGODB_USERS_COLLECTION
@@ -34,7 +40,11 @@ class UserRepository:
         """Obtiene un usuario por su ID (string)."""
         if not ObjectId.is_valid(user_id):
             return None
-        user_doc = await self.collection.find_one({"_id": ObjectId(user_id)})
+        if settings.ID_BATCH_ENABLED:
+            # Las búsquedas concurrentes (get_current_user) se agrupan en un solo $in
+            user_doc = await id_loader.load(self.collection, ObjectId(user_id))
+        else:
+            user_doc = await self.collection.find_one({"_id": ObjectId(user_id)})
         return self._convert_doc(user_doc)
 
     async def get_by_email(self, email: str) -> Optional[UserInDB]:
@@ -45,28 +55,53 @@ class UserRepository:
     async def create_user(self, user_in: UserCreate, hashed_password: str) -> UserInDB:
         """
         Crea un nuevo usuario en la base de datos con una contraseña ya hasheada.
+        Un solo round trip: la unicidad del email la garantiza el índice único
+        declarado en config/indexes.py.
         """
         
-        # 1. Repetimos la verificación por seguridad de la DB
-        if await self.get_by_email(user_in.email):
-            # En un repo, es mejor lanzar una excepción para que el servicio la capture
-            raise ValueError("Email already registered") 
-
-        # 2. Preparar el documento para MongoDB
+        # 1. Preparar el documento para MongoDB
         user_data = user_in.model_dump(exclude={"password"}, exclude_none=True)
         user_data["hashed_password"] = hashed_password
         user_data["is_active"] = True # Por defecto activo
         
-        # 3. Insertar en MongoDB
-        result = await self.collection.insert_one(user_data)
-        
-        # 4. Recuperar el documento insertado
-        created_user_doc = await self.collection.find_one({"_id": result.inserted_id})
+        # 2. Insertar en MongoDB (el índice único rechaza emails duplicados sin carreras)
+        try:
+            result = await self.collection.insert_one(user_data)
+        except DuplicateKeyError:
+            # En un repo, es mejor lanzar una excepción para que el servicio la capture
+            raise ValueError("Email already registered")
         
-        if not created_user_doc:
-            raise Exception("Failed to retrieve created user document after insertion.")
-            
-        return self._convert_doc(created_user_doc)
+        # 3. Construir el usuario a partir del documento insertado (sin volver a leerlo)
+        user_data["_id"] = result.inserted_id
+        return self._convert_doc(user_data)
+
+    async def update_user(self, user_id: str, fields: Dict[str, Any]) -> Optional[UserInDB]:
+        """
+        Actualiza campos de un usuario e invalida su entrada en la caché de identidad.
+        """
+        if not ObjectId.is_valid(user_id):
+            return None
+
+        fields = {**fields, "updated_at": datetime.utcnow()}
+        user_doc = await self.collection.find_one_and_update(
+            {"_id": ObjectId(user_id)},
+            {"$set": fields},
+            return_document=ReturnDocument.AFTER,
+        )
+
+        # Invalidar siempre: aunque no haya coincidencias, no debe quedar nada viejo en caché
+        await user_cache.invalidate(user_id)
+
+        if user_doc is None:
+            return None
+
+        # Los demás workers lo verán en su próxima sincronización incremental
+        revocation_list.apply_user_doc(user_doc)
+        return self._convert_doc(user_doc)
+
+    async def revoke_tokens(self, user_id: str) -> Optional[UserInDB]:
+        """Invalida todos los tokens emitidos hasta ahora para el usuario."""
+        return await self.update_user(user_id, {"tokens_revoked_at": datetime.utcnow()})
 
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
         """Verifica la contraseña (usa la función de utilidad)."""
@@ -3,7 +3,8 @@ from fastapi.security import OAuth2PasswordRequestForm # Importación CRÍTICA p
 
 # CRÍTICO: Importar get_db desde la nueva ubicación 'config/database'
 from config.database import get_db 
-from schemas.user_schema import UserCreate, Token
+from schemas.user_schema import UserCreate, UserInDB, Token
+from app.core.auth_dependency import get_current_user
 from services.auth_service import AuthService
 from repositories.user_repository import UserRepository
 from motor.motor_asyncio import AsyncIOMotorDatabase # Usamos IOMotorDatabase para el tipo
@@ -55,4 +56,18 @@ async def login_for_access_token(
     # Crea el token JWT
     access_token = auth_service.create_user_token(user)
     
-    return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
+    return {"access_token": access_token, "token_type": "bearer"}
+
+# --- 3. Endpoint de Cierre de Sesión ---
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    current_user: UserInDB = Depends(get_current_user),
+    db: AsyncIOMotorDatabase = Depends(get_db),
+):
+    """
+    Cierra la sesión en todos los dispositivos: los tokens emitidos hasta ahora
+    dejan de ser válidos (los demás workers lo aplican al expirar su caché de
+    identidad o, en modo sin estado, en la siguiente sincronización de la lista
+    de revocación). Para seguir usando la API hay que volver a iniciar sesión.
+    """
+    await UserRepository(db).revoke_tokens(current_user.id)
@@ -0,0 +1,68 @@
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from config.database import get_db, mongo_manager
+from config.indexes import index_report
+from config.settings import settings
+from schemas.task_schema import get_partial_task_model
+
+from app.core.token_cache import token_cache
+from app.core.user_cache import user_cache
+from app.core.password_hasher import password_hasher
+from app.core.revocation import revocation_list
+from app.core.task_stats_cache import task_stats_cache
+from app.core.batch_loader import id_loader
+from app.core.task_cache import task_cache
+from app.core.task_page_cache import task_page_cache
+from app.core.event_hub import event_hub
+
+# --- Protección de las Métricas ---
+async def require_metrics_token(x_metrics_token: Optional[str] = Header(None)) -> None:
+    """
+    Exige el token compartido METRICS_TOKEN en la cabecera 'X-Metrics-Token'.
+    Sin token configurado las métricas no se exponen (404).
+    """
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if x_metrics_token is None or not secrets.compare_digest(
+        x_metrics_token.encode(), settings.METRICS_TOKEN.encode()
+    ):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Token de métricas inválido.")
+
+
+# --- Configuración de Router ---
+router = APIRouter(prefix="/metrics", tags=["Métricas"], dependencies=[Depends(require_metrics_token)])
+
+# --- Endpoint de Métricas Internas ---
+@router.get("/", summary="Métricas internas del worker")
+async def read_metrics():
+    """
+    Devuelve contadores internos de este worker (pool de MongoDB, cachés y pool de hashing).
+    Cada worker de uvicorn reporta sus propias métricas.
+    """
+    return {
+        "mongo": mongo_manager.stats(),
+        "token_cache": token_cache.stats(),
+        "user_cache": user_cache.stats(),
+        "password_hasher": password_hasher.stats(),
+        "revocation_list": revocation_list.stats(),
+        "task_stats_cache": task_stats_cache.stats(),
+        "task_cache": task_cache.stats(),
+        "task_page_cache": task_page_cache.stats(),
+        "id_loader": id_loader.stats(),
+        "event_hub": event_hub.stats(),
+        "partial_task_models": get_partial_task_model.cache_info()._asdict(),
+    }
+
+
+# --- Endpoint de Desvío de Índices ---
+@router.get("/indexes", summary="Índices declarados vs existentes")
+async def read_index_report(db: AsyncIOMotorDatabase = Depends(get_db)):
+    """
+    Reporta, por colección, los índices declarados que faltan, los que existen sin
+    estar declarados y los que no se usan según $indexStats.
+    """
+    return await index_report(db)
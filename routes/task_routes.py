@@ -1,42 +1,89 @@
-from typing import Annotated
+import asyncio
+import json
+from typing import Annotated, Any, AsyncIterator, FrozenSet, List, Literal, Optional, Type
+from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, WebSocket, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
 from bson import ObjectId # Todavía necesario para la validación de IDs en la ruta
 
 # Importación de Repositorio y Dependencias
-from repositories.task_repository import TaskRepository
-from schemas.task_schema import TaskInDB, TaskCreate, TaskUpdate, TaskListResponse
+from repositories.task_repository import TaskRepository, SyncTokenExpired
+from repositories.task_query import TaskQuery
+from repositories.user_repository import UserRepository
+from schemas.task_schema import (
+    TaskInDB, TaskCreate, TaskUpdate, TaskListResponse, parse_task_fields,
+    TaskBulkCreateRequest, TaskBulkUpdateRequest, TaskBulkDeleteRequest,
+    BulkItemResult, BulkResponse, BulkFilterUpdateResponse, TaskImportResponse, TaskStats,
+    TaskChangesResponse,
+)
 from schemas.user_schema import UserInDB
 from app.core.dependencies import get_current_user, get_task_repository # Importamos el repositorio
+from app.core.content_negotiation import (
+    NegotiatedResponse, NegotiatedRoute, is_msgpack, msgpack, negotiated_media_type,
+)
+from app.core.task_page_cache import task_page_cache
+from app.core.conditional import apply_cache_headers, etag_matches, make_etag, not_modified
+from app.core.event_hub import StreamClosed, Subscription, event_hub
+from config.database import get_database_instance, mongo_manager
+from config.settings import settings
+from utils.task_export import EXPORT_MEDIA_TYPES, export_columns, stream_export
+from utils.task_import import iter_records
+from services.task_import_service import TaskImportService
 
 # Crea la instancia del router y añade el prefijo para la documentación
+# Las rutas responden en JSON o MessagePack según el Accept (ver app/core/content_negotiation.py)
 router = APIRouter(
     prefix="/tasks",
     tags=["Tareas"],
+    route_class=NegotiatedRoute,
+    default_response_class=NegotiatedResponse,
 )
 
-# --- Dependencia Helper para obtener la Tarea o lanzar 404 ---
-async def get_task_or_404_by_repo(
-    task_id: str, 
-    # Inyectamos el usuario actual y el repositorio
-    current_user: Annotated[UserInDB, Depends(get_current_user)], 
-    task_repo: Annotated[TaskRepository, Depends(get_task_repository)]
-) -> TaskInDB:
-    """
-    Busca una tarea por ID para el usuario actual utilizando el repositorio.
-    Lanza HTTPException 404 si no se encuentra o no pertenece al usuario.
-    """
+FIELDS_DESCRIPTION = "Campos a devolver separados por comas (p. ej. 'title,completed,due_date'). 'id' siempre se incluye."
+
+def _ensure_valid_task_id(task_id: str) -> None:
+    """Lanza 404 si el ID no es un ObjectId válido (mismo criterio en todas las rutas)."""
     if not ObjectId.is_valid(task_id):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="ID de tarea inválido")
-    
-    # El repositorio maneja la lógica de buscar por ID + Owner_ID
-    task = await task_repo.get_by_id(task_id, current_user.id)
-    
-    if not task:
-        # Mensaje genérico por seguridad
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tarea no encontrada")
-        
-    return task
+
+
+def _read_response(
+    content: Any, fields: Optional[FrozenSet[str]], envelope: Optional[Type[BaseModel]] = None
+) -> Any:
+    """
+    Respuesta de las lecturas de tareas. Con TASK_TRUSTED_READS las tareas ya
+    vienen validadas del repositorio y se serializan directamente (JSON con
+    orjson o MessagePack), sin revalidarlas contra el response_model; 'envelope'
+    completa el contenido con los mismos campos por defecto que este tendría
+    (con '?fields=' se devuelve tal cual, como antes).
+
+    Si no, con '?fields=' el contenido usa modelos parciales que no validan
+    contra el response_model completo, así que también se serializa directamente.
+    """
+    if settings.TASK_TRUSTED_READS:
+        if envelope is not None and fields is None:
+            content = envelope.model_construct(**content)
+        return NegotiatedResponse(content)
+    if fields is None:
+        return content
+    return NegotiatedResponse(jsonable_encoder(content))
+
+
+def _ensure_bulk_size(count: int) -> None:
+    """Lanza 400 si la petición bulk supera BULK_MAX_ITEMS."""
+    if count > settings.BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Demasiados elementos: máximo {settings.BULK_MAX_ITEMS} por petición.",
+        )
+
+
+def _bulk_response(results: List[BulkItemResult]) -> BulkResponse:
+    failed = sum(1 for result in results if result.status in ("not_found", "invalid", "error"))
+    return BulkResponse(results=results, succeeded=len(results) - failed, failed=failed)
 
 
 # --- Rutas CRUD (Usando el Repositorio) ---
@@ -54,57 +101,479 @@ async def create_task(
 
 @router.get("/", response_model=TaskListResponse, summary="Listar Tareas")
 async def read_tasks(
+    request: Request,
+    response: Response,
     current_user: Annotated[UserInDB, Depends(get_current_user)],
     task_repo: Annotated[TaskRepository, Depends(get_task_repository)],
+    page: int = Query(1, ge=1, description="Número de página (modo page/size)."),
+    size: int = Query(10, ge=1, le=100, description="Tareas por página."),
+    cursor: Optional[str] = Query(
+        None,
+        description="Modo cursor: valor 'next_cursor' de la página anterior (vacío para la primera página).",
+    ),
+    completed: Optional[bool] = Query(None, description="Filtrar por estado de completado."),
+    due_before: Optional[datetime] = Query(None, description="Solo tareas que vencen antes de esta fecha."),
+    due_after: Optional[datetime] = Query(None, description="Solo tareas que vencen en o después de esta fecha."),
+    created_since: Optional[datetime] = Query(None, description="Solo tareas creadas desde esta fecha."),
+    sort: str = Query("-created_at", description="Orden: created_at, due_date o updated_at ('-' para descendente)."),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
 ):
-    """Lista todas las tareas del usuario autenticado."""
-    # Por ahora, usamos una lista simple sin paginación (si TaskRepository tiene paginación, 
-    # podrías ajustar esto para incluir page y size como query params)
-    tasks = await task_repo.get_all_tasks(current_user.id)
-    return {"tasks": tasks, "total": len(tasks)}
+    """
+    Lista las tareas del usuario autenticado, filtradas y paginadas por page/size
+    o por cursor. Con If-None-Match responde 304 si el listado no cambió.
+    """
+    # 1. Construir la consulta (valida el orden, que un índice declarado la pueda
+    #    servir y los campos pedidos)
+    try:
+        selected_fields = parse_task_fields(fields)
+        query = TaskQuery(
+            completed=completed,
+            due_before=due_before,
+            due_after=due_after,
+            created_since=created_since,
+            sort=sort,
+        ).validate()
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    # 2. Versión del propietario (cualquier escritura suya la avanza): con ella se
+    #    responden las peticiones condicionales sin consultar las tareas
+    media_type = negotiated_media_type()
+    position = ("cursor", cursor) if cursor is not None else ("page", page)
+    page_key = etag = None
+    cacheable = settings.TASK_PAGE_CACHE_ENABLED and settings.TASK_TRUSTED_READS and (
+        cursor == "" or (cursor is None and page <= settings.TASK_PAGE_CACHE_MAX_PAGE)
+    )
+    if settings.ETAG_ENABLED or cacheable:
+        version = await task_repo.get_version(current_user.id)
+    if settings.ETAG_ENABLED:
+        etag = make_etag(
+            "tasks", current_user.id, version, position, size, query.cache_key(),
+            None if selected_fields is None else sorted(selected_fields), media_type,
+        )
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return not_modified(etag)
+
+    # 3. Caché de páginas: las primeras páginas ya serializadas, por versión del
+    #    propietario (una escritura las deja inalcanzables)
+    if cacheable:
+        page_key = (position, size, query.cache_key(), selected_fields, media_type)
+        body = task_page_cache.get(current_user.id, version, page_key)
+        if body is not None:
+            return apply_cache_headers(Response(body, media_type=media_type), response, etag)
+
+    # 4. Modo cursor (keyset): coste constante por página, sin importar la profundidad.
+    #    Los contadores del usuario (O(1)) se leen a la vez que la página.
+    if cursor is not None:
+        try:
+            (tasks, next_cursor, has_more), counts = await task_repo.gather(
+                task_repo.get_tasks_after(current_user.id, cursor, size, query, selected_fields),
+                task_repo.get_counts(current_user.id),
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        result = _read_response({
+            "tasks": tasks,
+            "total": await task_repo.count_tasks(current_user.id, query, counts),
+            "counts": counts,
+            "size": size,
+            "next_cursor": next_cursor,
+            "has_more": has_more,
+        }, selected_fields, TaskListResponse)
+
+    else:
+        # 5. Modo clásico page/size
+        tasks, counts = await task_repo.gather(
+            task_repo.get_all_tasks(current_user.id, page, size, query, selected_fields),
+            task_repo.get_counts(current_user.id),
+        )
+        result = _read_response({
+            "tasks": tasks,
+            "total": await task_repo.count_tasks(current_user.id, query, counts),
+            "counts": counts,
+            "page": page,
+            "size": size,
+        }, selected_fields, TaskListResponse)
+
+    # 6. Se guarda con la versión leída antes de la consulta: si hubo una escritura
+    #    entretanto, la versión ya avanzó y la entrada (y el ETag) no se volverán a usar
+    if page_key is not None:
+        task_page_cache.set(current_user.id, version, page_key, result.body)
+    return apply_cache_headers(result, response, etag)
+
+@router.get("/stats", response_model=TaskStats, summary="Estadísticas de Tareas")
+async def read_task_stats(
+    current_user: Annotated[UserInDB, Depends(get_current_user)],
+    task_repo: Annotated[TaskRepository, Depends(get_task_repository)],
+):
+    """Resumen de las tareas del usuario (abiertas, completadas, vencidas y de esta semana) en una sola consulta."""
+    return await task_repo.get_stats(current_user.id)
+
+@router.get("/changes", response_model=TaskChangesResponse, summary="Cambios desde la última sincronización")
+async def read_task_changes(
+    current_user: Annotated[UserInDB, Depends(get_current_user)],
+    task_repo: Annotated[TaskRepository, Depends(get_task_repository)],
+    since: Optional[str] = Query(
+        None, description="Valor 'next_since' de la sincronización anterior (vacío para todas las tareas)."
+    ),
+    limit: int = Query(100, ge=1, le=settings.TASK_CHANGES_MAX_LIMIT, description="Máximo de cambios por respuesta."),
+):
+    """
+    Sincronización incremental: tareas creadas, modificadas ('upsert') o
+    borradas ('delete') desde el token 'since', en orden. Con has_more se
+    sigue llamando con next_since; 410 si el token es demasiado antiguo.
+    """
+    try:
+        changes, next_since, has_more = await task_repo.get_changes(current_user.id, since or None, limit)
+    except SyncTokenExpired as e:
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return _read_response(
+        {"changes": changes, "next_since": next_since, "has_more": has_more}, None, TaskChangesResponse
+    )
+
+# --- Streaming de Cambios (SSE y WebSocket) ---
+# Avisos en vivo de las escrituras del usuario ('created', 'updated', 'deleted' y
+# 'resync'); lo perdido durante una desconexión se recupera con GET /tasks/changes.
+
+def _subscribe(owner_id: str, transport: str) -> Optional[Subscription]:
+    """Suscripción al hub de eventos, o None si el usuario ya tiene el máximo de conexiones."""
+    if not settings.TASK_STREAM_ENABLED:
+        return None
+    return event_hub.subscribe(owner_id, transport)
+
+async def _sse_events(owner_id: str) -> AsyncIterator[str]:
+    """
+    Eventos en formato text/event-stream, con un comentario de heartbeat cuando no hay actividad.
+
+    La suscripción se crea al empezar a iterar y se libera en el 'finally': si el
+    cliente se desconecta antes de recibir nada, el generador nunca arranca y no
+    queda ninguna suscripción ocupando su cupo de conexiones.
+    """
+    subscription = _subscribe(owner_id, "sse")
+    if subscription is None:
+        # Otra conexión ocupó el último hueco entre la comprobación de la ruta y este punto
+        yield f"event: closed\ndata: {json.dumps({'reason': 'too_many_connections'})}\n\n"
+        return
+    try:
+        yield f"retry: {int(settings.TASK_STREAM_HEARTBEAT_SECONDS * 1000)}\n\n"
+        while True:
+            try:
+                event = await subscription.next(settings.TASK_STREAM_HEARTBEAT_SECONDS)
+            except StreamClosed as closed:
+                yield f"event: closed\ndata: {json.dumps({'reason': closed.reason})}\n\n"
+                return
+            if event is None:
+                yield ": heartbeat\n\n"
+            else:
+                yield f"id: {event.seq}\nevent: {event.type}\ndata: {event.data}\n\n"
+    finally:
+        # También al cancelarse el stream porque el cliente se desconectó
+        event_hub.unsubscribe(subscription)
+
+@router.get("/stream", summary="Cambios de Tareas en Vivo (SSE)")
+async def stream_task_events(
+    current_user: Annotated[UserInDB, Depends(get_current_user)],
+):
+    """
+    Server-Sent Events con las escrituras de tareas del usuario. Cada evento
+    lleva 'id' (número de secuencia), 'event' (tipo) y 'data' (JSON con type,
+    id, seq y task). Si el cliente no consume a tiempo se envía 'closed' y se
+    corta la conexión; tras reconectar, GET /tasks/changes devuelve lo perdido.
+    """
+    if not settings.TASK_STREAM_ENABLED or not event_hub.admits(current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Demasiadas conexiones de streaming abiertas o streaming desactivado",
+        )
+    return StreamingResponse(
+        _sse_events(current_user.id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+async def _websocket_user(websocket: WebSocket, token: Optional[str]) -> Optional[UserInDB]:
+    """
+    Autentica el WebSocket con el token (parámetro 'token' o cabecera Authorization,
+    ya que los navegadores no permiten cabeceras propias) igual que get_current_user.
+    Si falla, cierra la conexión y retorna None.
+    """
+    if token is None:
+        scheme, _, credentials = websocket.headers.get("authorization", "").partition(" ")
+        token = credentials if scheme.lower() == "bearer" else None
+    if not token:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Token requerido")
+        return None
+    database = get_database_instance()
+    if database is None or mongo_manager.breaker.is_open:
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER, reason="Base de datos no disponible")
+        return None
+    try:
+        return await get_current_user(token, UserRepository(database))
+    except HTTPException as e:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=str(e.detail))
+        return None
+
+async def _wait_websocket_disconnect(websocket: WebSocket) -> None:
+    """Descarta lo que envíe el cliente hasta que cierre la conexión."""
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
+
+@router.websocket("/stream/ws")
+async def stream_task_events_ws(
+    websocket: WebSocket,
+    token: Optional[str] = Query(None, description="Token de acceso (alternativa a la cabecera Authorization)."),
+):
+    """
+    Equivalente WebSocket de GET /tasks/stream: un mensaje JSON por evento
+    ({type, id, seq, task}) y {"type": "heartbeat"} sin actividad. Un consumidor
+    lento se desconecta con el código 1013.
+    """
+    current_user = await _websocket_user(websocket, token)
+    if current_user is None:
+        return
+    subscription = _subscribe(current_user.id, "websocket")
+    if subscription is None:
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER, reason="Demasiadas conexiones de streaming")
+        return
+
+    disconnected: Optional[asyncio.Task] = None
+    try:
+        # Dentro del try: si el cliente ya se fue, accept falla y la suscripción se libera igual
+        await websocket.accept()
+        disconnected = asyncio.create_task(_wait_websocket_disconnect(websocket))
+        while True:
+            # Se espera el siguiente evento o la desconexión, lo que ocurra antes
+            next_event = asyncio.create_task(subscription.next(settings.TASK_STREAM_HEARTBEAT_SECONDS))
+            await asyncio.wait({next_event, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+            if disconnected.done():
+                next_event.cancel()
+                return
+            try:
+                event = next_event.result()
+            except StreamClosed as closed:
+                code = status.WS_1013_TRY_AGAIN_LATER if closed.reason == "slow_consumer" else status.WS_1001_GOING_AWAY
+                await websocket.close(code=code, reason=closed.reason)
+                return
+            await websocket.send_text(event.data if event is not None else '{"type":"heartbeat"}')
+    finally:
+        if disconnected is not None:
+            disconnected.cancel()
+        event_hub.unsubscribe(subscription)
+
+@router.get("/export", summary="Exportar Tareas")
+async def export_tasks(
+    request: Request,
+    current_user: Annotated[UserInDB, Depends(get_current_user)],
+    task_repo: Annotated[TaskRepository, Depends(get_task_repository)],
+    format: Literal["ndjson", "csv"] = Query("ndjson", description="Formato de salida."),
+    completed: Optional[bool] = Query(None, description="Filtrar por estado de completado."),
+    due_before: Optional[datetime] = Query(None, description="Solo tareas que vencen antes de esta fecha."),
+    due_after: Optional[datetime] = Query(None, description="Solo tareas que vencen en o después de esta fecha."),
+    created_since: Optional[datetime] = Query(None, description="Solo tareas creadas desde esta fecha."),
+    sort: str = Query("-created_at", description="Orden: created_at, due_date o updated_at ('-' para descendente)."),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+):
+    """
+    Exporta todas las tareas del usuario (con los mismos filtros que el listado)
+    en streaming, leyendo el cursor por lotes: la memoria no depende del número de tareas.
+    """
+    try:
+        selected_fields = parse_task_fields(fields)
+        query = TaskQuery(
+            completed=completed,
+            due_before=due_before,
+            due_after=due_after,
+            created_since=created_since,
+            sort=sort,
+        ).validate()
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    tasks = task_repo.iter_tasks(current_user.id, query, selected_fields)
+    return StreamingResponse(
+        stream_export(
+            tasks,
+            format,
+            export_columns(selected_fields),
+            request.is_disconnected,
+            settings.EXPORT_BATCH_SIZE,
+        ),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="tasks.{format}"'},
+    )
+
+@router.post("/import", response_model=TaskImportResponse, summary="Importar Tareas")
+async def import_tasks(
+    request: Request,
+    current_user: Annotated[UserInDB, Depends(get_current_user)],
+    task_repo: Annotated[TaskRepository, Depends(get_task_repository)],
+    format: Optional[Literal["ndjson", "csv", "msgpack"]] = Query(
+        None,
+        description="Formato del cuerpo: NDJSON, CSV con cabecera u objetos MessagePack concatenados. "
+                    "Por defecto, msgpack si el Content-Type es 'application/msgpack' y si no ndjson.",
+    ),
+):
+    """
+    Importa tareas desde el cuerpo de la petición (NDJSON, CSV o MessagePack),
+    leído en streaming. Las líneas inválidas se informan en 'errors' sin detener la importación.
+    """
+    if format is None:
+        format = "msgpack" if is_msgpack(request.headers.get("content-type")) else "ndjson"
+    if format == "msgpack" and msgpack is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="MessagePack no está disponible en este servidor.",
+        )
+    records = iter_records(request.stream(), format, settings.IMPORT_MAX_RECORD_BYTES)
+    return await TaskImportService(task_repo, current_user.id).run(records)
+
+# --- Operaciones Masivas ---
+# Declaradas (como '/stats', '/export' e '/import') antes de '/{task_id}' para que '/bulk' no se interprete como un ID
+
+@router.post("/bulk", response_model=BulkResponse, summary="Crear Tareas en Bloque")
+async def create_tasks_bulk(
+    body: TaskBulkCreateRequest,
+    current_user: Annotated[UserInDB, Depends(get_current_user)],
+    task_repo: Annotated[TaskRepository, Depends(get_task_repository)],
+):
+    """Crea varias tareas en pocas operaciones insert_many. El resultado se informa por elemento."""
+    _ensure_bulk_size(len(body.tasks))
+    results = await task_repo.create_tasks(body.tasks, current_user.id)
+    return _bulk_response(results)
+
+@router.patch("/bulk", response_model=BulkResponse, summary="Actualizar Tareas en Bloque")
+async def update_tasks_bulk(
+    body: TaskBulkUpdateRequest,
+    current_user: Annotated[UserInDB, Depends(get_current_user)],
+    task_repo: Annotated[TaskRepository, Depends(get_task_repository)],
+):
+    """Aplica varias actualizaciones (cada una con su 'id') en pocas operaciones bulk_write."""
+    _ensure_bulk_size(len(body.tasks))
+    results = await task_repo.update_tasks(body.tasks, current_user.id)
+    return _bulk_response(results)
+
+@router.delete("/bulk", response_model=BulkResponse, summary="Eliminar Tareas en Bloque")
+async def delete_tasks_bulk(
+    body: TaskBulkDeleteRequest,
+    current_user: Annotated[UserInDB, Depends(get_current_user)],
+    task_repo: Annotated[TaskRepository, Depends(get_task_repository)],
+):
+    """Elimina varias tareas por ID en pocas operaciones delete_many."""
+    _ensure_bulk_size(len(body.ids))
+    results = await task_repo.delete_tasks(body.ids, current_user.id)
+    return _bulk_response(results)
+
+@router.patch("/bulk/filter", response_model=BulkFilterUpdateResponse, summary="Actualizar Tareas por Filtro")
+async def update_tasks_by_filter(
+    task_update: TaskUpdate,
+    current_user: Annotated[UserInDB, Depends(get_current_user)],
+    task_repo: Annotated[TaskRepository, Depends(get_task_repository)],
+    completed: Optional[bool] = Query(None, description="Filtrar por estado de completado."),
+    due_before: Optional[datetime] = Query(None, description="Solo tareas que vencen antes de esta fecha."),
+    due_after: Optional[datetime] = Query(None, description="Solo tareas que vencen en o después de esta fecha."),
+    created_since: Optional[datetime] = Query(None, description="Solo tareas creadas desde esta fecha."),
+):
+    """
+    Aplica la misma actualización a todas las tareas que cumplan los filtros, en
+    una sola operación (p. ej. marcar como completadas todas las vencidas:
+    '?completed=false&due_before=<ahora>' con '{"completed": true}').
+    """
+    if not task_update.model_dump(exclude_unset=True):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No hay campos para actualizar.")
+
+    # Sin orden propio: se valida con el campo de rango filtrado para que el plan
+    # de índices refleje lo que acota el recorrido (como en GET /tasks)
+    try:
+        query = TaskQuery(
+            completed=completed,
+            due_before=due_before,
+            due_after=due_after,
+            created_since=created_since,
+            sort="due_date" if due_before is not None or due_after is not None else "-created_at",
+        ).validate()
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    matched, modified = await task_repo.update_tasks_matching(current_user.id, query, task_update)
+    return BulkFilterUpdateResponse(matched=matched, modified=modified)
 
 @router.get("/{task_id}", response_model=TaskInDB, summary="Obtener Tarea por ID")
 async def read_task(
-    # La dependencia helper ya busca y valida la tarea
-    task: Annotated[TaskInDB, Depends(get_task_or_404_by_repo)], 
+    task_id: str,
+    request: Request,
+    response: Response,
+    current_user: Annotated[UserInDB, Depends(get_current_user)],
+    task_repo: Annotated[TaskRepository, Depends(get_task_repository)],
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
 ):
-    """Obtiene una tarea específica por su ID, verificando propiedad."""
-    return task 
+    """
+    Obtiene una tarea específica por su ID, verificando propiedad. Con
+    If-None-Match responde 304 si la tarea que se serviría no cambió.
+    """
+    try:
+        selected_fields = parse_task_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    # 404 tanto si el ID no es válido como si la tarea no existe o es de otro usuario
+    _ensure_valid_task_id(task_id)
+
+    found = await task_repo.get_with_version(task_id, current_user.id, selected_fields)
+    if not found:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tarea no encontrada")
+    task, updated_at = found
+
+    # El ETag sale del 'updated_at' de la copia que se sirve (que puede venir de
+    # la caché de tareas), no de la versión del propietario: así un 304 nunca fija
+    # en el cliente una copia distinta de la que se le habría enviado
+    etag = None
+    if settings.ETAG_ENABLED:
+        etag = make_etag(
+            "task", task_id, updated_at,
+            None if selected_fields is None else sorted(selected_fields), negotiated_media_type(),
+        )
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return not_modified(etag)
+
+    return apply_cache_headers(_read_response(task, selected_fields), response, etag)
 
 @router.put("/{task_id}", response_model=TaskInDB, summary="Actualizar Tarea")
 async def update_task(
+    task_id: str,
     task_update: TaskUpdate,
-    # Obtenemos la tarea existente y verificada por la dependencia helper
-    task: Annotated[TaskInDB, Depends(get_task_or_404_by_repo)], 
     current_user: Annotated[UserInDB, Depends(get_current_user)],
     task_repo: Annotated[TaskRepository, Depends(get_task_repository)],
 ):
     """Actualiza una tarea existente."""
-    
-    # El repositorio maneja la actualización y el timestamp
-    updated_task = await task_repo.update_task(task.id, current_user.id, task_update)
+    _ensure_valid_task_id(task_id)
+
+    # El repositorio actualiza (con verificación de owner_id) y devuelve el resultado
+    # en una sola operación: si no hay documento, la tarea no existe o no es del usuario
+    updated_task = await task_repo.update_task(task_id, current_user.id, task_update)
 
     if not updated_task:
-        # En caso de que el repositorio falle en encontrarla después de la verificación
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Fallo en la base de datos al actualizar")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tarea no encontrada")
 
     return updated_task
 
 
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT, summary="Eliminar Tarea")
 async def delete_task(
-    # Obtenemos la tarea para asegurar que existe antes de intentar borrar
-    task: Annotated[TaskInDB, Depends(get_task_or_404_by_repo)], 
+    task_id: str,
     current_user: Annotated[UserInDB, Depends(get_current_user)],
     task_repo: Annotated[TaskRepository, Depends(get_task_repository)],
 ):
     """Elimina una tarea existente por su ID."""
-    
-    # El repositorio maneja la eliminación con la verificación de owner_id
-    deleted = await task_repo.delete_task(task.id, current_user.id)
+    _ensure_valid_task_id(task_id)
+
+    # El repositorio elimina con la verificación de owner_id en una sola operación
+    deleted = await task_repo.delete_task(task_id, current_user.id)
     
     if not deleted:
-        # Si no se pudo borrar, algo falló a nivel DB/repositorio
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Fallo al eliminar la tarea")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tarea no encontrada")
         
     return
\ No newline at end of file
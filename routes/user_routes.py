@@ -1,14 +1,28 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from motor.motor_asyncio import AsyncIOMotorDatabase
 
-from schemas.user_schema import UserResponse, UserInDB # Importamos UserInDB para la dependencia
+from schemas.user_schema import UserResponse, UserInDB, UserUpdate # Importamos UserInDB para la dependencia
 from app.core.auth_dependency import get_current_user # La nueva dependencia
+from repositories.user_repository import UserRepository
+from config.database import get_db
+from app.core.content_negotiation import NegotiatedResponse, NegotiatedRoute, negotiated_media_type
+from app.core.conditional import apply_cache_headers, etag_matches, make_etag, not_modified
+from config.settings import settings
 
 # --- Configuración de Router ---
-router = APIRouter(prefix="/users", tags=["Usuarios"])
+# Responde en JSON o MessagePack según el Accept (ver app/core/content_negotiation.py)
+router = APIRouter(
+    prefix="/users",
+    tags=["Usuarios"],
+    route_class=NegotiatedRoute,
+    default_response_class=NegotiatedResponse,
+)
 
 # --- Endpoint de Perfil Protegido ---
 @router.get("/me", response_model=UserResponse)
 async def read_users_me(
+    request: Request,
+    response: Response,
     # La clave CRÍTICA: La dependencia get_current_user se encarga de:
     # 1. Extraer el token del encabezado Authorization.
     # 2. Decodificarlo y validar la expiración.
@@ -18,6 +32,37 @@ async def read_users_me(
 ):
     """
     Obtiene la información del usuario actualmente autenticado (ruta protegida).
+    Con If-None-Match responde 304 si el perfil no cambió.
     """
+    # El ETag sale de los mismos campos que devuelve UserResponse (el usuario ya
+    # está en memoria tras la autenticación): no hay que serializar nada para compararlo
+    etag = None
+    if settings.ETAG_ENABLED:
+        etag = make_etag(
+            "user", current_user.id, current_user.email, current_user.full_name,
+            current_user.is_active, negotiated_media_type(),
+        )
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return not_modified(etag)
+
     # Devolvemos el usuario (limitado a UserResponse para ocultar el hash de la contraseña)
-    return current_user
\ No newline at end of file
+    return apply_cache_headers(current_user, response, etag)
+
+@router.patch("/me", response_model=UserResponse)
+async def update_users_me(
+    update_data: UserUpdate,
+    current_user: UserInDB = Depends(get_current_user),
+    db: AsyncIOMotorDatabase = Depends(get_db),
+):
+    """
+    Actualiza el perfil del usuario autenticado. El repositorio invalida su
+    entrada en la caché de identidad para que la próxima petición vea el cambio.
+    """
+    fields = update_data.model_dump(exclude_unset=True)
+    if not fields:
+        return current_user
+
+    user = await UserRepository(db).update_user(current_user.id, fields)
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Usuario no encontrado")
+    return user
@@ -1,5 +1,6 @@
-from typing import Optional, List, Generic, TypeVar
-from pydantic import BaseModel, Field, ConfigDict
+from typing import Optional, List, Generic, TypeVar, FrozenSet, Type, Literal
+from functools import lru_cache
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter, create_model
 from datetime import datetime
 
 T = TypeVar('T')
@@ -48,8 +49,120 @@ class TaskInDB(TaskBase):
     )
 
 # 5. Schema para respuesta paginada de tareas
+class TaskCounts(BaseModel):
+    total: int = 0
+    completed: int = 0
+    open: int = 0
+    open_with_due: int = Field(0, description="Tareas abiertas con fecha de vencimiento.")
+
+class TaskStats(BaseModel):
+    total: int = 0
+    completed: int = 0
+    open: int = 0
+    overdue: int = Field(0, description="Tareas abiertas cuya fecha de vencimiento ya pasó.")
+    due_this_week: int = Field(0, description="Tareas abiertas que vencen en los próximos 7 días.")
+    generated_at: datetime = Field(..., description="Momento del cálculo (puede venir de caché).")
+
 class TaskListResponse(BaseModel):
     tasks: List[TaskInDB]
+    # Total de tareas que cumplen los filtros (no solo las de esta página)
     total: int = 0
+    counts: Optional[TaskCounts] = None
     page: int = 1
-    size: int = 10
\ No newline at end of file
+    size: int = 10
+    # Solo en modo cursor: posición opaca de la siguiente página y si existe
+    next_cursor: Optional[str] = None
+    has_more: Optional[bool] = None
+
+class TaskChange(BaseModel):
+    op: Literal["upsert", "delete"] = Field(..., description="'upsert': tarea creada o modificada; 'delete': tarea borrada.")
+    id: str = Field(..., description="ID de la tarea.")
+    seq: int = Field(..., description="Número de secuencia del cambio (creciente por usuario).")
+    # Solo en 'upsert': la tarea completa tras el cambio
+    task: Optional[TaskInDB] = None
+
+class TaskChangesResponse(BaseModel):
+    changes: List[TaskChange]
+    # Token para la siguiente llamada (?since=...)
+    next_since: str
+    has_more: bool = False
+
+# 6. Modelos parciales para respuestas con '?fields=' (sparse fieldsets)
+TASK_FIELDS = frozenset(TaskInDB.model_fields)
+
+def parse_task_fields(raw: Optional[str]) -> Optional[FrozenSet[str]]:
+    """
+    Convierte 'title,completed' en el conjunto de campos pedidos ('id' siempre incluido).
+    Retorna None si no se pidió ningún subconjunto. Lanza ValueError con campos desconocidos.
+    """
+    if raw is None or not raw.strip():
+        return None
+    requested = {field.strip() for field in raw.split(",") if field.strip()}
+    unknown = requested - TASK_FIELDS
+    if unknown:
+        raise ValueError(f"Campos desconocidos: {', '.join(sorted(unknown))}. Válidos: {', '.join(sorted(TASK_FIELDS))}")
+    return frozenset(requested | {"id"})
+
+@lru_cache(maxsize=64)
+def get_partial_task_model(fields: FrozenSet[str]) -> Type[BaseModel]:
+    """
+    Devuelve (y cachea) un modelo con solo los campos pedidos de TaskInDB.
+    La caché acotada evita reconstruir modelos Pydantic en cada petición.
+    """
+    definitions = {
+        name: (info.annotation, info)
+        for name, info in TaskInDB.model_fields.items()
+        if name in fields
+    }
+    model_name = "TaskPartial_" + "_".join(sorted(fields))
+    return create_model(model_name, __config__=TaskInDB.model_config, **definitions)
+
+@lru_cache(maxsize=64)
+def get_task_list_adapter(fields: Optional[FrozenSet[str]] = None) -> TypeAdapter:
+    """
+    Devuelve (y cachea) un TypeAdapter que valida una lista completa de tareas
+    (o de modelos parciales) en una sola llamada al núcleo compilado de Pydantic.
+    """
+    model = TaskInDB if fields is None else get_partial_task_model(fields)
+    return TypeAdapter(List[model])
+
+# 7. Schemas para operaciones masivas (bulk)
+class TaskBulkCreateRequest(BaseModel):
+    tasks: List[TaskCreate] = Field(..., min_length=1, description="Tareas a crear.")
+
+class TaskBulkUpdateItem(TaskUpdate):
+    id: str = Field(..., description="ID de la tarea a actualizar.")
+
+class TaskBulkUpdateRequest(BaseModel):
+    tasks: List[TaskBulkUpdateItem] = Field(..., min_length=1, description="Actualizaciones a aplicar.")
+
+class TaskBulkDeleteRequest(BaseModel):
+    ids: List[str] = Field(..., min_length=1, description="IDs de las tareas a eliminar.")
+
+class BulkItemResult(BaseModel):
+    index: int = Field(..., description="Posición del elemento en la petición.")
+    id: Optional[str] = None
+    status: Literal["created", "updated", "deleted", "not_found", "invalid", "error"]
+    error: Optional[str] = None
+
+class BulkResponse(BaseModel):
+    results: List[BulkItemResult]
+    succeeded: int = 0
+    failed: int = 0
+
+class BulkFilterUpdateResponse(BaseModel):
+    matched: int = 0
+    modified: int = 0
+
+# 8. Schemas para la importación de tareas
+class ImportLineError(BaseModel):
+    line: int = Field(..., description="Línea del archivo (inicio del registro en CSV; posición del objeto en MessagePack).")
+    error: str
+
+class TaskImportResponse(BaseModel):
+    processed: int = Field(0, description="Registros leídos (sin contar cabecera ni líneas vacías).")
+    created: int = 0
+    failed: int = 0
+    errors: List[ImportLineError] = []
+    # Solo se detallan los primeros IMPORT_MAX_ERRORS errores
+    errors_truncated: bool = False
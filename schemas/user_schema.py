@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import Optional
 from pydantic import BaseModel, Field, EmailStr
 
@@ -16,6 +17,8 @@ class UserInDB(BaseModel):
     full_name: Optional[str] = None
     hashed_password: str
     is_active: bool = True
+    # Los tokens emitidos antes de este instante ya no son válidos (POST /auth/logout)
+    tokens_revoked_at: Optional[datetime] = None
     
     # CRÍTICO PARA PYDANTIC V2 Y MONGODB
     # Esta configuración es esencial para que Pydantic acepte datos de MongoDB
@@ -33,6 +36,10 @@ class UserInDB(BaseModel):
         },
     }
     
+# Esquema para actualizar el perfil propio (PATCH /users/me)
+class UserUpdate(BaseModel):
+    full_name: Optional[str] = Field(None, max_length=100, example="John Doe")
+
 # Esquema para la respuesta después del registro (no incluye el hash)
 class UserResponse(BaseModel):
     id: str
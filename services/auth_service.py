@@ -3,7 +3,9 @@ from fastapi import HTTPException, status
 
 from schemas.user_schema import UserInDB, UserCreate
 from repositories.user_repository import UserRepository
-from app.core.security import create_access_token, get_password_hash, verify_password 
+from app.core.security import create_access_token
+from app.core.password_hasher import password_hasher
+from config.settings import settings
 
 # --- Servicio de Autenticación (AuthService) ---
 
@@ -14,24 +16,24 @@ class AuthService:
     async def register_user(self, user_in: UserCreate) -> UserInDB:
         """
         Registra un nuevo usuario, hasheando la contraseña y verificando duplicidad.
+        La duplicidad la detecta el índice único de email al insertar (sin lectura previa).
         """
-        # 1. Verificar si el email ya existe
-        existing_user = await self.user_repository.get_by_email(user_in.email)
-        if existing_user:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="El correo electrónico ya está registrado.")
-            
         try:
-            # 2. HASHEAR LA CONTRASEÑA EN EL SERVICIO
-            hashed_password = get_password_hash(user_in.password)
+            # 1. HASHEAR LA CONTRASEÑA EN EL SERVICIO (en el pool, fuera del event loop)
+            hashed_password = await password_hasher.hash(user_in.password)
             
-            # 3. Delegar la creación al repositorio, pasándole el hash.
+            # 2. Delegar la creación al repositorio, pasándole el hash.
             new_user = await self.user_repository.create_user(user_in, hashed_password)
             return new_user
             
+        except HTTPException:
+            # P. ej. el 503 del pool de hashing saturado: se propaga tal cual
+            raise
+
         except ValueError as e:
             # Captura el error de 'Email already registered' que viene del repositorio
             print(f"DEBUG_ERROR: Valor inválido durante el registro: {e}")
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="El correo electrónico ya está registrado.")
             
         except Exception as e:
             # CAPTURA CUALQUIER OTRO ERROR (e.g., fallos de DB, PyMongoError)
@@ -48,14 +50,25 @@ class AuthService:
         
         user = await self.user_repository.get_by_email(email)
         
-        if user and self.user_repository.verify_password(password, user.hashed_password):
+        if user and await password_hasher.verify(password, user.hashed_password):
             return user
         return None
 
     def create_user_token(self, user: UserInDB) -> str:
         """Crea el token JWT para un usuario autenticado."""
         
+        claims = {"sub": str(user.id)}
+
+        # En modo sin estado el token lleva los datos necesarios para construir
+        # el usuario autenticado sin consultar la colección 'users'
+        if settings.AUTH_STATELESS_MODE:
+            claims.update({
+                "email": user.email,
+                "full_name": user.full_name,
+                "is_active": user.is_active,
+            })
+
         access_token = create_access_token(
-            data={"sub": str(user.id)}, 
+            data=claims, 
         )
         return access_token
\ No newline at end of file
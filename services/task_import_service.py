@@ -0,0 +1,96 @@
+import asyncio
+import logging
+from typing import AsyncIterator, List, Set, Tuple
+
+from pydantic import ValidationError
+
+from repositories.task_repository import TaskRepository
+from schemas.task_schema import TaskCreate, TaskImportResponse, ImportLineError
+from config.settings import settings
+from utils.task_import import ImportRecord
+
+logger = logging.getLogger(__name__)
+
+# --- Servicio de Importación de Tareas ---
+
+class TaskImportService:
+    """
+    Importa tareas desde un flujo de registros (ver utils/task_import.py).
+
+    Los registros se validan con TaskCreate y se agrupan en lotes de
+    IMPORT_BATCH_SIZE que se insertan con insert_many en segundo plano. Como
+    mucho hay IMPORT_MAX_IN_FLIGHT lotes insertándose: al llegar al límite se
+    deja de consumir el flujo, de modo que un MongoDB lento frena la subida
+    (backpressure) en lugar de acumular el archivo en memoria.
+    """
+
+    def __init__(self, task_repository: TaskRepository, owner_id: str):
+        self.task_repository = task_repository
+        self.owner_id = owner_id
+        self.batch_size = settings.IMPORT_BATCH_SIZE
+        # Con sesión causal las escrituras van en serie (una sesión no admite concurrencia)
+        max_in_flight = settings.IMPORT_MAX_IN_FLIGHT if task_repository.session is None else 1
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._result = TaskImportResponse()
+
+    def _add_error(self, line: int, error: str) -> None:
+        self._result.failed += 1
+        if len(self._result.errors) < settings.IMPORT_MAX_ERRORS:
+            self._result.errors.append(ImportLineError(line=line, error=error))
+        else:
+            self._result.errors_truncated = True
+
+    async def _flush(self, batch: List[Tuple[int, TaskCreate]]) -> None:
+        """Inserta un lote y registra el resultado por línea. Libera su hueco al terminar."""
+        try:
+            results = await self.task_repository.create_tasks([task for _, task in batch], self.owner_id)
+            for result in results:
+                if result.status == "created":
+                    self._result.created += 1
+                else:
+                    self._add_error(batch[result.index][0], result.error or "Error de escritura")
+        except Exception as e:
+            # Un fallo del lote completo (p. ej. conexión) no aborta la importación
+            logger.error(f"Fallo al insertar un lote de la importación: {e}")
+            for line, _ in batch:
+                self._add_error(line, "Error al guardar la tarea.")
+        finally:
+            self._in_flight.release()
+
+    async def run(self, records: AsyncIterator[ImportRecord]) -> TaskImportResponse:
+        pending: Set[asyncio.Task] = set()
+        batch: List[Tuple[int, TaskCreate]] = []
+
+        async def submit(current: List[Tuple[int, TaskCreate]]) -> None:
+            # Espera un hueco libre: mientras tanto no se lee más del cuerpo
+            await self._in_flight.acquire()
+            task = asyncio.create_task(self._flush(current))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+
+        # 1. Validar y agrupar en lotes a medida que llegan los registros
+        async for line, record, error in records:
+            self._result.processed += 1
+            if error is not None:
+                self._add_error(line, error)
+                continue
+            try:
+                batch.append((line, TaskCreate.model_validate(record)))
+            except ValidationError as e:
+                first = e.errors()[0]
+                location = ".".join(str(part) for part in first["loc"])
+                self._add_error(line, f"{location}: {first['msg']}" if location else first["msg"])
+                continue
+
+            if len(batch) >= self.batch_size:
+                await submit(batch)
+                batch = []
+
+        # 2. Último lote y espera de los que siguen en curso
+        if batch:
+            await submit(batch)
+        if pending:
+            await asyncio.gather(*pending)
+
+        self._result.errors.sort(key=lambda item: item.line)
+        return self._result
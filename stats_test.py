@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Pruebas de integración de las estadísticas (GET /tasks/stats) y de los
+contadores por usuario que usan los listados.
+Requiere el servidor en marcha (python run.py, un solo worker) y acceso a su
+MongoDB (variables MONGODB_* de config/settings.py, con los mismos valores por defecto)
+para simular datos anteriores a los contadores.
+"""
+
+import os
+import random
+import requests
+from datetime import datetime, timedelta, timezone
+
+from pymongo import MongoClient
+
+BASE_URL = "http://127.0.0.1:8000/api/v1"
+MONGODB_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017")
+MONGODB_DATABASE = os.getenv("MONGODB_DATABASE", "task_manager_db")
+TASKS_COLLECTION = os.getenv("MONGODB_TASKS_COLLECTION", "tasks")
+TASK_STATS_COLLECTION = os.getenv("MONGODB_TASK_STATS_COLLECTION", "task_stats")
+
+failures = 0
+
+def check(condition, message, response=None):
+    global failures
+    if condition:
+        print(f"OK - {message}")
+    else:
+        failures += 1
+        detail = f" ({response.status_code}: {response.text[:300]})" if response is not None else ""
+        print(f"FALLO - {message}{detail}")
+    return condition
+
+def register():
+    email = f"stats_{random.randint(100000, 999999)}@example.com"
+    response = requests.post(f"{BASE_URL}/auth/register", json={
+        "email": email,
+        "password": "TestPass123",
+        "full_name": "Stats User"
+    })
+    if response.status_code != 201:
+        print(f"FALLO - Registro: {response.text}")
+        exit(1)
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    owner_id = requests.get(f"{BASE_URL}/users/me", headers=headers).json()["id"]
+    return headers, owner_id
+
+def iso(moment):
+    return moment.isoformat()
+
+def get_stats(headers):
+    response = requests.get(f"{BASE_URL}/tasks/stats", headers=headers)
+    if response.status_code != 200:
+        check(False, "GET /tasks/stats", response)
+        return {}
+    data = response.json()
+    return {key: data[key] for key in ("total", "completed", "open", "overdue", "due_this_week")}
+
+def test_stats(headers):
+    print("\n=== TEST 1: ESTADÍSTICAS ===")
+    check(get_stats(headers) == {"total": 0, "completed": 0, "open": 0, "overdue": 0, "due_this_week": 0}, "Usuario sin tareas: todo a cero")
+
+    now = datetime.now(timezone.utc)
+    response = requests.post(f"{BASE_URL}/tasks/bulk", json={"tasks": [
+        {"title": "Vencida", "due_date": iso(now - timedelta(days=1))},
+        {"title": "Vence en 3 días", "due_date": iso(now + timedelta(days=3))},
+        # Misma semana pero expresada con otro desfase
+        {"title": "Vence en 5 días (-05:00)", "due_date": iso((now + timedelta(days=5)).astimezone(timezone(timedelta(hours=-5))))},
+        {"title": "Vence en 30 días", "due_date": iso(now + timedelta(days=30))},
+        {"title": "Sin fecha"},
+        {"title": "Vencida pero completada", "due_date": iso(now - timedelta(days=2))},
+    ]}, headers=headers)
+    ids = [item["id"] for item in response.json()["results"]]
+    requests.put(f"{BASE_URL}/tasks/{ids[-1]}", json={"completed": True}, headers=headers)
+
+    stats = get_stats(headers)
+    expected = {"total": 6, "completed": 1, "open": 5, "overdue": 1, "due_this_week": 2}
+    check(stats == expected, f"Resumen correcto: {stats}")
+
+    # Una escritura de este worker invalida la caché de estadísticas
+    requests.put(f"{BASE_URL}/tasks/{ids[0]}", json={"completed": True}, headers=headers)
+    stats = get_stats(headers)
+    check(stats.get("overdue") == 0 and stats.get("completed") == 2, f"Se actualiza tras completar la vencida: {stats}")
+    requests.delete(f"{BASE_URL}/tasks/{ids[1]}", headers=headers)
+    stats = get_stats(headers)
+    check(stats.get("total") == 5 and stats.get("due_this_week") == 1, f"Se actualiza tras borrar: {stats}")
+
+    response = requests.get(f"{BASE_URL}/tasks/stats")
+    check(response.status_code == 401, "Sin token: 401", response)
+
+def legacy_task(owner_id, title, completed=False, due_date=None):
+    """Tarea tal como la guardaban versiones anteriores (sin 'wid' ni contadores)."""
+    now = datetime.utcnow()
+    return {"title": title, "description": None, "due_date": due_date, "completed": completed,
+            "owner_id": owner_id, "created_at": now, "updated_at": now}
+
+def test_legacy_owner_without_counters(db):
+    print("\n=== TEST 2: USUARIO ANTERIOR A LOS CONTADORES ===")
+    headers, owner_id = register()
+    db[TASKS_COLLECTION].insert_many([
+        legacy_task(owner_id, "Antigua 1"),
+        legacy_task(owner_id, "Antigua 2", due_date=datetime.utcnow() - timedelta(days=1)),
+        legacy_task(owner_id, "Antigua 3", completed=True),
+    ])
+    db[TASK_STATS_COLLECTION].delete_many({"_id": owner_id})
+
+    listing = requests.get(f"{BASE_URL}/tasks/", headers=headers).json()
+    check(listing["total"] == 3, f"El total se recalcula desde las tareas (total={listing['total']})")
+    check(listing["counts"] == {"total": 3, "completed": 1, "open": 2, "open_with_due": 1}, f"Contadores: {listing['counts']}")
+    stats = get_stats(headers)
+    check(stats.get("total") == 3 and stats.get("overdue") == 1, f"Estadísticas con tareas antiguas: {stats}")
+
+    requests.post(f"{BASE_URL}/tasks/", json={"title": "Nueva"}, headers=headers)
+    listing = requests.get(f"{BASE_URL}/tasks/", headers=headers).json()
+    check(listing["total"] == 4, f"Las escrituras siguientes suman sobre lo recalculado (total={listing['total']})")
+
+def test_legacy_counter_document(db):
+    print("\n=== TEST 3: CONTADORES DE UNA VERSIÓN ANTERIOR ===")
+    headers, owner_id = register()
+    db[TASKS_COLLECTION].insert_many([legacy_task(owner_id, f"Antigua {i}") for i in range(2)])
+    # Documento de contadores sin 'reconciled' (desfasado respecto a las tareas)
+    db[TASK_STATS_COLLECTION].replace_one(
+        {"_id": owner_id},
+        {"_id": owner_id, "total": 99, "completed": 0, "open": 99, "open_with_due": 0, "version": 7},
+        upsert=True,
+    )
+    listing = requests.get(f"{BASE_URL}/tasks/", headers=headers).json()
+    check(listing["total"] == 2, f"Se ignoran los contadores no verificados (total={listing['total']})")
+    check(db[TASK_STATS_COLLECTION].find_one({"_id": owner_id}).get("reconciled") is True, "El documento queda marcado como reconciliado")
+
+if __name__ == "__main__":
+    print("INICIANDO PRUEBAS DE ESTADÍSTICAS")
+    print("=" * 50)
+
+    headers, _ = register()
+    test_stats(headers)
+
+    db = MongoClient(MONGODB_URI)[MONGODB_DATABASE]
+    test_legacy_owner_without_counters(db)
+    test_legacy_counter_document(db)
+
+    print("\n" + "=" * 50)
+    print("PRUEBAS COMPLETADAS" if not failures else f"PRUEBAS COMPLETADAS CON {failures} FALLOS")
+    print("=" * 50)
+    exit(1 if failures else 0)
@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Pruebas de integración de los cambios en vivo (GET /tasks/stream y WS /tasks/stream/ws).
+Requiere el servidor en marcha (python run.py, un solo worker: el reparto de
+eventos incluido es local a cada worker). La parte WebSocket usa la librería
+'websockets' (incluida en uvicorn[standard]) y se omite si no está instalada.
+"""
+
+import json
+import os
+import random
+import socket
+import time
+import requests
+
+SERVER_HOST, SERVER_PORT = "127.0.0.1", 8000
+BASE_URL = f"http://{SERVER_HOST}:{SERVER_PORT}/api/v1"
+MAX_CONNECTIONS = int(os.getenv("TASK_STREAM_MAX_CONNECTIONS_PER_USER", "5"))
+# Opcional: con el token de /metrics se comprueba además que no quedan suscripciones abiertas
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+failures = 0
+
+def check(condition, message, response=None):
+    global failures
+    if condition:
+        print(f"OK - {message}")
+    else:
+        failures += 1
+        detail = f" ({response.status_code}: {response.text[:300]})" if response is not None else ""
+        print(f"FALLO - {message}{detail}")
+    return condition
+
+def register():
+    email = f"stream_{random.randint(100000, 999999)}@example.com"
+    response = requests.post(f"{BASE_URL}/auth/register", json={
+        "email": email,
+        "password": "TestPass123",
+        "full_name": "Stream User"
+    })
+    if response.status_code != 201:
+        print(f"FALLO - Registro: {response.text}")
+        exit(1)
+    token = response.json()["access_token"]
+    return token, {"Authorization": f"Bearer {token}"}
+
+def open_stream(headers):
+    # chunk_size=1: cada evento se lee en cuanto llega, sin esperar a llenar un búfer
+    response = requests.get(f"{BASE_URL}/tasks/stream", headers=headers, stream=True, timeout=30)
+    lines = response.iter_lines(chunk_size=1, decode_unicode=True) if response.status_code == 200 else None
+    return response, lines
+
+def next_event(lines):
+    """Siguiente evento SSE como dict ('event', 'id', 'data'...), saltando los heartbeats."""
+    event = {}
+    for line in lines:
+        if not line:
+            if event:
+                return event
+            continue
+        if line.startswith(":"):
+            continue
+        field, _, value = line.partition(":")
+        event[field] = value.lstrip(" ")
+    return event
+
+def test_sse_events(headers):
+    print("\n=== TEST 1: EVENTOS SSE ===")
+    response, lines = open_stream(headers)
+    print(f"Status: {response.status_code}")
+    if not check(response.status_code == 200, "Respuesta 200", response):
+        return
+    check(response.headers["content-type"].startswith("text/event-stream"), "Content-Type text/event-stream")
+    check("retry" in next_event(lines), "Primer mensaje: intervalo de reconexión")
+
+    since = requests.get(f"{BASE_URL}/tasks/changes", headers=headers).json()["next_since"]
+    task_id = requests.post(f"{BASE_URL}/tasks/", json={"title": "En vivo"}, headers=headers).json()["id"]
+    requests.put(f"{BASE_URL}/tasks/{task_id}", json={"completed": True}, headers=headers)
+    requests.delete(f"{BASE_URL}/tasks/{task_id}", headers=headers)
+
+    events = [next_event(lines) for _ in range(3)]
+    response.close()
+    check([event.get("event") for event in events] == ["created", "updated", "deleted"], f"Tipos: {[event.get('event') for event in events]}")
+    payloads = [json.loads(event["data"]) for event in events if "data" in event]
+    check(all(payload["id"] == task_id for payload in payloads), "Todos los eventos son de la tarea escrita")
+    check(payloads[0]["task"]["title"] == "En vivo" and payloads[1]["task"]["completed"] is True, "created/updated traen la tarea")
+    check(all(event["id"] == str(payload["seq"]) for event, payload in zip(events, payloads)), "El 'id' SSE es la secuencia")
+
+    # El evento se publica tras registrar la escritura: su secuencia ya está en /tasks/changes
+    changes = requests.get(f"{BASE_URL}/tasks/changes", params={"since": since}, headers=headers).json()["changes"]
+    check(
+        [change["seq"] for change in changes] == [payloads[2]["seq"]],
+        f"La secuencia del evento coincide con la de /tasks/changes ({[change['seq'] for change in changes]})",
+    )
+
+def test_other_users_events(headers):
+    print("\n=== TEST 2: SOLO LOS EVENTOS PROPIOS ===")
+    response, lines = open_stream(headers)
+    next_event(lines)
+    _, other = register()
+    requests.post(f"{BASE_URL}/tasks/", json={"title": "Ajena"}, headers=other)
+    task_id = requests.post(f"{BASE_URL}/tasks/", json={"title": "Propia"}, headers=headers).json()["id"]
+    event = next_event(lines)
+    response.close()
+    check(json.loads(event["data"])["id"] == task_id, "No llegan las escrituras de otro usuario")
+
+def open_connections():
+    """Conexiones de streaming abiertas en el worker según /metrics, o None sin METRICS_TOKEN."""
+    if not METRICS_TOKEN:
+        return None
+    response = requests.get(f"{BASE_URL}/metrics/", headers={"X-Metrics-Token": METRICS_TOKEN})
+    return response.json()["event_hub"]["connections"] if response.status_code == 200 else None
+
+def test_connection_limit(token, headers):
+    print("\n=== TEST 3: LÍMITE DE CONEXIONES SIN FUGAS ===")
+    # Clientes que se desconectan antes de recibir nada no deben ocupar cupo
+    for _ in range(MAX_CONNECTIONS * 2):
+        raw = socket.create_connection((SERVER_HOST, SERVER_PORT))
+        raw.sendall(
+            f"GET /api/v1/tasks/stream HTTP/1.1\r\nHost: {SERVER_HOST}\r\n"
+            f"Authorization: Bearer {token}\r\n\r\n".encode()
+        )
+        raw.close()
+    time.sleep(1)
+
+    streams = [open_stream(headers)[0] for _ in range(MAX_CONNECTIONS)]
+    check(all(stream.status_code == 200 for stream in streams), f"Se abren {MAX_CONNECTIONS} conexiones tras las desconexiones tempranas")
+    extra = requests.get(f"{BASE_URL}/tasks/stream", headers=headers, stream=True, timeout=30)
+    check(extra.status_code == 429, "La siguiente se rechaza con 429", extra)
+    extra.close()
+
+    for stream in streams:
+        stream.close()
+    time.sleep(1)
+    connections = open_connections()
+    if connections is not None:
+        check(connections == 0, f"Ninguna suscripción abierta en el worker ({connections})")
+    response, _ = open_stream(headers)
+    check(response.status_code == 200, "Al cerrarlas se libera el cupo", response)
+    response.close()
+
+def test_websocket(token, headers):
+    print("\n=== TEST 4: WEBSOCKET ===")
+    try:
+        from websockets.sync.client import connect
+    except ImportError:
+        print("OMITIDO - la librería 'websockets' no está instalada")
+        return
+    ws_url = f"ws://{SERVER_HOST}:{SERVER_PORT}/api/v1/tasks/stream/ws"
+
+    try:
+        with connect(ws_url) as websocket:
+            websocket.recv(timeout=5)
+        check(False, "Sin token se rechaza la conexión")
+    except Exception as e:
+        check(True, f"Sin token se rechaza la conexión ({type(e).__name__})")
+
+    with connect(f"{ws_url}?token={token}") as websocket:
+        time.sleep(0.2)
+        task_id = requests.post(f"{BASE_URL}/tasks/", json={"title": "Por WebSocket"}, headers=headers).json()["id"]
+        message = json.loads(websocket.recv(timeout=10))
+        check(message["type"] == "created" and message["id"] == task_id, f"Evento recibido: {message['type']}")
+        requests.patch(f"{BASE_URL}/tasks/bulk/filter", json={"description": "todas"}, headers=headers)
+        message = json.loads(websocket.recv(timeout=10))
+        check(message["type"] == "resync" and message["id"] is None, "Una actualización por filtro llega como 'resync'")
+
+    time.sleep(0.5)
+    response, _ = open_stream(headers)
+    check(response.status_code == 200, "El WebSocket cerrado no ocupa cupo", response)
+    response.close()
+
+if __name__ == "__main__":
+    print("INICIANDO PRUEBAS DE CAMBIOS EN VIVO")
+    print("=" * 50)
+
+    token, headers = register()
+    test_sse_events(headers)
+    test_other_users_events(headers)
+    test_connection_limit(token, headers)
+    test_websocket(token, headers)
+
+    print("\n" + "=" * 50)
+    print("PRUEBAS COMPLETADAS" if not failures else f"PRUEBAS COMPLETADAS CON {failures} FALLOS")
+    print("=" * 50)
+    exit(1 if failures else 0)
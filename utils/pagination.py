@@ -0,0 +1,76 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+
+from bson import ObjectId
+
+
+def encode_cursor(sort_field: str, sort_value: datetime, task_id: str) -> str:
+    """
+    Codifica la posición (valor de orden, _id) del último elemento de una página
+    en un cursor opaco y seguro para URLs. Incluye el campo de orden para
+    rechazar cursores reutilizados con otro 'sort'.
+    """
+    raw = json.dumps({"s": sort_field, "v": sort_value.isoformat(), "i": task_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_field: str) -> Tuple[datetime, ObjectId]:
+    """
+    Decodifica un cursor generado por encode_cursor para el orden 'sort_field'.
+    Lanza ValueError si el cursor está mal formado o corresponde a otro orden.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        field = data["s"]
+        sort_value = datetime.fromisoformat(data["v"])
+        task_id = data["i"]
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Cursor de paginación inválido") from e
+
+    if field != sort_field:
+        raise ValueError("El cursor no corresponde al orden solicitado")
+    if not ObjectId.is_valid(task_id):
+        raise ValueError("Cursor de paginación inválido")
+    return sort_value, ObjectId(task_id)
+
+
+def encode_sync_token(
+    seq: int, horizon: Optional[int] = None, last_wid: Optional[ObjectId] = None, last_id: Optional[ObjectId] = None
+) -> str:
+    """
+    Codifica la posición en la secuencia de cambios de un usuario (GET /tasks/changes):
+    la secuencia alcanzada y, si una página se cortó antes de llegar al
+    horizonte ('horizon'), la posición (wid, id) del último cambio entregado.
+    """
+    data: dict = {"q": seq}
+    if last_wid is not None and last_id is not None:
+        data.update(h=horizon, w=str(last_wid), i=str(last_id))
+    raw = json.dumps(data, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_sync_token(token: str) -> Tuple[int, Optional[int], Optional[ObjectId], Optional[ObjectId]]:
+    """
+    Decodifica un token de encode_sync_token en (secuencia, horizonte, wid, id);
+    los tres últimos son None si el token no está a mitad de una página.
+    Lanza ValueError si está mal formado.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        seq = data["q"]
+        horizon, last_wid, last_id = data.get("h"), data.get("w"), data.get("i")
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        raise ValueError("Token de sincronización inválido") from e
+
+    if not isinstance(seq, int) or seq < -1:
+        raise ValueError("Token de sincronización inválido")
+    if not last_wid:
+        # Sin posición dentro de la página (también los tokens anteriores a 'wid')
+        return seq, None, None, None
+    if not isinstance(horizon, int) or horizon < seq or not ObjectId.is_valid(last_wid) or not ObjectId.is_valid(last_id):
+        raise ValueError("Token de sincronización inválido")
+    return seq, horizon, ObjectId(last_wid), ObjectId(last_id)
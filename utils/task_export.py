@@ -0,0 +1,75 @@
+import csv
+import io
+from datetime import datetime
+from typing import Any, AsyncGenerator, AsyncIterator, Awaitable, Callable, FrozenSet, List, Optional
+
+from pydantic import BaseModel
+
+# Formatos de exportación soportados y su tipo de contenido
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+# Orden estable de las columnas CSV (el de TaskInDB)
+EXPORT_COLUMNS = ("id", "title", "description", "due_date", "completed", "created_at", "updated_at", "owner_id")
+
+
+def export_columns(fields: Optional[FrozenSet[str]]) -> List[str]:
+    """Columnas a exportar: todas, o las pedidas con '?fields=' en el orden de EXPORT_COLUMNS."""
+    if fields is None:
+        return list(EXPORT_COLUMNS)
+    return [column for column in EXPORT_COLUMNS if column in fields]
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+async def stream_export(
+    tasks: AsyncGenerator[BaseModel, None],
+    export_format: str,
+    columns: List[str],
+    is_disconnected: Callable[[], Awaitable[bool]],
+    rows_per_chunk: int,
+) -> AsyncIterator[bytes]:
+    """
+    Serializa las tareas a NDJSON o CSV a medida que llegan del cursor.
+
+    Se envía un bloque cada 'rows_per_chunk' filas (normalmente el batch_size del
+    cursor), así que en memoria solo hay un lote a la vez. Entre bloques se
+    comprueba si el cliente se desconectó; al terminar, por error o por
+    desconexión, se cierra el generador de tareas y con él el cursor del servidor.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    rows = 0
+
+    try:
+        if export_format == "csv":
+            writer.writerow(columns)
+
+        async for task in tasks:
+            if export_format == "csv":
+                writer.writerow([_csv_value(getattr(task, column)) for column in columns])
+            else:
+                buffer.write(task.model_dump_json(include=set(columns)))
+                buffer.write("\n")
+            rows += 1
+
+            if rows % rows_per_chunk == 0:
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate()
+                if await is_disconnected():
+                    return
+
+        # Último bloque (o solo la cabecera CSV si no hay tareas)
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+    finally:
+        await tasks.aclose()
@@ -0,0 +1,197 @@
+import csv
+import json
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+try:
+    import msgpack
+except ImportError:  # Dependencia opcional: solo para format=msgpack
+    msgpack = None
+
+# Formatos de importación soportados
+IMPORT_FORMATS = ("ndjson", "csv", "msgpack")
+
+# (número de línea, registro o None, error o None)
+ImportRecord = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_line_bytes: int) -> AsyncIterator[Tuple[int, Optional[str]]]:
+    """
+    Parte un cuerpo recibido por trozos en líneas, sin leerlo entero.
+    Retorna (número de línea, texto sin el salto de línea). Cada trozo se
+    recorre una sola vez: una línea se decodifica al completarse, así que un
+    carácter UTF-8 partido entre dos trozos llega entero.
+
+    Una línea de más de 'max_line_bytes' se retorna como None y su contenido
+    se descarta hasta el siguiente salto de línea: un cuerpo sin saltos no se
+    acumula en memoria.
+    """
+    pending: List[bytes] = []  # Trozos de la línea en curso
+    pending_size = 0
+    overflow = False  # La línea en curso ya superó el límite: se descarta hasta el salto
+    line_number = 0
+
+    def complete(tail: bytes) -> Optional[str]:
+        if overflow or pending_size + len(tail) > max_line_bytes:
+            return None
+        return b"".join(pending + [tail]).decode("utf-8", errors="replace").rstrip("\r")
+
+    async for chunk in chunks:
+        start = 0
+        while True:
+            end = chunk.find(b"\n", start)
+            if end < 0:
+                break
+            line_number += 1
+            yield line_number, complete(chunk[start:end])
+            pending, pending_size, overflow = [], 0, False
+            start = end + 1
+
+        if start < len(chunk) and not overflow:
+            pending.append(chunk[start:])
+            pending_size += len(chunk) - start
+            if pending_size > max_line_bytes:
+                pending, pending_size, overflow = [], 0, True
+
+    if pending or overflow:
+        yield line_number + 1, complete(b"")
+
+
+def _too_long(max_record_bytes: int) -> str:
+    return f"El registro supera el tamaño máximo ({max_record_bytes} bytes)."
+
+
+async def _iter_ndjson(lines: AsyncIterator[Tuple[int, Optional[str]]], max_record_bytes: int) -> AsyncIterator[ImportRecord]:
+    async for line_number, line in lines:
+        if line is None:
+            yield line_number, None, _too_long(max_record_bytes)
+            continue
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_number, None, f"JSON inválido: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield line_number, None, "Cada línea debe ser un objeto JSON."
+            continue
+        yield line_number, record, None
+
+
+async def _iter_csv(lines: AsyncIterator[Tuple[int, Optional[str]]], max_record_bytes: int) -> AsyncIterator[ImportRecord]:
+    header: Optional[List[str]] = None
+    # Líneas del registro en curso, su tamaño y si queda una comilla abierta
+    # (acumulados línea a línea, sin volver a recorrer lo ya leído)
+    record: List[Tuple[int, str]] = []
+    record_size = 0
+    open_quote = False
+    # Líneas a reprocesar tras descartar un registro con una comilla sin cerrar
+    replay: Deque[Tuple[int, Optional[str]]] = deque()
+    source = lines.__aiter__()
+
+    while True:
+        at_end = False
+        if replay:
+            line_number, line = replay.popleft()
+        else:
+            try:
+                line_number, line = await source.__anext__()
+            except StopAsyncIteration:
+                if not record:
+                    break
+                # Fin del cuerpo con una comilla abierta
+                at_end, line_number, line = True, 0, None
+
+        if line is None and not record:
+            # Línea sin fin: ya se descartó en iter_lines
+            yield line_number, None, _too_long(max_record_bytes)
+            continue
+
+        if line is not None:
+            record.append((line_number, line))
+            record_size += len(line) + 1
+            # Un campo entre comillas puede contener saltos de línea: el registro está
+            # completo cuando el número de comillas es par (las escapadas van dobladas)
+            open_quote ^= line.count('"') % 2 == 1
+
+        if open_quote:
+            if line is not None and record_size <= max_record_bytes:
+                continue
+            # Comilla sin cerrar (al final del cuerpo, antes de una línea sin fin o
+            # más allá del tamaño máximo): se descarta solo la primera línea del
+            # registro y se reprocesan las demás, que no tienen comillas impares
+            yield record[0][0], None, (
+                "CSV inválido: comillas sin cerrar." if record_size <= max_record_bytes else _too_long(max_record_bytes)
+            )
+            pending = record[1:] if at_end or line is not None else record[1:] + [(line_number, None)]
+            replay.extendleft(reversed(pending))
+            record, record_size, open_quote = [], 0, False
+            continue
+
+        record_start = record[0][0]
+        text = "\n".join(text_line for _, text_line in record)
+        record, record_size = [], 0
+
+        if not text.strip():
+            continue
+        try:
+            row = next(csv.reader([text]))
+        except csv.Error as e:
+            yield record_start, None, f"CSV inválido: {e}"
+            continue
+
+        if header is None:
+            header = [column.strip() for column in row]
+            continue
+        if len(row) != len(header):
+            yield record_start, None, f"Se esperaban {len(header)} columnas y hay {len(row)}."
+            continue
+        # Las celdas vacías equivalen a campos no enviados
+        yield record_start, {column: value for column, value in zip(header, row) if value != ""}, None
+
+
+async def _iter_msgpack(chunks: AsyncIterator[bytes]) -> AsyncIterator[ImportRecord]:
+    """
+    Objetos MessagePack concatenados; el "número de línea" es la posición del
+    objeto (desde 1). Tras un byte mal formado no se puede resincronizar el
+    flujo, así que se informa el error y se termina.
+    """
+    # timestamp=3: las marcas de tiempo de MessagePack llegan como datetime UTC
+    unpacker = msgpack.Unpacker(timestamp=3, max_buffer_size=16 * 1024 * 1024)
+    position = 0
+    received = 0
+    # Fin del último objeto completo (tell() también cuenta lo leído de uno a medias)
+    consumed = 0
+
+    async for chunk in chunks:
+        received += len(chunk)
+        try:
+            unpacker.feed(chunk)
+            for record in unpacker:
+                position += 1
+                consumed = unpacker.tell()
+                if not isinstance(record, dict):
+                    yield position, None, "Cada objeto MessagePack debe ser un mapa."
+                    continue
+                yield position, record, None
+        except (ValueError, msgpack.UnpackException):
+            yield position + 1, None, "MessagePack inválido."
+            return
+
+    if consumed < received:
+        yield position + 1, None, "MessagePack inválido: objeto incompleto al final del cuerpo."
+
+
+def iter_records(chunks: AsyncIterator[bytes], import_format: str, max_record_bytes: int) -> AsyncIterator[ImportRecord]:
+    """
+    Registros de un cuerpo NDJSON, CSV (con cabecera) o MessagePack, parseados a
+    medida que llegan. Las líneas mal formadas, y los registros NDJSON/CSV de
+    más de 'max_record_bytes', se devuelven como error sin interrumpir el resto.
+    """
+    if import_format == "msgpack":
+        return _iter_msgpack(chunks)
+    lines = iter_lines(chunks, max_record_bytes)
+    if import_format == "csv":
+        return _iter_csv(lines, max_record_bytes)
+    return _iter_ndjson(lines, max_record_bytes)